@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import json
 from datetime import datetime
 from typing import Optional, List, Dict
 
@@ -12,8 +11,7 @@ logger = Logger.get_logger()
 class Badges(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        with open('config.json', 'r') as f:
-            self.config = json.load(f)
+        self.config = bot.config
             
         # Define available badges
         self.available_badges = {
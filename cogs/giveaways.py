@@ -1,48 +1,226 @@
 import discord
 from discord.ext import commands, tasks
 import asyncio
+from array import array
+from bisect import bisect_left
 from datetime import datetime, timedelta
 import random
 from typing import Optional, List, Dict
-import json
 
 from utils.logger import Logger, GiveawayLogger
 from utils.database import GiveawayManager
+from utils.scheduler import DeadlineScheduler, parse_duration, retry_with_backoff
 
 logger = Logger.get_logger()
 
+GIVEAWAY_EMOJI = '🎉'
+
+class EntrantSet:
+    """Sorted array of entrant ids; 8 bytes per entrant instead of a set entry"""
+
+    __slots__ = ('_ids',)
+
+    def __init__(self, user_ids=()):
+        self._ids = array('Q', sorted(set(user_ids)))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        i = bisect_left(self._ids, user_id)
+        return i < len(self._ids) and self._ids[i] == user_id
+
+    def add(self, user_id: int) -> bool:
+        i = bisect_left(self._ids, user_id)
+        if i < len(self._ids) and self._ids[i] == user_id:
+            return False
+        self._ids.insert(i, user_id)
+        return True
+
+    def discard(self, user_id: int) -> bool:
+        i = bisect_left(self._ids, user_id)
+        if i < len(self._ids) and self._ids[i] == user_id:
+            del self._ids[i]
+            return True
+        return False
+
+    def sample(self, k: int) -> List[int]:
+        """Pick k distinct entrants without copying the array"""
+        return random.sample(self._ids, min(k, len(self._ids)))
+
 class Giveaways(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        with open('config.json', 'r') as f:
-            self.config = json.load(f)
+        self.config = bot.config
+        # message_id -> giveaway_id for every giveaway still accepting entries
         self.active_giveaways = {}
-        self.check_giveaways.start()
-
-    def cog_unload(self):
-        self.check_giveaways.cancel()
-
-    @tasks.loop(seconds=30)
-    async def check_giveaways(self):
-        """Check and end expired giveaways"""
+        self.entrants: Dict[object, EntrantSet] = {}
+        # giveaway_id -> {user_id: entered?}, last event per user wins
+        self.pending_entrants: Dict[object, Dict[int, bool]] = {}
+        self.scheduler = DeadlineScheduler(self.end_giveaway, name="giveaway-scheduler")
+        self._ending = set()
+        self._restore_task = None
+        # giveaway_id -> background task syncing its entrants with the message's reactions
+        self._reconciles: Dict[object, asyncio.Task] = {}
+        self._reconcile_slots = asyncio.Semaphore(bot.config.get('giveaways', {}).get('reconcile_concurrency', 2))
+
+    async def cog_load(self):
+        self._restore_task = asyncio.create_task(self.restore_giveaways())
+        self.flush_entrants.start()
+
+    async def cog_unload(self):
+        if self._restore_task:
+            self._restore_task.cancel()
+        for task in list(self._reconciles.values()):
+            task.cancel()
+        self.scheduler.stop()
+        self.flush_entrants.cancel()
+        await self._flush_entrants()
+
+    async def restore_giveaways(self):
+        """Load active giveaway deadlines, retrying until the database answers"""
+        await self.bot.wait_until_ready()
+        # Giveaways created meanwhile must still end while the restore is retrying
+        self.scheduler.start()
         try:
-            current_time = datetime.utcnow()
-            giveaways = await GiveawayManager.get_active_giveaways()
-            
+            giveaways = await retry_with_backoff(
+                lambda: GiveawayManager.get_active_giveaways(
+                    {'guild_id': 1, 'channel_id': 1, 'end_time': 1, 'message_id': 1, 'participants': 1}
+                ),
+                "load active giveaways"
+            )
+            # Other shard processes end the giveaways of the guilds they own
+            giveaways = [giveaway for giveaway in giveaways if self.bot.owns_guild(giveaway['guild_id'])]
             for giveaway in giveaways:
-                if current_time >= giveaway['end_time']:
-                    await self.end_giveaway(giveaway['_id'])
-                    
+                self._track(giveaway['_id'], giveaway['message_id'], giveaway.get('participants', []))
+                # Overdue giveaways (e.g. ended while offline) fire immediately
+                self.scheduler.schedule(giveaway['_id'], giveaway['end_time'])
+            logger.info(f"Scheduled {len(giveaways)} active giveaways")
+
+            # Soonest-ending first; the semaphore queues the rest in that order
+            for giveaway in sorted(giveaways, key=lambda giveaway: giveaway['end_time']):
+                task = asyncio.create_task(self._reconcile_in_background(giveaway))
+                self._reconciles[giveaway['_id']] = task
+                task.add_done_callback(lambda _, giveaway_id=giveaway['_id']: self._reconciles.pop(giveaway_id, None))
         except Exception as e:
-            logger.error(f"Error checking giveaways: {e}")
+            logger.error(f"Error restoring giveaways: {e}")
 
-    @check_giveaways.before_loop
-    async def before_check_giveaways(self):
-        """Wait for bot to be ready before starting loop"""
-        await self.bot.wait_until_ready()
+    async def _reconcile_in_background(self, giveaway: Dict):
+        async with self._reconcile_slots:
+            try:
+                await self._reconcile(giveaway)
+            except Exception as e:
+                logger.error(f"Error reconciling entrants of giveaway {giveaway['_id']}: {e}")
+
+    async def _reconcile(self, giveaway: Dict):
+        """Sync stored entrants with the message's reactions once after a restart.
+
+        Reactions added or removed while the bot was offline never reach the
+        raw reaction listeners, and giveaways created before entrants were
+        tracked have no stored participants at all. This pages through every
+        reacting user, so it runs in the background a few at a time; a
+        giveaway that ends first waits for its own reconciliation.
+        """
+        giveaway_id = giveaway['_id']
+        channel = self.bot.get_channel(giveaway['channel_id'])
+        if not channel:
+            return
+        try:
+            message = await channel.fetch_message(giveaway['message_id'])
+            reacted = set()
+            reaction = discord.utils.get(message.reactions, emoji=GIVEAWAY_EMOJI)
+            if reaction:
+                async for user in reaction.users():
+                    if not user.bot:
+                        reacted.add(user.id)
+        except discord.HTTPException as e:
+            logger.warning(f"Could not reconcile entrants of giveaway {giveaway_id}: {e}")
+            return
 
-    async def end_giveaway(self, giveaway_id: str):
+        entrants = self.entrants.get(giveaway_id)
+        if entrants is None:
+            return
+        changes = self.pending_entrants.setdefault(giveaway_id, {})
+        # Users with a live reaction event since tracking started are already up to date
+        live = set(changes)
+        for user_id in reacted - live:
+            if entrants.add(user_id):
+                changes[user_id] = True
+        for user_id in set(entrants) - reacted - live:
+            entrants.discard(user_id)
+            changes[user_id] = False
+        if not changes:
+            del self.pending_entrants[giveaway_id]
+
+    def _track(self, giveaway_id, message_id: int, participants=()):
+        self.active_giveaways[message_id] = giveaway_id
+        self.entrants[giveaway_id] = EntrantSet(participants)
+
+    def _untrack(self, giveaway_id, message_id: int):
+        self.active_giveaways.pop(message_id, None)
+        self.entrants.pop(giveaway_id, None)
+
+    def _record_entry(self, payload: discord.RawReactionActionEvent, entered: bool):
+        if str(payload.emoji) != GIVEAWAY_EMOJI:
+            return
+        giveaway_id = self.active_giveaways.get(payload.message_id)
+        if giveaway_id is None or payload.user_id == self.bot.user.id:
+            return
+
+        entrants = self.entrants[giveaway_id]
+        changed = entrants.add(payload.user_id) if entered else entrants.discard(payload.user_id)
+        if changed:
+            self.pending_entrants.setdefault(giveaway_id, {})[payload.user_id] = entered
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        """Track giveaway entries as they happen"""
+        if payload.member and payload.member.bot:
+            return
+        self._record_entry(payload, True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        """Track giveaway withdrawals as they happen"""
+        self._record_entry(payload, False)
+
+    @tasks.loop(seconds=15)
+    async def flush_entrants(self):
+        """Persist entrant changes to the participants field in batches"""
+        await self._flush_entrants()
+
+    async def _flush_entrants(self, giveaway_id=None):
+        if giveaway_id is not None:
+            pending = {giveaway_id: self.pending_entrants.pop(giveaway_id)} if giveaway_id in self.pending_entrants else {}
+        else:
+            pending, self.pending_entrants = self.pending_entrants, {}
+        if not pending:
+            return
+
+        changes = {
+            gid: (
+                [uid for uid, entered in users.items() if entered],
+                [uid for uid, entered in users.items() if not entered]
+            )
+            for gid, users in pending.items()
+        }
+        if not await GiveawayManager.update_participants(changes):
+            # Put the batch back unless newer events superseded it
+            for gid, users in pending.items():
+                merged = users
+                merged.update(self.pending_entrants.get(gid, {}))
+                self.pending_entrants[gid] = merged
+
+    async def end_giveaway(self, giveaway_id):
         """End a giveaway and select winners"""
+        # The scheduler and the end command can race for the same giveaway
+        if giveaway_id in self._ending:
+            return
+        self._ending.add(giveaway_id)
+        self.scheduler.cancel(giveaway_id)
         try:
             giveaway = await GiveawayManager.get_giveaway(giveaway_id)
             if not giveaway or not giveaway['active']:
@@ -50,30 +228,37 @@ class Giveaways(commands.Cog):
 
             channel = self.bot.get_channel(giveaway['channel_id'])
             if not channel:
+                guild = self.bot.get_guild(giveaway['guild_id'])
+                if guild is not None and guild.unavailable:
+                    # Discord outage, not a deleted channel; try again later
+                    self.scheduler.schedule(giveaway_id, datetime.utcnow() + timedelta(minutes=5))
+                    return
+                await self._abandon(giveaway, "its channel no longer exists")
                 return
 
             try:
                 message = await channel.fetch_message(giveaway['message_id'])
             except discord.NotFound:
+                await self._abandon(giveaway, "its message was deleted")
                 return
 
-            # Get participants from reactions
-            try:
-                reaction = next(r for r in message.reactions if r.emoji == '🎉')
-                users = [user async for user in reaction.users() if not user.bot]
-            except (StopIteration, discord.NotFound):
-                users = []
+            reconcile = self._reconciles.get(giveaway_id)
+            if reconcile is not None:
+                await asyncio.shield(reconcile)
 
-            # Select winners
-            winner_count = min(len(users), giveaway['winner_count']) if users else 0
-            winners = random.sample(users, winner_count) if winner_count > 0 else []
+            # Select winners from the tracked entrants
+            entrants = self.entrants.get(giveaway_id)
+            if entrants is None:
+                entrants = EntrantSet(giveaway.get('participants', []))
+            await self._flush_entrants(giveaway_id)
+            winners = entrants.sample(giveaway['winner_count'])
 
             # Update giveaway embed
             embed = message.embeds[0]
             embed.color = discord.Color.red() if not winners else discord.Color.green()
             
             if winners:
-                winners_text = ", ".join(w.mention for w in winners)
+                winners_text = ", ".join(f"<@{w}>" for w in winners)
                 embed.description = f"🎉 Winners: {winners_text}\n\nPrize: {giveaway['prize']}"
             else:
                 embed.description = f"Giveaway ended\nNo valid participants!\n\nPrize: {giveaway['prize']}"
@@ -84,7 +269,7 @@ class Giveaways(commands.Cog):
             # Send winner announcement
             if winners:
                 await channel.send(
-                    f"🎉 Congratulations {', '.join(w.mention for w in winners)}! "
+                    f"🎉 Congratulations {', '.join(f'<@{w}>' for w in winners)}! "
                     f"You won: **{giveaway['prize']}**"
                 )
 
@@ -96,10 +281,20 @@ class Giveaways(commands.Cog):
             )
 
             # Update database
-            await GiveawayManager.end_giveaway(giveaway_id)
+            await GiveawayManager.end_giveaway(giveaway_id, winners)
+            self._untrack(giveaway_id, giveaway['message_id'])
             
         except Exception as e:
             logger.error(f"Error ending giveaway: {e}")
+        finally:
+            self._ending.discard(giveaway_id)
+
+    async def _abandon(self, giveaway: Dict, why: str):
+        """Mark a giveaway that can't be ended normally as inactive so it isn't restored again"""
+        logger.warning(f"Ending giveaway {giveaway['_id']} without winners: {why}")
+        await GiveawayManager.end_giveaway(giveaway['_id'], [])
+        self._untrack(giveaway['_id'], giveaway['message_id'])
+        self.pending_entrants.pop(giveaway['_id'], None)
 
     @commands.group(invoke_without_command=True)
     @commands.has_permissions(manage_messages=True)
@@ -112,7 +307,7 @@ class Giveaways(commands.Cog):
     async def giveaway_create(self, ctx):
         """Create a new giveaway"""
         # Check if user has premium for multiple giveaways
-        active_giveaways = await GiveawayManager.get_active_giveaways()
+        active_giveaways = await GiveawayManager.get_active_giveaways() or []
         if len(active_giveaways) >= 1 and not hasattr(ctx.author, 'premium'):
             await ctx.send("You need premium to run multiple giveaways!")
             return
@@ -130,13 +325,8 @@ class Giveaways(commands.Cog):
             await ctx.send("How long should the giveaway last? (e.g. 1h, 1d, 1w)")
             msg = await self.bot.wait_for('message', check=check, timeout=60)
             
-            duration = msg.content.lower()
-            time_convert = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
-            time_unit = duration[-1]
-            try:
-                time_value = int(duration[:-1])
-                seconds = time_value * time_convert[time_unit]
-            except:
+            duration = parse_duration(msg.content)
+            if not duration:
                 await ctx.send("Invalid duration format! Use s/m/h/d/w (e.g. 1h, 1d)")
                 return
 
@@ -152,7 +342,7 @@ class Giveaways(commands.Cog):
                 return
 
             # Create giveaway embed
-            end_time = datetime.utcnow() + timedelta(seconds=seconds)
+            end_time = datetime.utcnow() + duration
             embed = discord.Embed(
                 title="🎉 Giveaway",
                 description=f"React with 🎉 to enter!\n\n"
@@ -165,10 +355,10 @@ class Giveaways(commands.Cog):
 
             # Send giveaway message
             giveaway_msg = await ctx.send(embed=embed)
-            await giveaway_msg.add_reaction("🎉")
+            await giveaway_msg.add_reaction(GIVEAWAY_EMOJI)
 
             # Save to database
-            await GiveawayManager.create_giveaway(
+            giveaway_id = await GiveawayManager.create_giveaway(
                 ctx.guild.id,
                 ctx.channel.id,
                 giveaway_msg.id,
@@ -176,6 +366,9 @@ class Giveaways(commands.Cog):
                 end_time,
                 winner_count
             )
+            if giveaway_id is not None:
+                self._track(giveaway_id, giveaway_msg.id)
+                self.scheduler.schedule(giveaway_id, end_time)
 
             # Log giveaway creation
             await GiveawayLogger.log_giveaway_action(
@@ -212,26 +405,23 @@ class Giveaways(commands.Cog):
     async def giveaway_reroll(self, ctx, message_id: int):
         """Reroll a giveaway's winners"""
         try:
-            message = await ctx.channel.fetch_message(message_id)
-            if not message:
-                await ctx.send("Message not found!")
-                return
-
-            # Get participants
-            reaction = next((r for r in message.reactions if r.emoji == '🎉'), None)
-            if not reaction:
-                await ctx.send("No reactions found on this giveaway!")
+            giveaway = await GiveawayManager.get_giveaway_by_message(message_id)
+            if not giveaway:
+                await ctx.send("Giveaway not found!")
                 return
 
-            users = [user async for user in reaction.users() if not user.bot]
-            if not users:
+            # Sample straight from the stored list unless the giveaway is still tracked
+            entrants = self.entrants.get(giveaway['_id'])
+            participants = giveaway.get('participants', [])
+            winners = entrants.sample(1) if entrants is not None else random.sample(participants, min(1, len(participants)))
+            if not winners:
                 await ctx.send("No valid participants found!")
                 return
 
             # Select new winner
-            winner = random.choice(users)
+            winner = winners[0]
             
-            await ctx.send(f"🎉 New winner: {winner.mention}! Congratulations!")
+            await ctx.send(f"🎉 New winner: <@{winner}>! Congratulations!")
             
             # Log reroll
             await GiveawayLogger.log_giveaway_action(
@@ -250,6 +440,9 @@ class Giveaways(commands.Cog):
         """List all active giveaways"""
         try:
             giveaways = await GiveawayManager.get_active_giveaways()
+            if giveaways is None:
+                await ctx.send("Couldn't load giveaways right now, try again later!")
+                return
             
             if not giveaways:
                 await ctx.send("No active giveaways!")
@@ -2,20 +2,81 @@ import discord
 from discord.ext import commands
 from typing import Optional, Union
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from utils.logger import ModLogger, Logger
 from utils.database import WarningManager
+from utils.permissions import bulk_set_permissions
+from utils.scheduler import parse_duration
+from utils.snipe import SnipeRecord, SnipeStore
+
+# Clearing a mute also clears the spam filter's timed unmute and muted flag
+DEPENDS_ON = ('cogs.security',)
 
 logger = Logger.get_logger()
 
 class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.snipe_message = {}
-        self.edit_snipe_message = {}
+        snipe_settings = bot.config.get('snipe', {})
+        self.deleted_snipes = SnipeStore(**snipe_settings)
+        self.edited_snipes = SnipeStore(**snipe_settings)
         self.ignored_channels = set()
 
+    async def cog_load(self):
+        self.bot.scheduler.register('unmute', self._scheduled_unmute)
+        self.bot.scheduler.register('unban', self._scheduled_unban)
+        self.bot.scheduler.register('unlock', self._scheduled_unlock)
+
+    async def _cancel_actions(self, action: str, **match) -> int:
+        """Cancel pending timed actions superseded by a manual command"""
+        pending = self.bot.scheduler.find(action, **match)
+        for document in pending:
+            await self.bot.scheduler.cancel(document['_id'])
+        return len(pending)
+
+    async def _cancel_unmutes(self, guild_id: int, user_id: int) -> int:
+        """Cancel timed unmutes from tempmute and from the spam filter"""
+        cancelled = await self._cancel_actions('unmute', guild_id=guild_id, user_id=user_id)
+        spam_unmutes = await self._cancel_actions('spam_unmute', guild_id=guild_id, user_id=user_id)
+        if spam_unmutes:
+            # The spam filter won't mute a member again while it thinks they're still muted
+            security = self.bot.get_cog('Security')
+            if security:
+                security.muted_users.discard(user_id)
+        return cancelled + spam_unmutes
+
+    @staticmethod
+    async def _set_send_messages(channel, role: discord.Role, value: Optional[bool], reason: Optional[str] = None):
+        """Change only send_messages, keeping the role's other overwrites on the channel"""
+        overwrite = channel.overwrites_for(role)
+        overwrite.update(send_messages=value)
+        await channel.set_permissions(role, overwrite=overwrite, reason=reason)
+
+    async def _scheduled_unmute(self, action):
+        guild = self.bot.get_guild(action['guild_id'])
+        if not guild:
+            return
+        member = await self.bot.get_or_fetch_member(guild, action['user_id'])
+        muted_role = discord.utils.get(guild.roles, name="Muted")
+        if member and muted_role and muted_role in member.roles:
+            await member.remove_roles(muted_role, reason="Temporary mute expired")
+
+    async def _scheduled_unban(self, action):
+        guild = self.bot.get_guild(action['guild_id'])
+        if not guild:
+            return
+        try:
+            await guild.unban(discord.Object(id=action['user_id']), reason="Temporary ban expired")
+        except discord.NotFound:
+            pass
+
+    async def _scheduled_unlock(self, action):
+        guild = self.bot.get_guild(action['guild_id'])
+        channel = guild.get_channel(action['channel_id']) if guild else None
+        if channel:
+            await self._set_send_messages(channel, guild.default_role, None, reason="Timed lock expired")
+
     @commands.Cog.listener()
     async def on_message_delete(self, message):
         """Store deleted messages for snipe command"""
@@ -23,11 +84,10 @@ class Moderation(commands.Cog):
             return
         if message.channel.id in self.ignored_channels:
             return
-        self.snipe_message[message.channel.id] = {
-            'content': message.content,
-            'author': message.author,
-            'timestamp': datetime.utcnow()
-        }
+        self.deleted_snipes.add(
+            message.channel.id,
+            SnipeRecord(message.author.id, message.author.name, message.content)
+        )
 
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
@@ -36,12 +96,12 @@ class Moderation(commands.Cog):
             return
         if before.channel.id in self.ignored_channels:
             return
-        self.edit_snipe_message[before.channel.id] = {
-            'before': before.content,
-            'after': after.content,
-            'author': before.author,
-            'timestamp': datetime.utcnow()
-        }
+        if before.content == after.content:
+            return
+        self.edited_snipes.add(
+            before.channel.id,
+            SnipeRecord(before.author.id, before.author.name, before.content, edited=after.content)
+        )
 
     @commands.command()
     @commands.has_permissions(ban_members=True)
@@ -71,6 +131,42 @@ class Moderation(commands.Cog):
             logger.error(f"Error in ban command: {e}")
             await ctx.send("An error occurred while trying to ban the member.")
 
+    @commands.command()
+    @commands.has_permissions(ban_members=True)
+    async def tempban(self, ctx, member: discord.Member, duration: str, *, reason: Optional[str] = "No reason provided"):
+        """Ban a member for a duration (e.g. 1h, 1d, 1w)"""
+        delta = parse_duration(duration)
+        if not delta:
+            await ctx.send("Invalid duration format! Use s/m/h/d/w (e.g. 1h, 1d)")
+            return
+
+        try:
+            if member.top_role >= ctx.author.top_role and ctx.author.id != ctx.guild.owner_id:
+                await ctx.send("You cannot ban someone with a higher or equal role!")
+                return
+
+            until = datetime.utcnow() + delta
+            await member.ban(reason=f"Temporarily banned by {ctx.author}: {reason}")
+            await self.bot.scheduler.schedule('unban', until, ctx.guild.id, user_id=member.id)
+            await ModLogger.log_mod_action(ctx, "ban", member, reason)
+            
+            embed = discord.Embed(
+                title="Member Banned",
+                description=f"{member.mention} has been banned",
+                color=discord.Color.red()
+            )
+            embed.add_field(name="Reason", value=reason)
+            embed.add_field(name="Expires", value=f"<t:{int(until.replace(tzinfo=timezone.utc).timestamp())}:R>")
+            embed.set_footer(text="Developed By Lickzy")
+            
+            await ctx.send(embed=embed)
+            
+        except discord.Forbidden:
+            await ctx.send("I don't have permission to ban that member!")
+        except Exception as e:
+            logger.error(f"Error in tempban command: {e}")
+            await ctx.send("An error occurred while trying to ban the member.")
+
     @commands.command()
     @commands.has_permissions(ban_members=True)
     async def unban(self, ctx, user_id: int, *, reason: Optional[str] = "No reason provided"):
@@ -84,6 +180,7 @@ class Moderation(commands.Cog):
                 return
                 
             await ctx.guild.unban(user, reason=f"Unbanned by {ctx.author}: {reason}")
+            await self._cancel_actions('unban', guild_id=ctx.guild.id, user_id=user_id)
             await ModLogger.log_mod_action(ctx, "unban", user, reason)
             
             embed = discord.Embed(
@@ -177,7 +274,7 @@ class Moderation(commands.Cog):
             
             for i, warning in enumerate(warnings, 1):
                 mod = ctx.guild.get_member(warning['mod_id'])
-                mod_name = mod.name if mod else "Unknown Moderator"
+                mod_name = mod.name if mod else f"<@{warning['mod_id']}>"
                 timestamp = warning['timestamp'].strftime("%Y-%m-%d %H:%M:%S")
                 
                 embed.add_field(
@@ -218,11 +315,18 @@ class Moderation(commands.Cog):
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
-    async def lock(self, ctx, channel: Optional[discord.TextChannel] = None):
-        """Lock a channel"""
+    async def lock(self, ctx, channel: Optional[discord.TextChannel] = None, duration: Optional[str] = None):
+        """Lock a channel, optionally for a duration (e.g. 30m)"""
         channel = channel or ctx.channel
+        delta = parse_duration(duration) if duration else None
+        if duration and not delta:
+            await ctx.send("Invalid duration format! Use s/m/h/d/w (e.g. 30m, 1h)")
+            return
+
         try:
-            await channel.set_permissions(ctx.guild.default_role, send_messages=False)
+            await self._set_send_messages(channel, ctx.guild.default_role, False)
+            # A new lock, timed or not, replaces any pending unlock
+            await self._cancel_actions('unlock', guild_id=ctx.guild.id, channel_id=channel.id)
             await ModLogger.log_mod_action(ctx, "lock", channel)
             
             embed = discord.Embed(
@@ -230,6 +334,10 @@ class Moderation(commands.Cog):
                 description=f"{channel.mention} has been locked",
                 color=discord.Color.red()
             )
+            if delta:
+                until = datetime.utcnow() + delta
+                await self.bot.scheduler.schedule('unlock', until, ctx.guild.id, channel_id=channel.id)
+                embed.add_field(name="Unlocks", value=f"<t:{int(until.replace(tzinfo=timezone.utc).timestamp())}:R>")
             embed.set_footer(text=f"Locked by {ctx.author}")
             
             await ctx.send(embed=embed)
@@ -246,7 +354,8 @@ class Moderation(commands.Cog):
         """Unlock a channel"""
         channel = channel or ctx.channel
         try:
-            await channel.set_permissions(ctx.guild.default_role, send_messages=None)
+            await self._set_send_messages(channel, ctx.guild.default_role, None)
+            await self._cancel_actions('unlock', guild_id=ctx.guild.id, channel_id=channel.id)
             await ModLogger.log_mod_action(ctx, "unlock", channel)
             
             embed = discord.Embed(
@@ -264,48 +373,74 @@ class Moderation(commands.Cog):
             logger.error(f"Error in unlock command: {e}")
             await ctx.send("An error occurred while trying to unlock the channel.")
 
+    def _snipe_embed(self, ctx, record: SnipeRecord, color: discord.Color, index: int, total: int) -> discord.Embed:
+        embed = discord.Embed(
+            color=color,
+            timestamp=datetime.fromtimestamp(record.timestamp, timezone.utc)
+        )
+        author = ctx.guild.get_member(record.author_id)
+        embed.set_author(
+            name=record.author_name,
+            icon_url=author.avatar.url if author and author.avatar else None
+        )
+        embed.set_footer(text=f"{index}/{total} • Developed By Lickzy")
+        return embed
+
     @commands.command()
     @commands.has_permissions(manage_messages=True)
-    async def snipe(self, ctx):
-        """Show the last deleted message in the channel"""
-        message_data = self.snipe_message.get(ctx.channel.id)
+    async def snipe(self, ctx, index: int = 1):
+        """Show a recently deleted message in the channel (1 = latest)"""
+        record = self.deleted_snipes.get(ctx.channel.id, index)
         
-        if not message_data:
-            await ctx.send("There are no deleted messages to snipe!")
+        if not record:
+            total = self.deleted_snipes.count(ctx.channel.id)
+            await ctx.send(
+                f"There are only {total} deleted messages to snipe!" if total
+                else "There are no deleted messages to snipe!"
+            )
             return
             
-        embed = discord.Embed(
-            description=message_data['content'],
-            color=discord.Color.red(),
-            timestamp=message_data['timestamp']
-        )
-        embed.set_author(
-            name=message_data['author'].name,
-            icon_url=message_data['author'].avatar.url if message_data['author'].avatar else None
-        )
-        embed.set_footer(text="Developed By Lickzy")
+        embed = self._snipe_embed(ctx, record, discord.Color.red(), index, self.deleted_snipes.count(ctx.channel.id))
+        embed.description = record.content
         await ctx.send(embed=embed)
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
-    async def editsnipe(self, ctx):
-        """Show the last edited message in the channel"""
-        message_data = self.edit_snipe_message.get(ctx.channel.id)
+    async def editsnipe(self, ctx, index: int = 1):
+        """Show a recently edited message in the channel (1 = latest)"""
+        record = self.edited_snipes.get(ctx.channel.id, index)
         
-        if not message_data:
-            await ctx.send("There are no edited messages to snipe!")
+        if not record:
+            total = self.edited_snipes.count(ctx.channel.id)
+            await ctx.send(
+                f"There are only {total} edited messages to snipe!" if total
+                else "There are no edited messages to snipe!"
+            )
             return
             
-        embed = discord.Embed(
-            color=discord.Color.blue(),
-            timestamp=message_data['timestamp']
-        )
-        embed.add_field(name="Before", value=message_data['before'], inline=False)
-        embed.add_field(name="After", value=message_data['after'], inline=False)
-        embed.set_author(
-            name=message_data['author'].name,
-            icon_url=message_data['author'].avatar.url if message_data['author'].avatar else None
-        )
+        embed = self._snipe_embed(ctx, record, discord.Color.blue(), index, self.edited_snipes.count(ctx.channel.id))
+        embed.add_field(name="Before", value=record.content[:1024] or "*empty*", inline=False)
+        embed.add_field(name="After", value=record.edited[:1024] or "*empty*", inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.is_owner()
+    async def snipestats(self, ctx):
+        """Show the snipe store's memory footprint"""
+        embed = discord.Embed(title="Snipe Store", color=discord.Color.blue())
+        for name, store in (("Deleted", self.deleted_snipes), ("Edited", self.edited_snipes)):
+            store.purge_expired()
+            stats = store.stats()
+            embed.add_field(
+                name=name,
+                value=(
+                    f"Channels: {stats['channels']}\n"
+                    f"Entries: {stats['entries']}/{stats['max_entries']}\n"
+                    f"Memory: {stats['bytes'] / 1024:.1f}/{stats['max_bytes'] / 1024:.0f} KiB\n"
+                    f"Evicted: {stats['evictions']} • Expired: {stats['expirations']}"
+                ),
+                inline=True
+            )
         embed.set_footer(text="Developed By Lickzy")
         await ctx.send(embed=embed)
 
@@ -319,51 +454,60 @@ class Moderation(commands.Cog):
             await ctx.send(f"Unignored {channel.mention} for message logging.")
         else:
             self.ignored_channels.add(channel.id)
+            self.deleted_snipes.forget(channel.id)
+            self.edited_snipes.forget(channel.id)
             await ctx.send(f"Now ignoring {channel.mention} for message logging.")
 
+    @staticmethod
+    def _progress_reporter(message: discord.Message, verb: str):
+        """Progress callback that edits a status message"""
+        async def report(done: int, total: int):
+            await message.edit(content=f"{verb} channels... {done}/{total}")
+        return report
+
     @commands.command()
     @commands.has_permissions(manage_channels=True)
     async def lockall(self, ctx):
         """Lock all channels in the server"""
-        success = 0
-        failed = 0
-        
-        for channel in ctx.guild.text_channels:
-            try:
-                await channel.set_permissions(ctx.guild.default_role, send_messages=False)
-                success += 1
-            except:
-                failed += 1
+        status = await ctx.send(f"Locking {len(ctx.guild.text_channels)} channels...")
+        result = await bulk_set_permissions(
+            ctx.guild.text_channels,
+            ctx.guild.default_role,
+            progress=self._progress_reporter(status, "Locking"),
+            send_messages=False
+        )
                 
         embed = discord.Embed(
             title="Server Lockdown",
-            description=f"Successfully locked {success} channels.\nFailed to lock {failed} channels.",
+            description=f"Successfully locked {result.succeeded} channels.\nFailed to lock {len(result.failed)} channels.",
             color=discord.Color.red()
         )
+        if result.failed:
+            embed.add_field(name="Failures", value=result.failure_summary(), inline=False)
         embed.set_footer(text="Developed By Lickzy")
-        await ctx.send(embed=embed)
+        await status.edit(content=None, embed=embed)
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
     async def unlockall(self, ctx):
         """Unlock all channels in the server"""
-        success = 0
-        failed = 0
-        
-        for channel in ctx.guild.text_channels:
-            try:
-                await channel.set_permissions(ctx.guild.default_role, send_messages=None)
-                success += 1
-            except:
-                failed += 1
+        status = await ctx.send(f"Unlocking {len(ctx.guild.text_channels)} channels...")
+        result = await bulk_set_permissions(
+            ctx.guild.text_channels,
+            ctx.guild.default_role,
+            progress=self._progress_reporter(status, "Unlocking"),
+            send_messages=None
+        )
                 
         embed = discord.Embed(
             title="Server Unlocked",
-            description=f"Successfully unlocked {success} channels.\nFailed to unlock {failed} channels.",
+            description=f"Successfully unlocked {result.succeeded} channels.\nFailed to unlock {len(result.failed)} channels.",
             color=discord.Color.green()
         )
+        if result.failed:
+            embed.add_field(name="Failures", value=result.failure_summary(), inline=False)
         embed.set_footer(text="Developed By Lickzy")
-        await ctx.send(embed=embed)
+        await status.edit(content=None, embed=embed)
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
@@ -403,45 +547,45 @@ class Moderation(commands.Cog):
     @commands.has_permissions(manage_channels=True)
     async def hideall(self, ctx):
         """Hide all channels"""
-        success = 0
-        failed = 0
-        
-        for channel in ctx.guild.text_channels:
-            try:
-                await channel.set_permissions(ctx.guild.default_role, view_channel=False)
-                success += 1
-            except:
-                failed += 1
+        status = await ctx.send(f"Hiding {len(ctx.guild.text_channels)} channels...")
+        result = await bulk_set_permissions(
+            ctx.guild.text_channels,
+            ctx.guild.default_role,
+            progress=self._progress_reporter(status, "Hiding"),
+            view_channel=False
+        )
                 
         embed = discord.Embed(
             title="All Channels Hidden",
-            description=f"Successfully hidden {success} channels.\nFailed to hide {failed} channels.",
+            description=f"Successfully hidden {result.succeeded} channels.\nFailed to hide {len(result.failed)} channels.",
             color=discord.Color.blue()
         )
+        if result.failed:
+            embed.add_field(name="Failures", value=result.failure_summary(), inline=False)
         embed.set_footer(text="Developed By Lickzy")
-        await ctx.send(embed=embed)
+        await status.edit(content=None, embed=embed)
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
     async def unhideall(self, ctx):
         """Unhide all channels"""
-        success = 0
-        failed = 0
-        
-        for channel in ctx.guild.text_channels:
-            try:
-                await channel.set_permissions(ctx.guild.default_role, view_channel=None)
-                success += 1
-            except:
-                failed += 1
+        status = await ctx.send(f"Unhiding {len(ctx.guild.text_channels)} channels...")
+        result = await bulk_set_permissions(
+            ctx.guild.text_channels,
+            ctx.guild.default_role,
+            progress=self._progress_reporter(status, "Unhiding"),
+            view_channel=None
+        )
                 
         embed = discord.Embed(
             title="All Channels Unhidden",
-            description=f"Successfully unhidden {success} channels.\nFailed to unhide {failed} channels.",
+            description=f"Successfully unhidden {result.succeeded} channels.\nFailed to unhide {len(result.failed)} channels.",
             color=discord.Color.blue()
         )
+        if result.failed:
+            embed.add_field(name="Failures", value=result.failure_summary(), inline=False)
         embed.set_footer(text="Developed By Lickzy")
-        await ctx.send(embed=embed)
+        await status.edit(content=None, embed=embed)
 
     @commands.command()
     @commands.has_permissions(manage_roles=True)
@@ -476,6 +620,19 @@ class Moderation(commands.Cog):
     @commands.has_permissions(manage_messages=True)
     async def mute(self, ctx, member: discord.Member, *, reason: str = "No reason provided"):
         """Mute a member"""
+        await self._mute(ctx, member, reason)
+
+    @commands.command()
+    @commands.has_permissions(manage_messages=True)
+    async def tempmute(self, ctx, member: discord.Member, duration: str, *, reason: str = "No reason provided"):
+        """Mute a member for a duration (e.g. 10m, 1h, 1d)"""
+        delta = parse_duration(duration)
+        if not delta:
+            await ctx.send("Invalid duration format! Use s/m/h/d/w (e.g. 10m, 1h)")
+            return
+        await self._mute(ctx, member, reason, until=datetime.utcnow() + delta)
+
+    async def _mute(self, ctx, member: discord.Member, reason: str, until: Optional[datetime] = None):
         muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
         
         if not muted_role:
@@ -489,24 +646,35 @@ class Moderation(commands.Cog):
                     )
                 )
                 
-                for channel in ctx.guild.channels:
-                    await channel.set_permissions(muted_role, send_messages=False, speak=False)
+                await bulk_set_permissions(
+                    ctx.guild.channels,
+                    muted_role,
+                    send_messages=False,
+                    speak=False
+                )
             except discord.Forbidden:
                 await ctx.send("I don't have permission to create a muted role!")
                 return
                 
         try:
-            if muted_role in member.roles:
+            already_muted = muted_role in member.roles
+            # A new mute, timed or not, replaces any pending unmute
+            cancelled = await self._cancel_unmutes(ctx.guild.id, member.id)
+            if already_muted and not cancelled and not until:
                 await ctx.send(f"{member.mention} is already muted!")
                 return
-                
-            await member.add_roles(muted_role, reason=reason)
+
+            if not already_muted:
+                await member.add_roles(muted_role, reason=reason)
             embed = discord.Embed(
-                title="Member Muted",
-                description=f"{member.mention} has been muted",
+                title="Mute Updated" if already_muted else "Member Muted",
+                description=f"{member.mention}'s mute has been updated" if already_muted else f"{member.mention} has been muted",
                 color=discord.Color.red()
             )
             embed.add_field(name="Reason", value=reason)
+            if until:
+                await self.bot.scheduler.schedule('unmute', until, ctx.guild.id, user_id=member.id)
+                embed.add_field(name="Expires", value=f"<t:{int(until.replace(tzinfo=timezone.utc).timestamp())}:R>")
             embed.set_footer(text="Developed By Lickzy")
             await ctx.send(embed=embed)
             
@@ -527,6 +695,7 @@ class Moderation(commands.Cog):
             
         try:
             await member.remove_roles(muted_role)
+            await self._cancel_unmutes(ctx.guild.id, member.id)
             embed = discord.Embed(
                 title="Member Unmuted",
                 description=f"{member.mention} has been unmuted",
@@ -5,6 +5,7 @@ from typing import Optional
 import asyncio
 
 from utils.logger import Logger
+from utils.database import PremiumManager
 
 logger = Logger.get_logger()
 
@@ -17,25 +18,13 @@ class Premium(commands.Cog):
     async def grant_premium(self, ctx, member: discord.Member, days: Optional[int] = 30):
         """Grant premium status to a user"""
         try:
-            # Get premium collection
-            premium_collection = self.bot.mongo.discord_bot.premium_users
-            
             # Calculate end date
             end_date = datetime.utcnow() + timedelta(days=days)
             
             # Add or update premium status
-            await premium_collection.update_one(
-                {'user_id': member.id},
-                {
-                    '$set': {
-                        'user_id': member.id,
-                        'granted_by': ctx.author.id,
-                        'granted_at': datetime.utcnow(),
-                        'end_date': end_date
-                    }
-                },
-                upsert=True
-            )
+            if not await PremiumManager.grant_premium(member.id, ctx.author.id, end_date):
+                await ctx.send("Failed to grant premium status.")
+                return
             
             # Add to bot's premium users set
             self.bot.premium_users.add(member.id)
@@ -81,13 +70,8 @@ class Premium(commands.Cog):
     async def revoke_premium(self, ctx, member: discord.Member):
         """Revoke premium status from a user"""
         try:
-            # Get premium collection
-            premium_collection = self.bot.mongo.discord_bot.premium_users
-            
             # Remove from database
-            result = await premium_collection.delete_one({'user_id': member.id})
-            
-            if result.deleted_count > 0:
+            if await PremiumManager.revoke_premium(member.id):
                 # Remove from bot's premium users set
                 self.bot.premium_users.discard(member.id)
                 
@@ -127,11 +111,8 @@ class Premium(commands.Cog):
         member = member or ctx.author
         
         try:
-            # Get premium collection
-            premium_collection = self.bot.mongo.discord_bot.premium_users
-            
             # Get premium status
-            premium_data = await premium_collection.find_one({'user_id': member.id})
+            premium_data = await PremiumManager.get_premium(member.id)
             
             if premium_data:
                 end_date = premium_data['end_date']
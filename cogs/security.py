@@ -1,32 +1,42 @@
 import discord
-from discord.ext import commands
-import json
+from discord.ext import commands, tasks
 import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Set
-from collections import defaultdict, deque
 
 from utils.logger import Logger, SecurityLogger
 from utils.database import SecurityManager
+from utils.content_filter import ContentFilter
+from utils.permissions import bulk_set_permissions
+from utils.security import FingerprintStore, RaidDetector
 
 logger = Logger.get_logger()
 
+# Content filter rule -> (security event type, log description)
+FILTER_EVENTS = {
+    'invite': ("INVITE_LINK", "an invite link"),
+    'link': ("BLOCKED_LINK", "a link that isn't allowlisted"),
+    'blocked_word': ("BLOCKED_WORD", "a blocked word")
+}
+# Members with Manage Server may still post invites and links
+FILTER_EXEMPT_RULES = frozenset({'invite', 'link'})
+
 class Security(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        with open('config.json', 'r') as f:
-            self.config = json.load(f)
+        self.config = bot.config
         
         # Anti-spam settings
-        self.message_history = defaultdict(lambda: deque(maxlen=10))
+        self.fingerprints = FingerprintStore()
         self.spam_cooldown = commands.CooldownMapping.from_cooldown(
             5, 5, commands.BucketType.member
         )
         
         # Anti-raid settings
-        self.join_history = deque(maxlen=100)
-        self.raid_detection_window = timedelta(seconds=10)
-        self.raid_join_threshold = 10
+        self.raid_detector = RaidDetector()
+        
+        # Content filter settings
+        self.content_filter = ContentFilter()
         
         # Cached settings
         self.whitelist = set()
@@ -34,25 +44,67 @@ class Security(commands.Cog):
         self.muted_users = set()
         
         # Load settings
-        self.security_settings = self.config.get('security', {})
+        self._load_settings()
+
+    def _load_settings(self):
+        """Read security settings from the shared config"""
+        self.security_settings = self.config.setdefault('security', {})
         self.anti_spam_enabled = self.security_settings.get('anti_spam', {}).get('enabled', True)
         self.anti_raid_enabled = self.security_settings.get('anti_raid', {}).get('enabled', True)
 
+        spam_settings = self.security_settings.get('anti_spam', {})
+        self.duplicate_threshold = spam_settings.get('duplicate_threshold', 4)
+        self.mute_threshold = spam_settings.get('mute_threshold', 3)
+        self.fingerprints.window = spam_settings.get('duplicate_window', 60)
+        self.fingerprints.near_duplicates = spam_settings.get('near_duplicates', False)
+
+        raid_settings = self.security_settings.get('anti_raid', {})
+        self.raid_detector.default_window = raid_settings.get('window', 10)
+        self.raid_detector.default_threshold = raid_settings.get('threshold', 10)
+        self.raid_detector.overrides.clear()
+        self.raid_detector.windows.clear()
+        for guild_id, guild_settings in raid_settings.get('guilds', {}).items():
+            self.raid_detector.configure(
+                int(guild_id),
+                guild_settings.get('window', self.raid_detector.default_window),
+                guild_settings.get('threshold', self.raid_detector.default_threshold)
+            )
+
+        self.content_filter.configure(self.security_settings.get('content_filter', {}))
+
+    async def cog_load(self):
+        self.bot.scheduler.register('spam_unmute', self._scheduled_spam_unmute)
+        self.evict_idle_guilds.start()
+
+    def cog_unload(self):
+        self.evict_idle_guilds.cancel()
+
+    @tasks.loop(minutes=5)
+    async def evict_idle_guilds(self):
+        """Free join trackers and message fingerprints that have gone quiet"""
+        self.raid_detector.evict_idle()
+        self.fingerprints.evict_expired()
+
+    @commands.Cog.listener()
+    async def on_config_update(self, changed):
+        """Pick up security settings after a config reload"""
+        if 'security' in changed:
+            self._load_settings()
+
     @commands.Cog.listener()
     async def on_member_join(self, member):
         """Handle member joins and raid detection"""
         if not self.anti_raid_enabled:
             return
 
-        current_time = datetime.utcnow()
-        self.join_history.append((member, current_time))
-        
         # Check for raid
-        recent_joins = [j for j, t in self.join_history 
-                       if current_time - t <= self.raid_detection_window]
+        recent_joins = self.raid_detector.record_join(member.guild.id, member.id)
         
-        if len(recent_joins) >= self.raid_join_threshold:
-            await self._handle_raid(member.guild, recent_joins)
+        if recent_joins:
+            suspicious_members = [
+                m for m in map(member.guild.get_member, recent_joins) if m is not None
+            ]
+            await self._handle_raid(member.guild, suspicious_members)
 
     async def _handle_raid(self, guild: discord.Guild, suspicious_members: List[discord.Member]):
         """Handle detected raid"""
@@ -96,11 +148,17 @@ class Security(commands.Cog):
         if message.channel.id in self.ignored_channels:
             return
 
-        # Check for spam
+        # Check for spam: message rate, or the same content repeated across channels
+        duplicates = self.fingerprints.record(
+            message.guild.id,
+            message.author.id,
+            message.content,
+            [(attachment.filename, attachment.size) for attachment in message.attachments]
+        )
         bucket = self.spam_cooldown.get_bucket(message)
         retry_after = bucket.update_rate_limit()
         
-        if retry_after:
+        if retry_after or duplicates >= self.duplicate_threshold:
             await self._handle_spam(message)
             return
 
@@ -114,13 +172,14 @@ class Security(commands.Cog):
             await message.delete()
             
             # Warn or mute repeat offenders
-            spam_count = len(self.message_history[message.author.id])
-            if spam_count >= 3 and message.author.id not in self.muted_users:
+            spam_count = self.fingerprints.flag(message.guild.id, message.author.id)
+            if spam_count >= self.mute_threshold and message.author.id not in self.muted_users:
                 # Mute user
                 muted_role = discord.utils.get(message.guild.roles, name="Muted")
                 if muted_role:
                     await message.author.add_roles(muted_role)
                     self.muted_users.add(message.author.id)
+                    self.fingerprints.forget(message.guild.id, message.author.id)
                     
                     # Log mute action
                     await SecurityLogger.log_security_event(
@@ -130,18 +189,28 @@ class Security(commands.Cog):
                     )
                     
                     # Remove mute after 10 minutes
-                    await asyncio.sleep(600)
-                    if message.author.id in self.muted_users:
-                        await message.author.remove_roles(muted_role)
-                        self.muted_users.remove(message.author.id)
+                    await self.bot.scheduler.schedule(
+                        'spam_unmute',
+                        datetime.utcnow() + timedelta(minutes=10),
+                        message.guild.id,
+                        user_id=message.author.id
+                    )
             
         except Exception as e:
             logger.error(f"Error handling spam: {e}")
 
+    async def _scheduled_spam_unmute(self, action):
+        self.muted_users.discard(action['user_id'])
+        guild = self.bot.get_guild(action['guild_id'])
+        if not guild:
+            return
+        member = await self.bot.get_or_fetch_member(guild, action['user_id'])
+        muted_role = discord.utils.get(guild.roles, name="Muted")
+        if member and muted_role and muted_role in member.roles:
+            await member.remove_roles(muted_role, reason="Spam mute expired")
+
     async def _check_message_content(self, message: discord.Message):
         """Check message content for suspicious patterns"""
-        content = message.content.lower()
-        
         # Check for mass mentions
         if len(message.mentions) > self.security_settings.get('max_mentions', 5):
             await message.delete()
@@ -152,25 +221,27 @@ class Security(commands.Cog):
             )
             return
             
-        # Check for invite links
-        if "discord.gg/" in content and not message.author.guild_permissions.manage_guild:
+        # Check invites, blocked words and links in a single pass
+        skip = FILTER_EXEMPT_RULES if message.author.guild_permissions.manage_guild else frozenset()
+        match = self.content_filter.check(message.guild.id, message.content, skip)
+        if match:
+            event_type, description = FILTER_EVENTS[match.rule]
             await message.delete()
             await SecurityLogger.log_security_event(
                 message.guild,
-                "INVITE_LINK",
-                f"{message.author} posted an invite link"
+                event_type,
+                f"{message.author} posted {description}"
             )
             return
 
     async def _lockdown_server(self, guild: discord.Guild, lock: bool = True):
         """Lock/unlock all channels in the server"""
         try:
-            for channel in guild.channels:
-                if isinstance(channel, discord.TextChannel):
-                    await channel.set_permissions(
-                        guild.default_role,
-                        send_messages=not lock
-                    )
+            await bulk_set_permissions(
+                guild.text_channels,
+                guild.default_role,
+                send_messages=not lock
+            )
             
             action = "Lockdown" if lock else "Unlock"
             await SecurityLogger.log_security_event(
@@ -216,10 +287,9 @@ class Security(commands.Cog):
     async def toggle_antispam(self, ctx, state: bool):
         """Toggle anti-spam system"""
         self.anti_spam_enabled = state
-        self.security_settings['anti_spam']['enabled'] = state
+        self.security_settings.setdefault('anti_spam', {})['enabled'] = state
         
-        with open('config.json', 'w') as f:
-            json.dump(self.config, f, indent=4)
+        await self.config.save()
             
         await ctx.send(f"Anti-spam has been {'enabled' if state else 'disabled'}.")
 
@@ -228,13 +298,49 @@ class Security(commands.Cog):
     async def toggle_antiraid(self, ctx, state: bool):
         """Toggle anti-raid system"""
         self.anti_raid_enabled = state
-        self.security_settings['anti_raid']['enabled'] = state
+        self.security_settings.setdefault('anti_raid', {})['enabled'] = state
         
-        with open('config.json', 'w') as f:
-            json.dump(self.config, f, indent=4)
+        await self.config.save()
             
         await ctx.send(f"Anti-raid has been {'enabled' if state else 'disabled'}.")
 
+    @security.command(name="raid")
+    @commands.has_permissions(administrator=True)
+    async def raid_settings(self, ctx, window: int, threshold: int):
+        """Set this server's raid window (seconds) and join threshold"""
+        if window < 1 or threshold < 2:
+            await ctx.send("Window must be at least 1 second and threshold at least 2 joins.")
+            return
+
+        self.raid_detector.configure(ctx.guild.id, window, threshold)
+        guilds = self.security_settings.setdefault('anti_raid', {}).setdefault('guilds', {})
+        guilds[str(ctx.guild.id)] = {'window': window, 'threshold': threshold}
+        
+        await self.config.save()
+            
+        await ctx.send(f"Raid detection set to {threshold} joins within {window}s.")
+
+    @security.command(name="blockword")
+    @commands.has_permissions(administrator=True)
+    async def block_word(self, ctx, *, word: str):
+        """Add/remove a blocked word for this server"""
+        filters = self.security_settings.setdefault('content_filter', {})
+        guild_filters = filters.setdefault('guilds', {}).setdefault(str(ctx.guild.id), {})
+        words = guild_filters.setdefault('blocked_words', list(filters.get('blocked_words', [])))
+        
+        word = word.lower()
+        if word in words:
+            words.remove(word)
+            message = f"Removed `{word}` from blocked words."
+        else:
+            words.append(word)
+            message = f"Added `{word}` to blocked words."
+        self.content_filter.invalidate(ctx.guild.id)
+        
+        await self.config.save()
+            
+        await ctx.send(message)
+
     @security.command(name="whitelist")
     @commands.has_permissions(administrator=True)
     async def whitelist_user(self, ctx, user: discord.Member):
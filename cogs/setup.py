@@ -1,21 +1,27 @@
 import discord
 from discord.ext import commands
-import json
 import logging
 from typing import Optional
 
+from utils.logger import LogChannelResolver
+
 logger = logging.getLogger('discord_bot')
 
 class Setup(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        with open('config.json', 'r') as f:
-            self.config = json.load(f)
+        self.config = bot.config
 
     def cog_check(self, ctx):
         """Check if user is bot owner"""
         return ctx.author.id in self.config.get('owner_ids', [])
 
+    def _store_log_channels(self, guild: discord.Guild, channels: dict):
+        """Record log channel IDs for a guild and refresh the resolver"""
+        log_channels = self.config.setdefault('log_channels', {})
+        log_channels.setdefault(str(guild.id), {}).update(channels)
+        LogChannelResolver.configure(log_channels)
+
     @commands.group(invoke_without_command=True)
     async def setup(self, ctx):
         """Setup command group"""
@@ -67,9 +73,8 @@ class Setup(commands.Cog):
                 logger.info(f"Created {channel_name} channel: {channel.id}")
 
             # Update config with new channel IDs
-            self.config['log_channels'] = created_channels
-            with open('config.json', 'w') as f:
-                json.dump(self.config, f, indent=4)
+            self._store_log_channels(ctx.guild, created_channels)
+            await self.config.save()
 
             # Create success embed
             embed = discord.Embed(
@@ -155,6 +160,7 @@ class Setup(commands.Cog):
             return
 
         try:
+            repaired_channels = {}
             for channel_name in missing_channels:
                 channel = await ctx.guild.create_text_channel(
                     channel_name,
@@ -162,8 +168,12 @@ class Setup(commands.Cog):
                     topic=f"Logs for {channel_name.replace('-', ' ').title()}",
                     reason="Bot setup repair"
                 )
+                repaired_channels[channel_name] = channel.id
                 logger.info(f"Repaired {channel_name} channel: {channel.id}")
 
+            self._store_log_channels(ctx.guild, repaired_channels)
+            await self.config.save()
+
             embed = discord.Embed(
                 title="🔧 Setup Repair Complete",
                 description=f"Repaired {len(missing_channels)} missing channels",
@@ -181,5 +191,23 @@ class Setup(commands.Cog):
             logger.error(f"Error in setup repair: {e}")
             await ctx.send(f"❌ An error occurred: {str(e)}")
 
+    @setup.command(name="reload")
+    async def setup_reload(self, ctx):
+        """Reload config.json and notify cogs of changes"""
+        try:
+            changed = await self.config.reload()
+        except Exception as e:
+            logger.error(f"Error reloading config: {e}")
+            await ctx.send(f"❌ Failed to reload config: {str(e)}")
+            return
+
+        embed = discord.Embed(
+            title="🔄 Config Reloaded",
+            description=", ".join(f"`{key}`" for key in sorted(changed)) if changed else "No changes detected.",
+            color=discord.Color.green()
+        )
+        embed.set_footer(text="Developed By Lickzy")
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(Setup(bot))
\ No newline at end of file
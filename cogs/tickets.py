@@ -1,12 +1,12 @@
 import discord
 from discord.ext import commands
-import json
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, List
 
 from utils.logger import Logger, TicketLogger
 from utils.database import TicketManager
+from utils.scheduler import parse_duration
 
 logger = Logger.get_logger()
 
@@ -248,14 +248,49 @@ class TicketCloseView(discord.ui.View):
 class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        with open('config.json', 'r') as f:
-            self.config = json.load(f)
+        self.config = bot.config
+
+    async def cog_load(self):
+        self.bot.scheduler.register('ticket_close', self._scheduled_close)
+
+    def persistent_views(self) -> List[discord.ui.View]:
+        """Ticket panels and controls that must keep working across restarts"""
+        return [TicketView(), TicketManageView(), TicketCloseView()]
+
+    async def _scheduled_close(self, action):
+        """Close a ticket whose auto-close timer expired"""
+        guild = self.bot.get_guild(action['guild_id'])
+        channel = guild.get_channel(action['channel_id']) if guild else None
+        if not channel or channel.name.startswith("closed-"):
+            return
+
+        await TicketManager.close_ticket(guild.id, channel.id)
+        await TicketLogger.log_ticket_action(
+            guild,
+            "closed",
+            channel.id,
+            "Ticket closed automatically"
+        )
+
+        embed = discord.Embed(
+            title="Ticket Closed",
+            description="Ticket closed automatically",
+            color=discord.Color.red(),
+            timestamp=datetime.utcnow()
+        )
+        embed.set_footer(text="Developed By Lickzy")
+        await channel.send(embed=embed, view=TicketCloseView())
+
+        await channel.edit(
+            name=f"closed-{channel.name}",
+            category=discord.utils.get(guild.categories, name="Closed Tickets")
+        )
 
     @commands.group(invoke_without_command=True)
     @commands.has_permissions(manage_channels=True)
     async def ticket(self, ctx):
         """Ticket system commands"""
-        await ctx.send("Available commands: setup, panel, add, remove")
+        await ctx.send("Available commands: setup, panel, add, remove, autoclose")
 
     @ticket.command(name="setup")
     @commands.has_permissions(administrator=True)
@@ -361,5 +396,29 @@ class Tickets(commands.Cog):
             logger.error(f"Error removing user from ticket: {e}")
             await ctx.send("An error occurred while removing the user!")
 
+    @ticket.command(name="autoclose")
+    @commands.has_permissions(manage_channels=True)
+    async def ticket_autoclose(self, ctx, duration: str):
+        """Close the current ticket after a duration (e.g. 12h, 2d), or 'off'"""
+        if not ctx.channel.name.startswith("ticket-"):
+            await ctx.send("This command can only be used in open ticket channels!")
+            return
+
+        for pending in self.bot.scheduler.find('ticket_close', channel_id=ctx.channel.id):
+            await self.bot.scheduler.cancel(pending['_id'])
+
+        if duration.lower() == "off":
+            await ctx.send("Auto-close disabled for this ticket.")
+            return
+
+        delta = parse_duration(duration)
+        if not delta:
+            await ctx.send("Invalid duration format! Use s/m/h/d/w (e.g. 12h, 2d)")
+            return
+
+        close_at = datetime.utcnow() + delta
+        await self.bot.scheduler.schedule('ticket_close', close_at, ctx.guild.id, channel_id=ctx.channel.id)
+        await ctx.send(f"This ticket will close <t:{int(close_at.replace(tzinfo=timezone.utc).timestamp())}:R>.")
+
 async def setup(bot):
     await bot.add_cog(Tickets(bot))
\ No newline at end of file
@@ -1,15 +1,26 @@
 import discord
 from discord.ext import commands
-import platform
-import psutil
 import time
 from datetime import datetime
 from typing import Optional
 
 from utils.logger import Logger
+from utils.metrics import Metrics
 
 logger = Logger.get_logger()
 
+MAX_SHARD_LINES = 20
+
+def _shard_lines(shards: dict) -> str:
+    """One line per shard: latency, guilds and gateway events per second"""
+    lines = []
+    for shard_id, stats in list(shards.items())[:MAX_SHARD_LINES]:
+        latency = f"{stats['latency'] * 1000:.0f}ms" if stats['latency'] is not None else "n/a"
+        lines.append(f"`#{shard_id}` {latency} · {stats['guilds']} servers · {stats['per_second']:.1f} ev/s")
+    if len(shards) > MAX_SHARD_LINES:
+        lines.append(f"...and {len(shards) - MAX_SHARD_LINES} more")
+    return "\n".join(lines) or "No shards connected"
+
 class Utility(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -28,6 +39,10 @@ class Utility(commands.Cog):
         embed = discord.Embed(title="🏓 Pong!", color=discord.Color.green())
         embed.add_field(name="Bot Latency", value=f"{duration:.2f}ms")
         embed.add_field(name="WebSocket Latency", value=f"{websocket_latency}ms")
+        if self.bot.shard_count and self.bot.shard_count > 1:
+            shard_id = ctx.guild.shard_id if ctx.guild else 0
+            embed.add_field(name=f"Shards ({self.bot.shard_count} total)", value=_shard_lines(self.bot.shard_stats()), inline=False)
+            embed.description = f"This server is on shard {shard_id}"
         embed.set_footer(text="Developed By Lickzy")
         
         await message.edit(content=None, embed=embed)
@@ -88,6 +103,7 @@ class Utility(commands.Cog):
         )
 
         # System info
+        import platform
         embed.add_field(
             name="📊 System",
             value=f"Python: {platform.python_version()}\n"
@@ -104,8 +120,17 @@ class Utility(commands.Cog):
                   f"Commands: {len(self.bot.commands)}",
             inline=True
         )
+
+        shards = self.bot.shard_stats()
+        embed.add_field(
+            name="🧩 Shards",
+            value=f"Running: {len(shards)} of {self.bot.shard_count or 1}\n"
+                  f"Events: {sum(stats['per_second'] for stats in shards.values()):.1f}/s",
+            inline=True
+        )
         
-        # Memory usage
+        # Memory usage; psutil is only imported the first time this runs
+        import psutil
         process = psutil.Process()
         memory_usage = process.memory_info().rss / 1024 / 1024  # Convert to MB
         embed.add_field(
@@ -161,6 +186,9 @@ class Utility(commands.Cog):
         
         # Get member counts
         total_members = guild.member_count
+        # The lean intents profile doesn't chunk at startup; load this guild's members on first use
+        if not guild.chunked:
+            await guild.chunk()
         human_members = len([m for m in guild.members if not m.bot])
         bot_members = len([m for m in guild.members if m.bot])
         
@@ -181,9 +209,8 @@ class Utility(commands.Cog):
         # General info
         embed.add_field(
             name="📊 General",
-            value=f"Owner: {guild.owner.mention}\n"
+            value=f"Owner: <@{guild.owner_id}>\n"
                   f"Created: <t:{int(guild.created_at.timestamp())}:R>\n"
-                  f"Region: {str(guild.region).title()}\n"
                   f"Boost Level: {guild.premium_tier}",
             inline=False
         )
@@ -293,5 +320,132 @@ class Utility(commands.Cog):
         embed.set_footer(text="Developed By Lickzy")
         await ctx.send(embed=embed)
 
+    @staticmethod
+    def _timing_lines(timings: dict, limit: int = 8) -> str:
+        """Busiest entries by total time, one line each"""
+        # Timings exist from registration (listeners) or before_invoke (commands), before any call completes
+        completed = [(name, timing) for name, timing in timings.items() if timing.total.count]
+        busiest = sorted(completed, key=lambda item: item[1].total.sum, reverse=True)[:limit]
+        lines = []
+        for name, timing in busiest:
+            total = timing.total
+            line = (
+                f"`{name}` {total.count}x p50 {total.quantile(0.5):g}ms p95 {total.quantile(0.95):g}ms"
+                f" | rest {timing.rest.sum / total.count:.0f} db {timing.db.sum / total.count:.0f}"
+                f" cpu {timing.cpu.sum / total.count:.0f}ms"
+            )
+            if timing.errors:
+                line += f" | {timing.errors} err"
+            if timing.in_flight:
+                line += f" | {timing.in_flight} running"
+            lines.append(line)
+        return "\n".join(lines)[:1024] or "No data yet"
+
+    @commands.command()
+    @commands.is_owner()
+    async def stats(self, ctx):
+        """Show command/listener latency broken down into REST, DB and CPU time"""
+        embed = discord.Embed(
+            title="📊 Runtime Stats",
+            description="Mean rest/db/cpu per call; cpu includes time waiting for the event loop",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="Commands", value=self._timing_lines(Metrics.commands), inline=False)
+        embed.add_field(name="Listeners", value=self._timing_lines(Metrics.listeners), inline=False)
+
+        rest = Metrics.rest
+        embed.add_field(
+            name="Discord API",
+            value=f"{rest.count} requests\np50 {rest.quantile(0.5):g}ms p95 {rest.quantile(0.95):g}ms",
+            inline=True
+        )
+        db_calls = sum(histogram.count for histogram in Metrics.db.values())
+        db_time = sum(histogram.sum for histogram in Metrics.db.values())
+        embed.add_field(
+            name="MongoDB",
+            value=f"{db_calls} commands, {Metrics.db_errors} failed\n"
+                  f"mean {db_time / db_calls if db_calls else 0:.1f}ms",
+            inline=True
+        )
+        embed.set_footer(text="Developed By Lickzy")
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.is_owner()
+    async def looplag(self, ctx):
+        """Show event loop lag and the most recent stalls"""
+        monitor = self.bot.loop_monitor
+        lag = monitor.lag
+        embed = discord.Embed(
+            title="⏳ Event Loop Lag",
+            description=(
+                f"p50 {lag.quantile(0.5):g}ms • p95 {lag.quantile(0.95):g}ms • "
+                f"p99 {lag.quantile(0.99):g}ms • max {lag.max:.0f}ms\n"
+                f"{monitor.stall_count} stalls over {monitor.stall_threshold * 1000:.0f}ms"
+                f"{'' if monitor.debug else ' (enable loop_monitor.debug for stack traces)'}"
+            ),
+            color=discord.Color.orange() if monitor.stall_count else discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+        for stall in list(monitor.stalls)[-5:]:
+            stack = "".join(stall.stack[-3:]) if stall.stack else "No stack captured"
+            embed.add_field(
+                name=f"{stall.duration * 1000:.0f}ms at <t:{int(stall.timestamp)}:T>",
+                value=f"```py\n{stack[-1000:]}```",
+                inline=False
+            )
+        embed.set_footer(text="Developed By Lickzy")
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.is_owner()
+    async def cluster(self, ctx):
+        """Show every worker process when running under launcher.py"""
+        if self.bot.cluster is None:
+            await ctx.send("This bot is not running as a cluster.")
+            return
+        try:
+            workers = await self.bot.cluster.broadcast('stats')
+        except Exception as e:
+            await ctx.send(f"Cluster request failed: {e}")
+            return
+
+        embed = discord.Embed(title="🖧 Cluster", color=discord.Color.blue(), timestamp=datetime.utcnow())
+        for index, stats in sorted(workers.items(), key=lambda item: int(item[0]))[:25]:
+            if 'error' in stats:
+                embed.add_field(name=f"Worker {index}", value=f"❌ {stats['error']}", inline=False)
+                continue
+            shards = stats['shard_stats']
+            latencies = [shard['latency'] for shard in shards.values() if shard['latency'] is not None]
+            embed.add_field(
+                name=f"Worker {index} • shards {stats['shards'][0]}-{stats['shards'][-1]}",
+                value=f"pid {stats['pid']} • {stats['guilds']} servers • {stats['memory_mb']} MB\n"
+                      f"latency {sum(latencies) / len(latencies) * 1000 if latencies else 0:.0f}ms • "
+                      f"{sum(shard['per_second'] for shard in shards.values()):.1f} ev/s",
+                inline=False
+            )
+        embed.set_footer(text="Developed By Lickzy")
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.is_owner()
+    async def clusterreload(self, ctx, extension: str):
+        """Reload an extension on every worker in the cluster"""
+        if self.bot.cluster is None:
+            await ctx.send("This bot is not running as a cluster.")
+            return
+        extension = extension if extension.startswith('cogs.') else f"cogs.{extension}"
+        try:
+            workers = await self.bot.cluster.broadcast('reload', extension=extension)
+        except Exception as e:
+            await ctx.send(f"Cluster request failed: {e}")
+            return
+        lines = [
+            f"Worker {index}: " + (f"❌ {result['error']}" if isinstance(result, dict) and 'error' in result else "✅")
+            for index, result in sorted(workers.items(), key=lambda item: int(item[0]))
+        ]
+        await ctx.send(f"Reloaded `{extension}`\n" + "\n".join(lines))
+
 async def setup(bot):
     await bot.add_cog(Utility(bot))
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""Run the bot as a cluster of worker processes.
+
+    python launcher.py [--workers 2] [--shards 4] [--gateway http://127.0.0.1:8765]
+    python launcher.py --status
+
+Each worker is its own process running an AutoShardedBot over a contiguous
+range of shards, so event handling scales past one CPU core and a crash only
+takes down that worker's shards. The launcher starts workers one after
+another (each once the previous one is READY, so IDENTIFYs stay ordered),
+restarts any that exit with exponential backoff, and serves the cluster IPC
+socket used by the owner-only cluster commands and by --status.
+
+Settings come from the 'cluster' config section (workers, socket,
+startup_timeout, min_backoff, max_backoff, stable_after) and
+sharding.shard_count; command-line flags override them. --gateway points
+the workers at scripts/fake_gateway.py instead of Discord.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import List, Optional
+
+from utils.cluster import ClusterClient, ClusterServer, split_shards
+from utils.config import Config
+from utils.logger import Logger
+
+logger = Logger.get_logger()
+
+# Worker exit code for settings that no restart will fix (EX_CONFIG)
+CONFIG_ERROR = 78
+
+def use_gateway(url: str):
+    """Send the worker's REST and gateway traffic to url instead of Discord"""
+    import yarl
+    from discord.gateway import DiscordWebSocket
+    from discord.http import Route
+
+    url = url.rstrip('/')
+    Route.BASE = f"{url}/api/v10"
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(url.replace('http', 'ws', 1) + '/gateway')
+
+def run_worker(worker: int, shard_count: int, shard_ids: List[int], socket_path: str, gateway: Optional[str]):
+    """Entry point of a worker process"""
+    # Keep the terminal's Ctrl+C away from workers; the launcher forwards a single SIGINT
+    os.setpgrp()
+    if gateway:
+        use_gateway(gateway)
+
+    import main
+
+    try:
+        config = main.load_config()
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.error(f"Could not load config.json: {e}")
+        Logger.shutdown()
+        sys.exit(CONFIG_ERROR)
+
+    # Workers rotating the same file would clobber each other's logs
+    logging_settings = config.get('logging', {})
+    filename = logging_settings.get('filename', Logger.DEFAULTS['filename'])
+    root, extension = os.path.splitext(filename)
+    Logger.configure({**logging_settings, 'filename': f"{root}-worker{worker}{extension}"})
+
+    try:
+        bot = main.create_bot(config, shard_count=shard_count, shard_ids=shard_ids)
+    except ValueError as e:
+        logger.error(f"Invalid config: {e}")
+        Logger.shutdown()
+        sys.exit(CONFIG_ERROR)
+    bot.cluster = ClusterClient(socket_path, worker, shard_ids)
+    bot.run()
+
+class Worker:
+    """One worker process and its restart state"""
+
+    __slots__ = ('index', 'shards', 'process', 'started_at', 'failures', 'restart_at')
+
+    def __init__(self, index: int, shards: List[int]):
+        self.index = index
+        self.shards = shards
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at: Optional[float] = None
+
+    @property
+    def label(self) -> str:
+        return f"worker {self.index} (shards {self.shards[0]}-{self.shards[-1]})"
+
+class Supervisor:
+    def __init__(
+        self,
+        shard_count: int,
+        workers: int,
+        socket_path: str = 'cluster.sock',
+        gateway: Optional[str] = None,
+        startup_timeout: float = 120.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 300.0
+    ):
+        self.shard_count = shard_count
+        self.socket_path = socket_path
+        self.gateway = gateway
+        self.startup_timeout = startup_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        # A worker that stayed up this long has its backoff reset
+        self.stable_after = stable_after
+        self.server = ClusterServer(socket_path)
+        self.workers = [Worker(index, shards) for index, shards in enumerate(split_shards(shard_count, workers))]
+        # spawn, not fork: each worker builds its own event loop, sockets and logging thread
+        self._context = multiprocessing.get_context('spawn')
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stopping.set)
+
+        await self.server.start()
+        logger.info(f"Starting {len(self.workers)} workers for {self.shard_count} shards")
+        try:
+            for worker in self.workers:
+                if self._stopping.is_set():
+                    break
+                self._spawn(worker)
+                await self._wait_ready(worker)
+
+            while not self._stopping.is_set():
+                self._check_workers()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._shutdown()
+
+    def _spawn(self, worker: Worker):
+        self.server.ready_event(worker.index).clear()
+        worker.process = self._context.Process(
+            target=run_worker,
+            args=(worker.index, self.shard_count, worker.shards, self.socket_path, self.gateway),
+            name=f"worker-{worker.index}"
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        logger.info(f"Started {worker.label} as pid {worker.process.pid}")
+
+    async def _wait_ready(self, worker: Worker):
+        ready = self.server.ready_event(worker.index)
+        deadline = time.monotonic() + self.startup_timeout
+        while not ready.is_set() and worker.process.is_alive() and not self._stopping.is_set():
+            if time.monotonic() > deadline:
+                logger.warning(f"{worker.label} not ready after {self.startup_timeout:.0f}s, starting the next worker")
+                return
+            try:
+                await asyncio.wait_for(ready.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.restart_at is not None:
+                if now >= worker.restart_at:
+                    self._spawn(worker)
+                continue
+            if worker.process is None or worker.process.is_alive():
+                continue
+
+            if worker.process.exitcode == CONFIG_ERROR:
+                logger.error(f"{worker.label} exited with an invalid config, not restarting it")
+                worker.process = None
+                if all(other.process is None for other in self.workers):
+                    self._stopping.set()
+                continue
+
+            uptime = now - worker.started_at
+            if uptime >= self.stable_after:
+                worker.failures = 0
+            delay = min(self.max_backoff, self.min_backoff * 2 ** worker.failures)
+            worker.failures += 1
+            worker.restart_at = now + delay
+            logger.warning(
+                f"{worker.label} exited with code {worker.process.exitcode} after {uptime:.0f}s, "
+                f"restarting in {delay:.0f}s"
+            )
+
+    async def _shutdown(self, timeout: float = 30.0):
+        """Ask workers to close cleanly (SIGINT), then kill stragglers"""
+        loop = asyncio.get_running_loop()
+        running = [worker for worker in self.workers if worker.process and worker.process.is_alive()]
+        for worker in running:
+            os.kill(worker.process.pid, signal.SIGINT)
+        for worker in running:
+            await loop.run_in_executor(None, worker.process.join, timeout)
+            if worker.process.is_alive():
+                logger.warning(f"{worker.label} did not exit in {timeout:.0f}s, killing it")
+                worker.process.kill()
+        await self.server.stop()
+        logger.info("Cluster stopped")
+
+async def print_status(socket_path: str) -> int:
+    client = ClusterClient(socket_path)
+    try:
+        await client.start()
+        workers = await client.broadcast('stats')
+    except (OSError, asyncio.TimeoutError) as e:
+        print(f"Could not reach the launcher at {socket_path}: {e}")
+        return 1
+    finally:
+        await client.close()
+
+    for index, stats in sorted(workers.items(), key=lambda item: int(item[0])):
+        if 'error' in stats:
+            print(f"worker {index}: {stats['error']}")
+            continue
+        rate = sum(shard['per_second'] for shard in stats['shard_stats'].values())
+        print(
+            f"worker {index}: pid {stats['pid']}, shards {stats['shards']}, {stats['guilds']} guilds, "
+            f"{stats['memory_mb']} MB, {rate:.1f} events/s, up {stats['uptime']:.0f}s"
+        )
+        for shard_id, shard in stats['shard_stats'].items():
+            print(f"  shard {shard_id}: {json.dumps(shard)}")
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, help="worker processes (default: cluster.workers or CPU count)")
+    parser.add_argument("--shards", type=int, help="total shard count (default: sharding.shard_count)")
+    parser.add_argument("--socket", help="IPC socket path (default: cluster.socket or cluster.sock)")
+    parser.add_argument("--gateway", help="base URL of a fake gateway, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--status", action="store_true", help="print stats from a running cluster and exit")
+    args = parser.parse_args()
+
+    try:
+        config = Config('config.json')
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logger.error(f"Could not load config.json: {e}")
+        return 1
+
+    settings = config.get('cluster', {})
+    socket_path = args.socket or settings.get('socket', 'cluster.sock')
+    if args.status:
+        return asyncio.run(print_status(socket_path))
+
+    workers = args.workers or settings.get('workers') or os.cpu_count() or 1
+    shard_count = args.shards or config.get('sharding', {}).get('shard_count') or workers
+    try:
+        supervisor = Supervisor(
+            shard_count,
+            workers,
+            socket_path=socket_path,
+            gateway=args.gateway,
+            startup_timeout=settings.get('startup_timeout', 120.0),
+            min_backoff=settings.get('min_backoff', 1.0),
+            max_backoff=settings.get('max_backoff', 60.0),
+            stable_after=settings.get('stable_after', 300.0)
+        )
+    except ValueError as e:
+        logger.error(f"Invalid cluster settings: {e}")
+        return 1
+
+    asyncio.run(supervisor.run())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
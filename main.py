@@ -1,101 +1,429 @@
+import time
+
+# Measured before the heavy imports below so the startup report includes them
+STARTED = time.perf_counter()
+
 import discord
 from discord.ext import commands, tasks
+import ast
+import graphlib
 import json
+import math
 import os
-import logging
+import sys
 from datetime import datetime
 import asyncio
-import motor.motor_asyncio
-from typing import Optional, Dict, List
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
+
+from utils.config import Config
+from utils.database import Database
+from utils.scheduler import ActionScheduler
+from utils.logger import EventSink, Logger, LogChannelResolver, LogDelivery
+from utils.metrics import Metrics, MetricsServer, PrometheusWriter, instrument_http, timed_listener
+from utils.loop_monitor import LoopMonitor
+from utils.sharding import GatewayEvents, parse_shard_settings, shard_for
+from utils.startup import StartupProfiler
+
+if TYPE_CHECKING:
+    # Only cluster workers use it, and launcher.py creates it
+    from utils.cluster import ClusterClient
+
+startup = StartupProfiler(STARTED)
+startup.record('import', time.perf_counter() - STARTED)
 
 # Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('discord_bot.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger('discord_bot')
-
-# Load configuration
-try:
-    with open('config.json', 'r') as config_file:
-        config = json.load(config_file)
-except FileNotFoundError:
-    logger.error("config.json not found!")
-    exit(1)
-except json.JSONDecodeError:
-    logger.error("config.json is invalid!")
-    exit(1)
+logger = Logger.get_logger()
+
+def load_config(path: str = 'config.json') -> Config:
+    """Load config.json; raises FileNotFoundError or json.JSONDecodeError.
+
+    Called by whoever starts the bot (main(), launcher workers, scripts)
+    rather than at import time, so importing this module never exits.
+    """
+    started = time.perf_counter()
+    config = Config(path)
+    startup.record('config', time.perf_counter() - started)
+    return config
 
 # Initialize status index
 status_index = 0
 
+def declared_dependencies(extension: str) -> Tuple[str, ...]:
+    """An extension's DEPENDS_ON, read from its source without importing it"""
+    path = extension.replace('.', os.sep) + '.py'
+    try:
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError):
+        # load_extension reports the real problem
+        return ()
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == 'DEPENDS_ON' for target in node.targets):
+            try:
+                return tuple(ast.literal_eval(node.value))
+            except ValueError:
+                logger.warning(f"{extension} has a DEPENDS_ON that isn't a literal; ignoring it")
+    return ()
+
+def extension_waves(names: List[str], dependencies: Dict[str, Tuple[str, ...]]) -> List[List[str]]:
+    """Group extensions so each group only depends on earlier groups.
+
+    Unknown dependencies are ignored with a warning. A cycle is logged and
+    everything still waiting loads together in a final group.
+    """
+    sorter = graphlib.TopologicalSorter()
+    for name in names:
+        known = []
+        for dependency in dependencies.get(name, ()):
+            if dependency in names:
+                known.append(dependency)
+            else:
+                logger.warning(f"{name} depends on unknown extension {dependency}")
+        sorter.add(name, *known)
+
+    try:
+        sorter.prepare()
+    except graphlib.CycleError as e:
+        logger.error(f"Extension dependency cycle {' -> '.join(e.args[1])}; loading without ordering")
+        return [names]
+
+    waves = []
+    while sorter.is_active():
+        wave = sorted(sorter.get_ready())
+        waves.append(wave)
+        sorter.done(*wave)
+    return waves
+
 class CustomBot(commands.Bot):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, config: Config, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.mongo = None
         self.config = config
+        self.config.add_listener(lambda changed: self.dispatch('config_update', changed))
+        Database.use_config(self.config)
         self.premium_users = set()
         self.badge_cache = {}
         self.uptime = None
+        self.scheduler = ActionScheduler(self)
+        self.metrics_server = None
+        self.loop_monitor = LoopMonitor(**self.config.get('loop_monitor', {}))
+        self.gateway_events = GatewayEvents()
+        # Set by launcher.py when this process is one worker of a cluster
+        self.cluster: Optional['ClusterClient'] = None
+        self.startup = startup
+        self._imported_at: Dict[str, float] = {}
+        self._gateway_started = None
+        self._timed_listeners = {}
+        self.before_invoke(self._start_command_timer)
+        self.after_invoke(self._stop_command_timer)
 
     async def setup_hook(self):
         """Setup additional features when the bot starts"""
         self.uptime = datetime.utcnow()
+        instrument_http(self.http)
+        self.gateway_events.instrument(self._connection.parsers, lambda: self.shard_count)
+        self.loop_monitor.start()
         
         # Connect to MongoDB
         try:
-            # Skip MongoDB connection for now since it's not critical for core functionality
-            logger.warning("Skipping MongoDB connection - will run with reduced functionality")
+            # MongoDB is not critical for core functionality, so run without it if unavailable
+            with self.startup.phase('db_warmup'):
+                if self.config.get('mongo_uri'):
+                    try:
+                        await Database.connect()
+                    except Exception:
+                        logger.warning("MongoDB unavailable - will run with reduced functionality")
+                    self.mongo = Database.get_client()
+                else:
+                    logger.warning("Skipping MongoDB connection - will run with reduced functionality")
+                Database.configure_write_behind(self.config.get('database', {}).get('write_behind', {}))
+                Database.configure_caches(self.config.get('database', {}).get('cache', {}))
+            LogDelivery.configure(self.config.get('log_delivery', {}))
+            LogChannelResolver.configure(self.config.get('log_channels', {}))
+            EventSink.configure(self.config.get('event_log', {}))
             
             # Load all cogs
-            await self.load_extensions()
+            with self.startup.phase('extensions'):
+                await self.load_extensions()
+
+            # Re-attach persistent views so their buttons keep working after a restart
+            with self.startup.phase('views'):
+                self.register_views()
+
+            # Restore pending timed actions once cogs have registered their handlers
+            self.scheduler.start()
+
+            if self.cluster:
+                self.cluster.register('stats', self._cluster_stats)
+                self.cluster.register('reload', self._cluster_reload)
+                try:
+                    await self.cluster.start()
+                except Exception as e:
+                    logger.error(f"Failed to connect to the cluster launcher: {e}")
+
+            metrics_settings = self.config.get('metrics', {})
+            if metrics_settings.get('enabled'):
+                self.metrics_server = MetricsServer(
+                    metrics_settings.get('host', '127.0.0.1'),
+                    metrics_settings.get('port', 9464)
+                )
+                self.metrics_server.add_provider(lambda: {'loop': self.loop_monitor.snapshot()})
+                self.metrics_server.add_provider(lambda: {'startup': self.startup.snapshot()})
+                self.metrics_server.add_provider(lambda: {'shards': self.shard_stats()})
+                self.metrics_server.add_collector(self._collect_metrics)
+                await self.metrics_server.start()
             
         except Exception as e:
             logger.error(f"Error in setup: {e}")
+        finally:
+            # Everything from here to READY is login, gateway connect and guild streaming
+            self._gateway_started = time.perf_counter()
+
+    async def close(self):
+        """Flush buffered log output and database writes, then close the shared client"""
+        self.scheduler.stop()
+        self.loop_monitor.stop()
+        if self.cluster:
+            await self.cluster.close()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        await LogDelivery.flush()
+        await EventSink.flush()
+        await Database.close()
+        await super().close()
+
+    @property
+    def owned_shards(self) -> Optional[List[int]]:
+        """Shard ids this process connects, or None when it runs all of them"""
+        if getattr(self, 'shard_ids', None):
+            return list(self.shard_ids)
+        if self.shard_id is not None:
+            return [self.shard_id]
+        return None
+
+    def owns_guild(self, guild_id: int) -> bool:
+        """Whether a guild's events are delivered to this process"""
+        shards = self.owned_shards
+        if shards is None or not self.shard_count:
+            return True
+        return shard_for(guild_id, self.shard_count) in shards
+
+    def shard_latencies(self) -> List[Tuple[int, float]]:
+        """(shard_id, heartbeat latency) for every connected shard"""
+        if hasattr(self, 'latencies'):
+            return self.latencies
+        return [(self.shard_id or 0, self.latency)]
+
+    def shard_stats(self) -> Dict[int, Dict[str, float]]:
+        """Latency, guild count and gateway event rate per shard"""
+        guilds: Dict[int, int] = {}
+        for guild in self.guilds:
+            guilds[guild.shard_id] = guilds.get(guild.shard_id, 0) + 1
+        events = self.gateway_events.snapshot()
+        return {
+            shard_id: {
+                'latency': round(latency, 4) if math.isfinite(latency) else None,
+                'guilds': guilds.get(shard_id, 0),
+                **events.get(shard_id, {'events': 0, 'per_second': 0.0})
+            }
+            for shard_id, latency in self.shard_latencies()
+        }
+
+    async def _cluster_stats(self, args: Dict) -> Dict:
+        """This worker's share of the cluster-wide stats"""
+        import psutil
+        return {
+            'pid': os.getpid(),
+            'shards': self.owned_shards,
+            'guilds': len(self.guilds),
+            'members': sum(guild.member_count or 0 for guild in self.guilds),
+            'memory_mb': round(psutil.Process().memory_info().rss / 1024 / 1024, 1),
+            'uptime': (datetime.utcnow() - self.uptime).total_seconds() if self.uptime else 0,
+            'shard_stats': self.shard_stats()
+        }
+
+    async def _cluster_reload(self, args: Dict) -> bool:
+        """Reload one extension on this worker"""
+        await self.reload_extension(args['extension'])
+        return True
+
+    def _collect_metrics(self, writer: PrometheusWriter):
+        """Gateway, cache, scheduler and event loop gauges for /metrics"""
+        if self.is_ready():
+            writer.gauge("bot_gateway_latency_seconds", "Heartbeat round trip", self.latency)
+            shards = self.shard_stats()
+            writer.metric(
+                "bot_shard_latency_seconds", 'gauge', "Heartbeat round trip per shard",
+                [({'shard': str(shard_id)}, stats['latency']) for shard_id, stats in shards.items() if stats['latency'] is not None]
+            )
+            writer.metric(
+                "bot_shard_guilds", 'gauge', "Guilds per shard",
+                [({'shard': str(shard_id)}, stats['guilds']) for shard_id, stats in shards.items()]
+            )
+        writer.metric(
+            "bot_gateway_events_total", 'counter', "Gateway dispatch events received per shard",
+            [({'shard': str(shard_id)}, rate.total) for shard_id, rate in sorted(self.gateway_events.shards.items())]
+        )
+        writer.gauge("bot_guilds", "Guilds the bot is in", len(self.guilds))
+        writer.gauge("bot_members", "Members across all guilds", sum(guild.member_count or 0 for guild in self.guilds))
+        writer.gauge("bot_cached_users", "Users in the client cache", len(self.users))
+        writer.gauge("bot_scheduled_actions", "Timed moderation actions waiting to run", len(self.scheduler))
+
+        writer.histogram("bot_loop_lag_seconds", "Event loop scheduling delay", [({}, self.loop_monitor.lag)])
+        writer.metric("bot_loop_stalls_total", 'counter', "Event loop stalls over the threshold", [({}, self.loop_monitor.stall_count)])
+
+        caches = Database.cache_stats()
+        for field, kind in (('hits', 'counter'), ('misses', 'counter'), ('coalesced', 'counter'), ('evictions', 'counter'), ('size', 'gauge'), ('hit_ratio', 'gauge')):
+            name = f"bot_cache_{field}_total" if kind == 'counter' else f"bot_cache_{field}"
+            writer.metric(name, kind, f"Cache {field.replace('_', ' ')}", [({'cache': cache}, stats[field]) for cache, stats in caches.items()])
+        writer.metric(
+            "bot_db_write_buffer_depth", 'gauge', "Documents waiting in write-behind buffers",
+            [({'collection': name}, len(buffer)) for name, buffer in Database._buffers.items()]
+        )
+
+    def add_listener(self, func, name=discord.utils.MISSING):
+        """Register a listener wrapped with a timer (cog listeners come through here too)"""
+        name = func.__name__ if name is discord.utils.MISSING else name
+        owner = getattr(func, '__self__', None)
+        label = f"{type(owner).__name__}.{func.__name__}" if owner is not None else func.__name__
+        wrapped = timed_listener(func, label)
+        self._timed_listeners[(name, func)] = wrapped
+        super().add_listener(wrapped, name)
+
+    def remove_listener(self, func, name=discord.utils.MISSING):
+        name = func.__name__ if name is discord.utils.MISSING else name
+        super().remove_listener(self._timed_listeners.pop((name, func), func), name)
+
+    async def _start_command_timer(self, ctx):
+        timing = Metrics.command(ctx.command.qualified_name)
+        ctx.metrics_span = Metrics.begin(timing)
+
+    async def _stop_command_timer(self, ctx):
+        span = getattr(ctx, 'metrics_span', None)
+        if span is not None:
+            Metrics.end(Metrics.command(ctx.command.qualified_name), span, ctx.command_failed)
+            ctx.metrics_span = None
 
     async def on_ready(self):
         """Called when the bot is ready"""
         logger.info(f'Logged in as {self.user.name}')
+        if self.startup.mark_ready(self._gateway_started or self.startup.started):
+            logger.info(self.startup.report())
+            EventSink.emit('startup', latency=self.startup.total, details=json.dumps(self.startup.snapshot()))
+            if self.cluster:
+                # The launcher waits for this before starting the next worker's shards
+                try:
+                    await self.cluster.notify_ready()
+                except Exception as e:
+                    logger.error(f"Failed to notify the cluster launcher: {e}")
         # Start status rotation after bot is ready
         self.rotate_status.start()
 
+    async def on_shard_ready(self, shard_id):
+        logger.info(f"Shard {shard_id} is ready")
+
+    async def on_config_update(self, changed):
+        if 'log_channels' in changed:
+            LogChannelResolver.configure(self.config.get('log_channels', {}))
+
+    async def on_guild_channel_create(self, channel):
+        LogChannelResolver.invalidate(channel.guild.id)
+
+    async def on_guild_channel_delete(self, channel):
+        LogChannelResolver.invalidate(channel.guild.id)
+
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name:
+            LogChannelResolver.invalidate(after.guild.id)
+
     @tasks.loop(minutes=5)
     async def rotate_status(self):
         """Rotate the bot's status every 5 minutes"""
         global status_index
-        if not config['rotating_status']:
+        if not self.config['rotating_status']:
             return
         
-        status = config['rotating_status'][status_index]
+        status = self.config['rotating_status'][status_index]
         try:
             await self.change_presence(
                 activity=discord.Game(name=status),
                 status=discord.Status.online
             )
-            status_index = (status_index + 1) % len(config['rotating_status'])
+            status_index = (status_index + 1) % len(self.config['rotating_status'])
         except Exception as e:
             logger.error(f"Failed to update status: {e}")
 
     async def load_extensions(self):
-        """Load all cogs from the cogs directory"""
+        """Load all cogs from the cogs directory in dependency order.
+
+        A cog module can declare the extensions it needs in a top-level
+        DEPENDS_ON tuple. Extensions load in waves: each wave holds every
+        extension whose dependencies have finished, and loads concurrently.
+        Module bodies import synchronously on the event loop, so within a
+        wave only the awaited part of loading (cog_load: DB warm-up, view
+        registration) overlaps.
+        """
         cogs_dir = 'cogs'
         
         if not os.path.exists(cogs_dir):
             os.makedirs(cogs_dir)
             logger.info(f"Created {cogs_dir} directory")
         
-        for filename in os.listdir(cogs_dir):
-            if filename.endswith('.py'):
-                cog_name = f'cogs.{filename[:-3]}'
-                try:
-                    await self.load_extension(cog_name)
-                    logger.info(f'Loaded extension {cog_name}')
-                except Exception as e:
-                    logger.error(f'Failed to load extension {cog_name}: {e}')
+        names = [f'cogs.{filename[:-3]}' for filename in sorted(os.listdir(cogs_dir)) if filename.endswith('.py')]
+
+        async def load(cog_name: str):
+            try:
+                await self.load_extension(cog_name)
+                logger.info(f'Loaded extension {cog_name}')
+            except Exception as e:
+                logger.error(f'Failed to load extension {cog_name}: {e}')
+
+        for wave in extension_waves(names, {name: declared_dependencies(name) for name in names}):
+            await asyncio.gather(*(load(name) for name in wave))
+
+    async def _load_from_module_spec(self, spec, key):
+        # Time the module body separately from setup() for the startup report
+        exec_module = spec.loader.exec_module
+
+        def timed_exec_module(module):
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                self._imported_at[key] = time.perf_counter()
+                self.startup.record_extension(key, 'import', self._imported_at[key] - start)
+
+        spec.loader.exec_module = timed_exec_module
+        await super()._load_from_module_spec(spec, key)
+
+    async def add_cog(self, cog, /, **kwargs):
+        """Add a cog, recording its init and cog_load time for the startup report"""
+        extension = type(cog).__module__
+        constructed = time.perf_counter()
+        imported = self._imported_at.pop(extension, None)
+        if imported is not None:
+            self.startup.record_extension(extension, 'init', constructed - imported)
+
+        start = time.perf_counter()
+        await super().add_cog(cog, **kwargs)
+        if not self.startup.finished:
+            self.startup.record_extension(extension, 'cog_load', time.perf_counter() - start)
+
+    async def get_or_fetch_member(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        """Member from the cache, or from the API when it isn't cached (lean profile)"""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.HTTPException:
+            return None
+
+    def register_views(self):
+        """Register persistent views declared by cogs via persistent_views()"""
+        for cog in self.cogs.values():
+            for view in getattr(cog, 'persistent_views', lambda: [])():
+                self.add_view(view)
 
     async def on_command_error(self, ctx, error):
         """Global error handler for command errors"""
@@ -129,27 +457,92 @@ class CustomBot(commands.Bot):
     def run(self):
         """Run the bot with the token from config"""
         try:
-            super().run(config['token'], reconnect=True)
+            # discord.py's own records already go through the Logger pipeline
+            super().run(self.config['token'], reconnect=True, log_handler=None)
         except discord.LoginFailure:
             logger.error("Failed to login. Check your token in config.json")
         except Exception as e:
             logger.error(f"Failed to run bot: {e}")
 
-# Set up intents
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-intents.presences = True
-intents.guilds = True
-intents.messages = True
-
-# Create bot instance
-bot = CustomBot(
-    command_prefix=commands.when_mentioned_or(config['prefix']),
-    intents=intents,
-    case_insensitive=True,
-    strip_after_prefix=True
-)
+class ShardedCustomBot(CustomBot, commands.AutoShardedBot):
+    """CustomBot running several gateway shards in one process"""
 
-if __name__ == "__main__":
+def gateway_options(profile: str) -> Dict:
+    """Intents and member cache settings for the 'full' or 'lean' profile.
+
+    'lean' turns off the events no cog reads (presences, typing, voice
+    states), caches only members that join or arrive with their guild, and
+    skips chunking at startup; commands that need a guild's full member list
+    chunk it on demand.
+    """
+    # Set up intents
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    intents.guilds = True
+    intents.messages = True
+
+    if profile == 'full':
+        intents.presences = True
+        return {'intents': intents}
+    if profile != 'lean':
+        raise ValueError(f"Unknown intents_profile {profile!r}, expected 'full' or 'lean'")
+
+    intents.presences = False
+    intents.typing = False
+    intents.voice_states = False
+    return {
+        'intents': intents,
+        'member_cache_flags': discord.MemberCacheFlags(voice=False, joined=True),
+        'chunk_guilds_at_startup': False
+    }
+
+def create_bot(config: Config, shard_count: Optional[int] = None, shard_ids: Optional[List[int]] = None) -> CustomBot:
+    """Build the bot from config; sharding.enabled switches to AutoShardedBot.
+
+    shard_count and shard_ids override the config, so a launcher can give
+    each process its own range.
+    """
+    profile = config.get('intents_profile', 'full')
+    options = dict(
+        command_prefix=commands.when_mentioned_or(config['prefix']),
+        case_insensitive=True,
+        strip_after_prefix=True,
+        **gateway_options(profile)
+    )
+    logger.info(f"Using the {profile} intents profile")
+
+    sharding = dict(config.get('sharding', {}))
+    if shard_count is not None:
+        sharding.update(enabled=True, shard_count=shard_count, shard_ids=shard_ids, shard_range=None)
+    if not sharding.get('enabled'):
+        return CustomBot(config, **options)
+
+    count, ids = parse_shard_settings(sharding)
+    logger.info(f"Sharding enabled: {count or 'recommended'} shards, running {ids if ids else 'all'}")
+    return ShardedCustomBot(config, shard_count=count, shard_ids=ids, **options)
+
+def main() -> int:
+    try:
+        config = load_config()
+    except FileNotFoundError:
+        logger.error("config.json not found!")
+        return 1
+    except json.JSONDecodeError:
+        logger.error("config.json is invalid!")
+        return 1
+    if config.get('logging'):
+        Logger.configure(config['logging'])
+
+    try:
+        bot = create_bot(config)
+    except ValueError as e:
+        logger.error(f"Invalid config: {e}")
+        return 1
     bot.run()
+    return 0
+
+# Only build the bot when run directly; launcher.py workers and scripts import
+# this module and create their own with create_bot()
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Microbenchmark for the compiled content filter.
+
+    python scripts/bench_content_filter.py [--messages 100000] [--rate 2000]
+
+Reports the per-message cost of ContentFilter.check on a mixed corpus (plain
+chat, unicode/zalgo text, allowed and blocked links, invites) next to the old
+single substring test, and what share of one core that costs at --rate
+messages per second.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.content_filter import ContentFilter
+
+SAMPLES = [
+    "hey everyone, what's up?",
+    "did anyone finish the raid last night? we wiped on the last boss like 6 times lol",
+    "check this out https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "join my server discord.gg/abcdef",
+    "free nitro at https://disc0rd-gift.example.com/claim",
+    "Ｈｅｌｌｏ ｆｒｉｅｎｄｓ",
+    "h̸̢̛e̶̡͝l̷͎̓l̵̰͝o̷̧͛ z̴̛͎a̷̰͠l̸̨̛g̵̱͝o̶̢͠",
+    "dіscord . gg / spam",
+    "ok",
+    "this message contains a badword in the middle of a longer sentence " * 3
+]
+
+
+def build_corpus(size: int):
+    rng = random.Random(1234)
+    return [rng.choice(SAMPLES) for _ in range(size)]
+
+
+def bench(label: str, func, corpus, rate: int):
+    start = time.perf_counter()
+    hits = sum(1 for message in corpus if func(message))
+    elapsed = time.perf_counter() - start
+    per_message = elapsed / len(corpus)
+    print(
+        f"{label:<24} {per_message * 1e6:8.2f} us/msg  "
+        f"{1 / per_message:12,.0f} msg/s  "
+        f"{per_message * rate * 100:6.2f}% of a core at {rate:,} msg/s  "
+        f"({hits:,} matches)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--rate", type=int, default=2000, help="expected messages per second")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages)
+    content_filter = ContentFilter({
+        'blocked_words': ['badword', 'slur1', 'slur2', 'scam'],
+        'link_allowlist': ['youtube.com', 'twitch.tv', 'github.com']
+    })
+    compiled = content_filter.for_guild(0)
+
+    bench("substring (old)", lambda m: "discord.gg/" in m.lower(), corpus, args.rate)
+    bench("ContentFilter.check", lambda m: compiled.check(m), corpus, args.rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Apply the index registry and flag any manager query that still scans a collection.
+
+Run from the repository root (it reads config.json from there):
+
+    python scripts/check_indexes.py
+
+Exits with status 1 if any query plan contains a COLLSCAN stage.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import Config
+from utils.database import Database
+
+
+async def main() -> int:
+    # connect() applies the index registry
+    await Database.connect(Config('config.json'))
+    report = await Database.explain_queries()
+
+    width = max(len(entry['query']) for entry in report)
+    for entry in report:
+        status = "COLLSCAN" if entry['collscan'] else "ok"
+        print(f"{entry['query']:<{width}}  {status:<8}  {' <- '.join(entry['stages'])}")
+
+    scans = [entry['query'] for entry in report if entry['collscan']]
+    if scans:
+        print(f"\n{len(scans)} queries fall back to a collection scan")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
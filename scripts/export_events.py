@@ -0,0 +1,94 @@
+"""Convert rotated NDJSON event logs to compressed Parquet for offline queries.
+
+    python scripts/export_events.py [--source logs/events] [--dest logs/events/parquet]
+                                    [--include-today] [--force] [--delete]
+
+Each events-YYYYMMDD.ndjson file written by utils.logger.EventSink becomes
+events-YYYYMMDD.parquet (zstd) with a fixed schema, so the whole history can
+be queried with pyarrow, pandas, DuckDB or Polars, e.g.
+
+    duckdb -c "select action, count(*) from 'logs/events/parquet/*.parquet' group by 1"
+
+Today's file is still being appended to and is skipped unless --include-today.
+Requires pyarrow (pip install pyarrow).
+"""
+import argparse
+import glob
+import os
+import sys
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+SCHEMA_FIELDS = [
+    ("ts", "float64"),
+    ("guild", "int64"),
+    ("actor", "int64"),
+    ("target", "int64"),
+    ("action", "string"),
+    ("cog", "string"),
+    ("latency_ms", "float64"),
+    ("details", "string")
+]
+
+
+def schema():
+    return pa.schema([(name, pa.type_for_alias(kind)) for name, kind in SCHEMA_FIELDS])
+
+
+def convert(source: str, dest: str):
+    table = pa_json.read_json(
+        source,
+        parse_options=pa_json.ParseOptions(explicit_schema=schema(), unexpected_field_behavior="ignore")
+    )
+    # Store the event time as a proper timestamp column
+    micros = pc.cast(pc.multiply(table["ts"], 1_000_000), pa.int64(), safe=False)
+    table = table.set_column(0, "ts", micros.cast(pa.timestamp("us", tz="UTC")))
+    pq.write_table(table, dest, compression="zstd")
+    return table.num_rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.path.join("logs", "events"))
+    parser.add_argument("--dest", default=os.path.join("logs", "events", "parquet"))
+    parser.add_argument("--include-today", action="store_true", help="also convert today's (incomplete) file")
+    parser.add_argument("--force", action="store_true", help="overwrite files that were already converted")
+    parser.add_argument("--delete", action="store_true", help="remove each NDJSON file after converting it")
+    args = parser.parse_args()
+
+    if pa is None:
+        print("pyarrow is required: pip install pyarrow", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.dest, exist_ok=True)
+    today = f"events-{datetime.utcnow().strftime('%Y%m%d')}.ndjson"
+
+    converted = 0
+    for source in sorted(glob.glob(os.path.join(args.source, "events-*.ndjson"))):
+        name = os.path.basename(source)
+        if name == today and not args.include_today:
+            continue
+        dest = os.path.join(args.dest, name.replace(".ndjson", ".parquet"))
+        if os.path.exists(dest) and not args.force:
+            continue
+
+        rows = convert(source, dest)
+        ratio = os.path.getsize(source) / max(1, os.path.getsize(dest))
+        print(f"{name}: {rows:,} events -> {os.path.basename(dest)} ({ratio:.1f}x smaller)")
+        converted += 1
+        if args.delete and name != today:
+            os.remove(source)
+
+    print(f"Converted {converted} file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""Local stand-in for Discord's REST API and gateway.
+
+Lets the bot, or a whole launcher.py cluster, run on one machine with no
+token or network access:
+
+    python scripts/fake_gateway.py [--port 8765] [--guilds 200] [--members 50] [--rate 50]
+    python launcher.py --workers 2 --shards 4 --gateway http://127.0.0.1:8765
+
+It answers login and /gateway/bot, gives each IDENTIFY the guilds that
+belong to its shard, acks heartbeats and member chunk requests, and then
+streams synthetic MESSAGE_CREATE events (--spam of them repeated spam) and
+the occasional GUILD_MEMBER_ADD at --rate messages per second per shard.
+Every other REST call gets an empty success response.
+
+Like Discord, it honours the identified intents: PRESENCE_UPDATE
+(--presences per message) and TYPING_START (--typing per message) are only
+sent to shards that asked for them, and GUILD_CREATE only carries the full
+member list when presences are on and the guild is under large_threshold.
+The event mix is a harness parameter, not a measurement of real traffic.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+DISCORD_EPOCH = 1420070400000
+BOT_ID = 1 << 22
+OWNER_ID = 2 << 22
+GUILD_PRESENCES = 1 << 8
+GUILD_MESSAGE_TYPING = 1 << 11
+CHUNK_SIZE = 1000
+WORDS = "the a raid giveaway ticket server today later nice cool thanks anyone here help please what when".split()
+SPAM = "FREE NITRO claim it now before it expires discord-gift.example/claim"
+
+_sequence = itertools.count()
+
+
+def snowflake() -> int:
+    return ((int(time.time() * 1000) - DISCORD_EPOCH) << 22) | (next(_sequence) & 0x3FFFFF)
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def user(user_id: int, name: str, bot: bool = False) -> dict:
+    return {'id': str(user_id), 'username': name, 'discriminator': '0', 'global_name': None, 'avatar': None, 'bot': bot}
+
+
+def member(user_data: dict) -> dict:
+    return {'user': user_data, 'roles': [], 'joined_at': now_iso(), 'deaf': False, 'mute': False, 'flags': 0}
+
+
+def json_response(data, status: int = 200) -> web.Response:
+    # discord.py only decodes bodies whose content type is exactly application/json (no charset)
+    return web.Response(body=json.dumps(data).encode(), status=status, content_type='application/json')
+
+
+class FakeDiscord:
+    def __init__(
+        self, host: str, port: int, guilds: int, members: int, rate: float, spam: float,
+        presences: float = 0.0, typing: float = 0.0
+    ):
+        self.url = f"http://{host}:{port}"
+        self.rate = rate
+        self.spam = spam
+        self.presences = presences
+        self.typing = typing
+        self.bot_user = user(BOT_ID, 'fake-bot', bot=True)
+        self.users = [user((1000 + n) << 22, f"user{n}") for n in range(members)]
+        self.guild_ids = [(10 ** 6 + n) << 22 for n in range(guilds)]
+        self.sent = {}
+        self.joins = itertools.count(10 ** 6)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/api/v10/users/@me', self.current_user)
+        app.router.add_get('/api/v10/oauth2/applications/@me', self.application)
+        app.router.add_get('/api/v10/gateway/bot', self.gateway_bot)
+        app.router.add_get('/api/v10/gateway', self.gateway_url)
+        app.router.add_post('/api/v10/channels/{channel_id}/messages', self.create_message)
+        app.router.add_get('/gateway', self.gateway)
+        app.router.add_route('*', '/api/v10/{tail:.*}', self.fallback)
+        return app
+
+    @property
+    def ws_url(self) -> str:
+        return self.url.replace('http', 'ws', 1) + '/gateway'
+
+    async def current_user(self, request):
+        return json_response(self.bot_user)
+
+    async def gateway_url(self, request):
+        return json_response({'url': self.ws_url})
+
+    async def application(self, request):
+        return json_response({
+            'id': str(BOT_ID), 'name': 'fake-bot', 'description': '', 'icon': None,
+            'bot_public': True, 'bot_require_code_grant': False, 'verify_key': '',
+            'owner': user(OWNER_ID, 'owner'), 'team': None, 'flags': 0
+        })
+
+    async def gateway_bot(self, request):
+        return json_response({
+            'url': self.ws_url,
+            'shards': max(1, len(self.guild_ids) // 1000),
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0, 'max_concurrency': 1}
+        })
+
+    async def create_message(self, request):
+        body = await request.json() if request.can_read_body else {}
+        channel_id = int(request.match_info['channel_id'])
+        return json_response(self.message(channel_id, channel_id - 1, self.bot_user, body.get('content') or ''))
+
+    async def fallback(self, request):
+        if request.method == 'GET':
+            return json_response({'message': 'Unknown', 'code': 0}, status=404)
+        return web.Response(status=204)
+
+    def members(self) -> list:
+        return [member(self.bot_user)] + [member(user_data) for user_data in self.users]
+
+    def presence(self, guild_id: int, user_data: dict) -> dict:
+        status = random.choice(('online', 'idle', 'dnd', 'offline'))
+        return {
+            'user': {'id': user_data['id']}, 'guild_id': str(guild_id), 'status': status,
+            'activities': [{'name': random.choice(WORDS), 'type': 0, 'created_at': int(time.time() * 1000)}],
+            'client_status': {'desktop': status}
+        }
+
+    def guild(self, guild_id: int, intents: int, large_threshold: int) -> dict:
+        member_count = len(self.users) + 1
+        large = member_count > large_threshold
+        members, presences = [member(self.bot_user)], []
+        if intents & GUILD_PRESENCES and not large:
+            members = self.members()
+            presences = [self.presence(guild_id, user_data) for user_data in self.users[::3]]
+        return {
+            'id': str(guild_id), 'name': f"guild-{guild_id >> 22}", 'icon': None, 'owner_id': str(OWNER_ID),
+            'member_count': member_count, 'large': large, 'unavailable': False, 'joined_at': now_iso(),
+            'roles': [{
+                'id': str(guild_id), 'name': '@everyone', 'permissions': '104324673', 'position': 0,
+                'color': 0, 'hoist': False, 'managed': False, 'mentionable': False, 'flags': 0
+            }],
+            'channels': [{
+                'id': str(guild_id + 1), 'type': 0, 'name': 'general', 'position': 0,
+                'permission_overwrites': [], 'guild_id': str(guild_id)
+            }],
+            'members': members, 'presences': presences, 'voice_states': [], 'threads': [], 'emojis': [], 'stickers': [],
+            'features': [], 'stage_instances': [], 'guild_scheduled_events': [], 'premium_tier': 0,
+            'system_channel_flags': 0, 'verification_level': 0, 'explicit_content_filter': 0,
+            'default_message_notifications': 0, 'mfa_level': 0, 'nsfw_level': 0, 'preferred_locale': 'en-US'
+        }
+
+    def message(self, channel_id: int, guild_id: int, author: dict, content: str) -> dict:
+        return {
+            'id': str(snowflake()), 'channel_id': str(channel_id), 'guild_id': str(guild_id),
+            'author': author, 'member': {key: value for key, value in member(author).items() if key != 'user'},
+            'content': content, 'timestamp': now_iso(), 'edited_timestamp': None, 'tts': False,
+            'mention_everyone': False, 'mentions': [], 'mention_roles': [], 'attachments': [],
+            'embeds': [], 'pinned': False, 'type': 0
+        }
+
+    async def gateway(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        sequence = itertools.count(1)
+        traffic = None
+
+        async def dispatch(event: str, data: dict):
+            await ws.send_json({'op': 0, 't': event, 's': next(sequence), 'd': data})
+
+        await ws.send_json({'op': 10, 'd': {'heartbeat_interval': 41250}, 's': None, 't': None})
+        try:
+            async for message in ws:
+                payload = json.loads(message.data)
+                op, data = payload.get('op'), payload.get('d') or {}
+                if op == 1:
+                    # An instant local ack can arrive before discord.py records when it sent the
+                    # heartbeat, which it then reports as huge latency; answer after a short delay
+                    asyncio.get_running_loop().call_later(
+                        0.02, asyncio.ensure_future, ws.send_json({'op': 11, 'd': None, 's': None, 't': None})
+                    )
+                elif op == 2:
+                    shard_id, shard_count = data.get('shard', [0, 1])
+                    intents = data.get('intents', 0)
+                    guilds = [guild_id for guild_id in self.guild_ids if (guild_id >> 22) % shard_count == shard_id]
+                    await dispatch('READY', {
+                        'v': 10, 'user': self.bot_user, 'session_id': f"fake-{shard_id}-{snowflake()}",
+                        'resume_gateway_url': self.ws_url, 'shard': [shard_id, shard_count],
+                        'guilds': [{'id': str(guild_id), 'unavailable': True} for guild_id in guilds],
+                        'application': {'id': str(BOT_ID), 'flags': 0}
+                    })
+                    for guild_id in guilds:
+                        await dispatch('GUILD_CREATE', self.guild(guild_id, intents, data.get('large_threshold', 50)))
+                    print(f"Shard {shard_id}/{shard_count} identified with {len(guilds)} guilds")
+                    if guilds and self.rate > 0:
+                        traffic = asyncio.create_task(self.traffic(dispatch, shard_id, guilds, intents))
+                elif op == 6:
+                    # Resuming is not supported; make the client identify again
+                    await ws.send_json({'op': 9, 'd': False, 's': None, 't': None})
+                elif op == 8:
+                    members = self.members()
+                    chunks = [members[start:start + CHUNK_SIZE] for start in range(0, len(members), CHUNK_SIZE)]
+                    for index, chunk in enumerate(chunks):
+                        await dispatch('GUILD_MEMBERS_CHUNK', {
+                            'guild_id': data['guild_id'], 'members': chunk,
+                            'chunk_index': index, 'chunk_count': len(chunks), 'nonce': data.get('nonce')
+                        })
+        finally:
+            if traffic:
+                traffic.cancel()
+        return ws
+
+    async def traffic(self, dispatch, shard_id: int, guilds: list, intents: int):
+        """Send the event mix in 100ms batches"""
+        kinds, weights = ['MESSAGE_CREATE'], [1.0]
+        if intents & GUILD_PRESENCES and self.presences:
+            kinds.append('PRESENCE_UPDATE')
+            weights.append(self.presences)
+        if intents & GUILD_MESSAGE_TYPING and self.typing:
+            kinds.append('TYPING_START')
+            weights.append(self.typing)
+        per_second = self.rate * sum(weights)
+        sent = self.sent.setdefault(shard_id, {})
+
+        owed = 0.0
+        while True:
+            await asyncio.sleep(0.1)
+            owed += per_second / 10
+            while owed >= 1:
+                owed -= 1
+                guild_id = random.choice(guilds)
+                author = random.choice(self.users)
+                event = random.choices(kinds, weights)[0]
+                if event == 'PRESENCE_UPDATE':
+                    data = self.presence(guild_id, author)
+                elif event == 'TYPING_START':
+                    data = {
+                        'channel_id': str(guild_id + 1), 'guild_id': str(guild_id), 'user_id': author['id'],
+                        'timestamp': int(time.time()), 'member': member(author)
+                    }
+                elif random.random() < 0.01:
+                    event, data = 'GUILD_MEMBER_ADD', {**member(user(next(self.joins) << 22, 'newcomer')), 'guild_id': str(guild_id)}
+                else:
+                    content = SPAM if random.random() < self.spam else " ".join(random.choices(WORDS, k=random.randint(3, 12)))
+                    data = self.message(guild_id + 1, guild_id, author, content)
+                await dispatch(event, data)
+                sent[event] = sent.get(event, 0) + 1
+
+    async def report(self, interval: float = 10.0):
+        while True:
+            await asyncio.sleep(interval)
+            for shard_id, sent in sorted(self.sent.items()):
+                print(f"Shard {shard_id} sent: " + ", ".join(f"{event}={count}" for event, count in sorted(sent.items())))
+
+
+async def serve(fake: FakeDiscord, host: str, port: int):
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"Fake gateway listening on {fake.url} ({len(fake.guild_ids)} guilds)")
+    try:
+        await fake.report()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--members", type=int, default=50, help="members per guild")
+    parser.add_argument("--rate", type=float, default=50, help="messages per second per shard")
+    parser.add_argument("--spam", type=float, default=0.05, help="fraction of messages that are repeated spam")
+    parser.add_argument("--presences", type=float, default=0.0, help="presence updates per message")
+    parser.add_argument("--typing", type=float, default=0.0, help="typing events per message")
+    args = parser.parse_args()
+
+    fake = FakeDiscord(
+        args.host, args.port, args.guilds, args.members, args.rate, args.spam,
+        presences=args.presences, typing=args.typing
+    )
+    try:
+        asyncio.run(serve(fake, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
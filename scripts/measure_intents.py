@@ -0,0 +1,93 @@
+"""Measure memory and gateway event volume under an intents profile.
+
+Run from the directory holding config.json:
+
+    python scripts/measure_intents.py --profile full [--seconds 60] [--gateway http://127.0.0.1:8765]
+    python scripts/measure_intents.py --profile lean [--seconds 60] [--gateway http://127.0.0.1:8765]
+
+Starts the bot with the given intents_profile (overriding config.json),
+waits for READY, lets it run for --seconds and prints one JSON line: RSS at
+READY and at the end, cached members and users, and gateway events received
+per second by type. With --gateway it runs against scripts/fake_gateway.py;
+without it, it logs in to Discord with the configured token, which is how
+numbers for real guilds should be taken (run each profile on its own, at a
+comparable time of day).
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def rss_mb(process) -> float:
+    return round(process.memory_info().rss / 1024 / 1024, 1)
+
+
+async def measure(bot, seconds: float, events: Counter, result: dict):
+    import psutil
+
+    process = psutil.Process()
+    await bot.wait_until_ready()
+    gc.collect()
+    result['rss_ready_mb'] = rss_mb(process)
+    events.clear()
+    started = time.monotonic()
+
+    await asyncio.sleep(seconds)
+    elapsed = time.monotonic() - started
+    gc.collect()
+    result.update(
+        rss_end_mb=rss_mb(process),
+        guilds=len(bot.guilds),
+        cached_members=sum(len(guild.members) for guild in bot.guilds),
+        cached_users=len(bot.users),
+        events_per_second=round(sum(events.values()) / elapsed, 1),
+        by_type={event: round(count / elapsed, 1) for event, count in events.most_common()}
+    )
+    await bot.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=("full", "lean"), required=True)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--gateway", help="base URL of scripts/fake_gateway.py")
+    args = parser.parse_args()
+
+    if args.gateway:
+        from launcher import use_gateway
+        use_gateway(args.gateway)
+
+    import main as bot_main
+
+    config = bot_main.load_config()
+    config['intents_profile'] = args.profile
+    bot = bot_main.create_bot(config)
+    events = Counter()
+
+    async def count(event_type):
+        events[event_type] += 1
+
+    bot.add_listener(count, 'on_socket_event_type')
+    result = {'profile': args.profile}
+
+    async def run():
+        async with bot:
+            task = asyncio.create_task(measure(bot, args.seconds, events, result))
+            await bot.start(config['token'])
+            await task
+
+    asyncio.run(run())
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
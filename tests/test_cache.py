@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from utils.database import AsyncTTLCache
+
+
+def test_concurrent_misses_share_one_load():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ['warning']
+
+    async def main():
+        cache = AsyncTTLCache('test', ttl=60, max_size=10)
+        results = await asyncio.gather(*(cache.get('key', load) for _ in range(5)))
+        return cache, results
+
+    cache, results = asyncio.run(main())
+    assert calls == [1]
+    assert results == [['warning']] * 5
+    assert cache.misses == 1 and cache.coalesced == 4
+
+
+def test_entries_expire_after_ttl():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        cache = AsyncTTLCache('test', ttl=0.02, max_size=10)
+        first = await cache.get('key', load)
+        cached = await cache.get('key', load)
+        await asyncio.sleep(0.03)
+        return first, cached, await cache.get('key', load)
+
+    assert asyncio.run(main()) == (1, 1, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def main():
+        cache = AsyncTTLCache('test', ttl=60, max_size=2)
+        for key in ('a', 'b'):
+            await cache.get(key, lambda key=key: asyncio.sleep(0, key))
+        await cache.get('a', lambda: asyncio.sleep(0, 'reloaded'))
+        await cache.get('c', lambda: asyncio.sleep(0, 'c'))
+        return cache
+
+    cache = asyncio.run(main())
+    assert set(cache._entries) == {'a', 'c'}
+    assert cache.evictions == 1
+
+
+def test_cancelling_the_first_caller_does_not_cancel_waiters():
+    async def load():
+        await asyncio.sleep(0.02)
+        return 'value'
+
+    async def main():
+        cache = AsyncTTLCache('test', ttl=60, max_size=10)
+        owner = asyncio.create_task(cache.get('key', load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get('key', load))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return owner, await waiter, len(cache)
+
+    owner, value, size = asyncio.run(main())
+    assert owner.cancelled()
+    assert value == 'value' and size == 1
+
+
+def test_load_errors_reach_every_waiter_and_are_not_cached():
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def main():
+        cache = AsyncTTLCache('test', ttl=60, max_size=10)
+        results = await asyncio.gather(*(cache.get('key', load) for _ in range(3)), return_exceptions=True)
+        return cache, results
+
+    cache, results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(cache) == 0
+
+
+def test_mutating_a_result_does_not_change_the_cache():
+    async def main():
+        cache = AsyncTTLCache('test', ttl=60, max_size=10)
+        first = await cache.get('key', lambda: asyncio.sleep(0, [{'reason': 'spam'}]))
+        first.append({'reason': 'raid'})
+        first[0]['reason'] = 'edited'
+        return await cache.get('key', lambda: pytest.fail("should be cached"))
+
+    assert asyncio.run(main()) == [{'reason': 'spam'}]
+
+
+def test_invalidate_during_load_skips_storing_the_result():
+    async def main():
+        cache = AsyncTTLCache('test', ttl=60, max_size=10)
+        loading = asyncio.create_task(cache.get('key', lambda: asyncio.sleep(0.01, 'stale')))
+        await asyncio.sleep(0)
+        cache.invalidate('key')
+        return await loading, len(cache)
+
+    assert asyncio.run(main()) == ('stale', 0)
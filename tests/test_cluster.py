@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from utils.cluster import ClusterClient, ClusterServer, split_shards
+
+
+def test_split_shards_is_contiguous_and_even():
+    assert split_shards(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_shards(4, 4) == [[0], [1], [2], [3]]
+    with pytest.raises(ValueError):
+        split_shards(2, 3)
+    with pytest.raises(ValueError):
+        split_shards(2, 0)
+
+
+async def connected_worker(server: ClusterServer, client: ClusterClient):
+    await client.start()
+    for _ in range(100):
+        if client.worker in server.workers:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("worker never said hello")
+
+
+def test_broadcast_reaches_every_worker(tmp_path):
+    async def run():
+        server = ClusterServer(str(tmp_path / 'cluster.sock'))
+        await server.start()
+        clients = [ClusterClient(server.path, worker=i, shards=[i]) for i in range(2)]
+        for client in clients:
+            client.register('guilds', lambda args, n=client.worker: asyncio.sleep(0, n * 10 + args['extra']))
+            await connected_worker(server, client)
+        try:
+            return await clients[0].broadcast('guilds', extra=1)
+        finally:
+            for client in clients:
+                await client.close()
+            await server.stop()
+
+    assert asyncio.run(run()) == {'0': 1, '1': 11}
+
+
+def test_broadcast_while_disconnected_raises_connection_error(tmp_path):
+    async def run():
+        client = ClusterClient(str(tmp_path / 'cluster.sock'), worker=0, shards=[0])
+        with pytest.raises(ConnectionError):
+            await client.broadcast('guilds')
+        assert not client._pending
+        # notify_ready is remembered for the next hello instead of failing
+        await client.notify_ready()
+        assert client._ready
+
+    asyncio.run(run())
+
+
+def test_worker_reconnects_after_launcher_restart(tmp_path):
+    async def run():
+        path = str(tmp_path / 'cluster.sock')
+        server = ClusterServer(path)
+        await server.start()
+        client = ClusterClient(path, worker=3, shards=[3], min_backoff=0.01, max_backoff=0.05)
+        await connected_worker(server, client)
+        await client.notify_ready()
+        await asyncio.wait_for(server.ready_event(3).wait(), 1)
+        await server.stop()
+
+        server = ClusterServer(path)
+        await server.start()
+        try:
+            # The new launcher hears hello and ready again without the worker restarting
+            await asyncio.wait_for(server.ready_event(3).wait(), 2)
+            assert 3 in server.workers
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(run())
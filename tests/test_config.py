@@ -0,0 +1,55 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from utils.config import Config
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'prefix': '!', 'security': {'enabled': True}}))
+    os.chmod(path, 0o600)
+    return path
+
+
+def test_save_replaces_the_file_atomically(path):
+    config = Config(str(path))
+    config['prefix'] = '?'
+    asyncio.run(config.save())
+
+    assert json.loads(path.read_text()) == {'prefix': '?', 'security': {'enabled': True}}
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert [entry.name for entry in path.parent.iterdir()] == ['config.json']
+
+
+def test_failed_write_leaves_the_old_file(path, monkeypatch):
+    config = Config(str(path))
+    config['prefix'] = '?'
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        asyncio.run(config.save())
+    assert json.loads(path.read_text())['prefix'] == '!'
+    assert [entry.name for entry in path.parent.iterdir()] == ['config.json']
+
+
+def test_reload_updates_in_place_and_notifies(path):
+    config = Config(str(path))
+    changes = []
+    config.add_listener(changes.append)
+    config.add_listener(lambda changed: 1 / 0)
+
+    path.write_text(json.dumps({'prefix': '!', 'security': {'enabled': False}, 'log_channels': {}}))
+    assert asyncio.run(config.reload()) == {'security', 'log_channels'}
+    assert changes == [{'security', 'log_channels'}]
+    assert config['security'] == {'enabled': False}
+
+    # Reloading an unchanged file notifies nobody
+    assert asyncio.run(config.reload()) == set()
+    assert len(changes) == 1
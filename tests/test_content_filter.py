@@ -0,0 +1,25 @@
+from utils.content_filter import CompiledFilter
+
+
+def test_invite_url_on_allowlisted_host_is_still_an_invite():
+    compiled = CompiledFilter(link_allowlist=['discord.com'])
+    for url in ('https://discord.com/invite/abc', 'https://www.discord.com/invite/abc'):
+        match = compiled.check(url)
+        assert match is not None and match.rule == 'invite', url
+    assert compiled.check('https://discord.com/channels/1/2') is None
+
+
+def test_invite_url_reported_as_invite_with_allowlist():
+    compiled = CompiledFilter(link_allowlist=['example.com'])
+    assert compiled.check('https://discord.gg/abc').rule == 'invite'
+    assert compiled.check('https://other.net/x').rule == 'link'
+    assert compiled.check('https://example.com/x') is None
+
+
+def test_blocked_words_with_punctuation_at_the_edges():
+    compiled = CompiledFilter(invite_hosts=[], blocked_words=['c++', '#tag', 'bad'])
+    assert compiled.check('I write c++ daily').rule == 'blocked_word'
+    assert compiled.check('c++').text == 'c++'
+    assert compiled.check('see #tag here').text == '#tag'
+    assert compiled.check('badge') is None
+    assert compiled.check('abc++') is None
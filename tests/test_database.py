@@ -0,0 +1,71 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import motor.motor_asyncio
+import pytest
+
+from utils.config import Config
+from utils.database import Database
+
+
+class FakeClient:
+    created = []
+
+    def __init__(self, uri, **options):
+        self.uri = uri
+        self.options = options
+        self.closed = False
+        self.admin = SimpleNamespace(command=self._command)
+        self.discord_bot = {}
+        FakeClient.created.append(self)
+
+    async def _command(self, name):
+        await asyncio.sleep(0.01)
+        return {'ok': 1}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def database(monkeypatch, tmp_path):
+    FakeClient.created = []
+    monkeypatch.setattr(motor.motor_asyncio, 'AsyncIOMotorClient', FakeClient)
+
+    async def ensure_indexes():
+        return True
+
+    monkeypatch.setattr(Database, 'ensure_indexes', ensure_indexes)
+    for attribute in ('_client', '_db', '_connecting', '_config', '_index_task'):
+        monkeypatch.setattr(Database, attribute, None)
+
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({
+        'mongo_uri': 'mongodb://db.invalid',
+        'database': {'max_pool_size': 20, 'min_pool_size': 2, 'compressors': ['zstd', 'zlib']}
+    }))
+    return Config(str(path))
+
+
+def test_concurrent_connects_share_one_client(database):
+    async def main():
+        Database.use_config(database)
+        clients = await asyncio.gather(*(Database.connect() for _ in range(5)))
+        await Database.close()
+        return clients
+
+    clients = asyncio.run(main())
+    assert len(FakeClient.created) == 1
+    assert all(client is FakeClient.created[0] for client in clients)
+    client = FakeClient.created[0]
+    assert client.options['maxPoolSize'] == 20 and client.options['minPoolSize'] == 2
+    assert client.options['compressors'] == 'zstd,zlib'
+    assert 'readPreference' not in client.options
+    assert client.closed and Database.get_client() is None
+
+
+def test_connect_needs_the_shared_config(database):
+    with pytest.raises(RuntimeError):
+        asyncio.run(Database.connect())
+    assert FakeClient.created == []
@@ -0,0 +1,22 @@
+import main
+
+
+def test_dependencies_load_in_an_earlier_wave():
+    waves = main.extension_waves(
+        ['cogs.a', 'cogs.b', 'cogs.c', 'cogs.d'],
+        {'cogs.b': ('cogs.a',), 'cogs.c': ('cogs.b', 'cogs.missing')}
+    )
+    assert waves == [['cogs.a', 'cogs.d'], ['cogs.b'], ['cogs.c']]
+
+
+def test_cycle_loads_everything_together():
+    names = ['cogs.a', 'cogs.b']
+    assert main.extension_waves(names, {'cogs.a': ('cogs.b',), 'cogs.b': ('cogs.a',)}) == [names]
+
+
+def test_declared_dependencies_are_read_without_importing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'cogs').mkdir()
+    (tmp_path / 'cogs' / 'example.py').write_text("raise SystemExit\nDEPENDS_ON = ('cogs.other',)\n")
+    assert main.declared_dependencies('cogs.example') == ('cogs.other',)
+    assert main.declared_dependencies('cogs.absent') == ()
@@ -0,0 +1,83 @@
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+
+import pytest
+from discord.gateway import DiscordWebSocket
+from discord.http import Route
+
+import main
+from launcher import use_gateway
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location('fake_gateway', os.path.join(ROOT, 'scripts', 'fake_gateway.py'))
+fake_gateway = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fake_gateway)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    # use_gateway patches discord.py globals; let monkeypatch put them back
+    monkeypatch.setattr(Route, 'BASE', Route.BASE)
+    monkeypatch.setattr(DiscordWebSocket, 'DEFAULT_GATEWAY', DiscordWebSocket.DEFAULT_GATEWAY)
+    monkeypatch.chdir(ROOT)
+    port = free_port()
+    fake = fake_gateway.FakeDiscord('127.0.0.1', port, guilds=12, members=5, rate=20, spam=0.0)
+    use_gateway(fake.url)
+    return fake
+
+
+def write_config(tmp_path, **settings) -> main.Config:
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'token': 'fake', 'prefix': '!', 'rotating_status': ['testing'], **settings}))
+    return main.load_config(str(path))
+
+
+def test_sharded_bot_connects_to_the_fake_gateway(gateway, tmp_path):
+    config = write_config(tmp_path, intents_profile='lean')
+    bot = main.create_bot(config, shard_count=4, shard_ids=[1, 2])
+    # No need to wait two seconds for more GUILD_CREATEs that won't come
+    bot._connection.guild_ready_timeout = 0.2
+
+    async def run():
+        runner = fake_gateway.web.AppRunner(gateway.app())
+        await runner.setup()
+        await fake_gateway.web.TCPSite(runner, '127.0.0.1', int(gateway.url.rsplit(':', 1)[1])).start()
+        try:
+            async with bot:
+                task = asyncio.create_task(bot.start(config['token']))
+                await asyncio.wait_for(bot.wait_until_ready(), 30)
+                # Let some synthetic traffic through
+                await asyncio.sleep(0.5)
+                stats = bot.shard_stats()
+                await bot.close()
+                await task
+                return stats
+        finally:
+            await runner.cleanup()
+
+    stats = asyncio.run(run())
+
+    owned = [guild_id for guild_id in gateway.guild_ids if main.shard_for(guild_id, 4) in (1, 2)]
+    assert sorted(guild.id for guild in bot.guilds) == sorted(owned)
+    assert all(bot.owns_guild(guild.id) for guild in bot.guilds)
+    assert not any(bot.owns_guild(guild_id) for guild_id in set(gateway.guild_ids) - set(owned))
+    assert set(stats) == {1, 2}
+    for shard_id, shard in stats.items():
+        assert shard['guilds'] == sum(main.shard_for(guild_id, 4) == shard_id for guild_id in owned)
+        assert shard['events'] > shard['guilds']
+
+
+def test_invalid_profile_is_rejected(tmp_path):
+    config = write_config(tmp_path, intents_profile='bogus')
+    with pytest.raises(ValueError):
+        main.create_bot(config)
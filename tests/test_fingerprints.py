@@ -0,0 +1,55 @@
+from utils.security import FingerprintStore
+
+
+def test_reformatted_copies_count_as_duplicates():
+    store = FingerprintStore(window=60)
+    assert store.record(1, 10, 'Free nitro at example.com!', now=0) == 1
+    assert store.record(1, 10, 'FREE   nitro at example.com', now=1) == 2
+    assert store.record(1, 10, 'free-nitro-at-example-com', now=2) == 3
+    # Another member, or the same member in another guild, starts from zero
+    assert store.record(1, 11, 'Free nitro at example.com!', now=3) == 1
+    assert store.record(2, 10, 'Free nitro at example.com!', now=3) == 1
+
+
+def test_attachments_are_part_of_the_fingerprint():
+    store = FingerprintStore()
+    assert store.record(1, 10, '', [('image.png', 1024)], now=0) == 1
+    assert store.record(1, 10, '', [('image.png', 1024)], now=1) == 2
+    assert store.record(1, 10, '', [('image.png', 2048)], now=2) == 1
+    assert store.record(1, 10, '   ', now=3) == 0
+
+
+def test_entries_expire_after_the_window():
+    store = FingerprintStore(window=10)
+    store.record(1, 10, 'hello there', now=0)
+    assert store.record(1, 10, 'hello there', now=5) == 2
+    assert store.record(1, 10, 'hello there', now=16) == 1
+    assert store.evict_expired(now=100) == 1
+    assert len(store) == 0
+
+
+def test_members_are_capped_lru():
+    store = FingerprintStore(max_members=2)
+    store.record(1, 10, 'a message', now=0)
+    store.record(1, 11, 'a message', now=1)
+    store.record(1, 10, 'a message', now=2)
+    store.record(1, 12, 'a message', now=3)
+    assert list(store.members) == [(1, 10), (1, 12)]
+
+
+def test_near_duplicates_match_by_simhash():
+    # simhash builds on hash(), which is seeded per process; across seeds this
+    # edit stays within 10 bits and the unrelated text is at least 21 away
+    base = 'check out my new server, we have giveaways and events every single day of the week'
+    edited = base + ' :)) x'
+    store = FingerprintStore(near_duplicates=True, max_distance=15)
+    store.record(1, 10, base, now=0)
+    assert store.record(1, 10, edited, now=1) == 2
+    assert store.record(1, 10, 'something completely different to say about the weather today', now=2) == 1
+
+
+def test_offences_are_counted_within_the_window():
+    store = FingerprintStore(window=10)
+    assert store.flag(1, 10, now=0) == 1
+    assert store.flag(1, 10, now=5) == 2
+    assert store.flag(1, 10, now=20) == 1
@@ -0,0 +1,82 @@
+"""Import-time budget for the bot's modules.
+
+Each check imports modules in a fresh interpreter with `-X importtime` and
+takes the fastest of RUNS. Set IMPORT_BUDGET_MS to adjust the budget on a
+slow machine.
+"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 1000))
+RUNS = 3
+
+# Meant to load on first use: motor/pymongo on the first DB call, psutil in
+# botinfo, aiohttp's server only when the metrics endpoint is enabled
+DEFERRED = ('motor', 'pymongo', 'bson', 'psutil', 'aiohttp.web')
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def bot_modules():
+    modules = ['main']
+    for package in ('utils', 'cogs'):
+        for filename in sorted(os.listdir(os.path.join(ROOT, package))):
+            if filename.endswith('.py') and filename != '__init__.py':
+                modules.append(f"{package}.{filename[:-3]}")
+    return modules
+
+
+def measure(modules):
+    """Return (total_us, {top-level module: cumulative_us}, set of all imported names)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+    top_level = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        imported.add(name)
+        if len(indent) == 1:
+            top_level[name] = top_level.get(name, 0) + int(cumulative)
+    return sum(top_level.values()), top_level, imported
+
+
+def imports_any(imported, packages):
+    return sorted(name for name in imported if any(name == package or name.startswith(package + ".") for package in packages))
+
+
+@pytest.fixture(scope='module')
+def bot_startup():
+    return min((measure(bot_modules()) for _ in range(RUNS)), key=lambda run: run[0])
+
+
+def test_deferred_modules_are_not_imported_at_startup(bot_startup):
+    _, _, imported = bot_startup
+    assert imports_any(imported, DEFERRED) == []
+
+
+def test_startup_imports_fit_the_budget(bot_startup):
+    total, top_level, _ = bot_startup
+    heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:5]
+    report = ", ".join(f"{name} {cumulative / 1000:.1f}ms" for name, cumulative in heaviest)
+    assert total / 1000 <= BUDGET_MS, f"{total / 1000:.1f}ms is over the {BUDGET_MS:g}ms budget ({report})"
+
+
+def test_launcher_does_not_import_discord():
+    # The supervisor and `launcher.py --status` only talk to the cluster socket
+    _, _, imported = measure(['launcher', 'utils.cluster'])
+    assert imports_any(imported, ('discord',) + DEFERRED) == []
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils.logger import LogChannelResolver
+
+
+class FakeGuild:
+    def __init__(self, guild_id, channels):
+        self.id = guild_id
+        self.channels = {channel.id: channel for channel in channels}
+        self.lookups = 0
+
+    @property
+    def text_channels(self):
+        self.lookups += 1
+        return list(self.channels.values())
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+
+def channel(channel_id, name):
+    return SimpleNamespace(id=channel_id, name=name)
+
+
+@pytest.fixture(autouse=True)
+def resolver():
+    yield
+    LogChannelResolver.configure({})
+
+
+def test_configured_ids_win_over_names():
+    renamed = channel(100, 'staff-log')
+    guild = FakeGuild(1, [renamed, channel(200, 'mod-logs')])
+    LogChannelResolver.configure({'1': {'mod-logs': 100}})
+    assert LogChannelResolver.resolve(SimpleNamespace(guild=guild), 'mod-logs') is renamed
+    assert guild.lookups == 0
+
+
+def test_legacy_flat_ids_still_work():
+    legacy = channel(300, 'old-mod-logs')
+    LogChannelResolver.configure({'mod-logs': 300})
+    assert LogChannelResolver.resolve(SimpleNamespace(guild=FakeGuild(1, [legacy])), 'mod-logs') is legacy
+
+
+def test_name_fallback_is_cached_until_invalidated():
+    guild = FakeGuild(1, [channel(200, 'security-logs')])
+    context = SimpleNamespace(guild=guild)
+    assert LogChannelResolver.resolve(context, 'security-logs').id == 200
+    assert LogChannelResolver.resolve(context, 'ticket-logs') is None
+    assert LogChannelResolver.resolve(context, 'security-logs').id == 200
+    assert LogChannelResolver.resolve(context, 'ticket-logs') is None
+    assert guild.lookups == 2
+
+    guild.channels[400] = channel(400, 'ticket-logs')
+    LogChannelResolver.invalidate(1)
+    assert LogChannelResolver.resolve(context, 'ticket-logs').id == 400
+
+
+def test_no_guild_resolves_to_nothing():
+    assert LogChannelResolver.resolve(SimpleNamespace(guild=None), 'mod-logs') is None
@@ -0,0 +1,59 @@
+import asyncio
+from collections import Counter
+
+import discord
+import pytest
+
+from utils.logger import PRIORITY_HIGH, PRIORITY_LOW, LogDelivery
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.messages = []
+
+    async def send(self, embeds):
+        self.messages.append([embed.title for embed in embeds])
+
+
+@pytest.fixture(autouse=True)
+def delivery(monkeypatch):
+    monkeypatch.setattr(LogDelivery, '_buffers', {})
+    monkeypatch.setattr(LogDelivery, 'counters', Counter())
+    monkeypatch.setattr(LogDelivery, 'flush_interval', 0.02)
+    monkeypatch.setattr(LogDelivery, 'max_pending', 100)
+    monkeypatch.setattr(LogDelivery, 'backpressure_timeout', 0.01)
+
+
+def test_embeds_are_batched_per_channel():
+    channel = FakeChannel(1)
+
+    async def main():
+        for i in range(23):
+            await LogDelivery.submit(channel, discord.Embed(title=str(i)))
+        await LogDelivery.flush()
+
+    asyncio.run(main())
+    assert [len(message) for message in channel.messages] == [10, 10, 3]
+    assert [title for message in channel.messages for title in message] == [str(i) for i in range(23)]
+    assert LogDelivery.counters['coalesced'] == 20
+
+
+def test_full_channel_drops_the_lowest_priority():
+    LogDelivery.max_pending = 3
+    # Nothing goes out until flush(), so the channel stays full
+    LogDelivery.flush_interval = 10
+    channel = FakeChannel(1)
+
+    async def main():
+        await LogDelivery.submit(channel, discord.Embed(title='low'), PRIORITY_LOW)
+        await LogDelivery.submit(channel, discord.Embed(title='normal'))
+        await LogDelivery.submit(channel, discord.Embed(title='normal 2'))
+        await LogDelivery.submit(channel, discord.Embed(title='high'), PRIORITY_HIGH)
+        await LogDelivery.submit(channel, discord.Embed(title='low 2'), PRIORITY_LOW)
+        await LogDelivery.flush()
+
+    asyncio.run(main())
+    assert channel.messages == [['normal', 'normal 2', 'high']]
+    assert LogDelivery.counters['dropped_low'] == 2
+    assert LogDelivery.counters['throttled'] == 2
@@ -0,0 +1,44 @@
+import logging
+import queue
+
+from utils.logger import DroppingQueueHandler, Logger
+
+
+def make_record(level, msg, *args):
+    return logging.LogRecord('discord_bot', level, __file__, 1, msg, args, None)
+
+
+def test_full_queue_drops_and_counts_by_level():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record(logging.INFO, 'kept'))
+    handler.handle(make_record(logging.WARNING, 'dropped'))
+    handler.handle(make_record(logging.WARNING, 'dropped'))
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == {'WARNING': 2}
+
+
+def test_block_policy_waits_then_drops():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1), policy='block', block_timeout=0.01)
+    handler.handle(make_record(logging.INFO, 'kept'))
+    handler.handle(make_record(logging.ERROR, 'dropped'))
+    assert handler.dropped == {'ERROR': 1}
+
+
+def test_arguments_are_merged_before_queueing():
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.handle(make_record(logging.INFO, 'joined %s guilds', 3))
+    record = handler.queue.get_nowait()
+    assert record.msg == 'joined 3 guilds' and record.args is None
+
+
+def test_configure_writes_through_the_listener(tmp_path):
+    previous = dict(Logger._settings)
+    try:
+        Logger.configure({'directory': str(tmp_path), 'filename': 'bot.log', 'queue_size': 50})
+        Logger.get_logger().info('queued line')
+        assert Logger.stats()['capacity'] == 50
+        # shutdown() drains the queue before closing the file
+        Logger.shutdown()
+        assert 'queued line' in (tmp_path / 'bot.log').read_text()
+    finally:
+        Logger.configure(previous)
@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from utils.loop_monitor import LoopMonitor
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def run_with_monitor(monitor, block_for):
+    async def main():
+        monitor.start()
+        await asyncio.sleep(0.03)
+        block_the_loop(block_for)
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(main())
+
+
+def test_blocking_call_is_recorded_as_a_stall():
+    monitor = LoopMonitor(interval=0.02, stall_threshold=0.1)
+    run_with_monitor(monitor, 0.2)
+    snapshot = monitor.snapshot()
+    assert snapshot['stalls'] == 1
+    assert snapshot['recent_stalls'][0]['duration_ms'] >= 100
+    # Without debug there is no watchdog to capture a stack
+    assert snapshot['recent_stalls'][0]['stack'] is None
+
+
+def test_short_lag_is_not_a_stall():
+    monitor = LoopMonitor(interval=0.02, stall_threshold=0.5)
+    run_with_monitor(monitor, 0.05)
+    assert monitor.stall_count == 0
+    assert monitor.snapshot()['count'] > 0
+
+
+def test_debug_watchdog_captures_the_blocking_frame():
+    monitor = LoopMonitor(interval=0.02, stall_threshold=0.1, debug=True)
+    run_with_monitor(monitor, 0.3)
+    stack = monitor.stalls[0].stack
+    assert stack and 'block_the_loop' in ''.join(stack)
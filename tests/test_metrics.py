@@ -0,0 +1,77 @@
+import asyncio
+import re
+import threading
+
+from aiohttp import ClientSession
+
+from utils.metrics import Metrics, MetricsServer, PrometheusWriter, Span, _current_span
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[^}]*\})? (-?[0-9.e+-]+|[+-]Inf|NaN)$')
+
+
+def scrape(path: str):
+    async def main():
+        server = MetricsServer(port=0)
+        server.add_collector(lambda writer: writer.gauge('test_guilds', 'Guilds in cache', 3, shard=0))
+        await server.start()
+        try:
+            async with ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{server.port}{path}') as response:
+                    return response.status, response.headers['Content-Type'], await response.text()
+        finally:
+            await server.stop()
+
+    return asyncio.run(main())
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    timing = Metrics.command('scrape_test')
+    Metrics.end(timing, Metrics.begin(timing), failed=False)
+
+    status, content_type, body = scrape('/metrics')
+    assert status == 200
+    assert content_type.startswith('text/plain; version=0.0.4')
+    assert body.endswith('\n')
+
+    lines = body.splitlines()
+    for line in lines:
+        assert line.startswith(('# HELP ', '# TYPE ')) or SAMPLE.match(line), line
+    assert 'test_guilds{shard="0"} 3.0' in lines
+    assert '# TYPE bot_command_duration_seconds histogram' in lines
+    assert 'bot_command_duration_seconds_count{command="scrape_test"} 1' in lines
+    assert any(line.startswith('bot_command_duration_seconds_bucket{command="scrape_test",le="+Inf"}') for line in lines)
+
+
+def test_stats_endpoint_serves_json():
+    status, content_type, body = scrape('/stats')
+    assert status == 200
+    assert content_type.startswith('application/json')
+    assert '"commands"' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    timing = Metrics.command('bucket_test')
+    for seconds in (0.0005, 0.003, 0.003, 20):
+        timing.total.observe(seconds)
+    writer = PrometheusWriter()
+    writer.histogram('h', 'test', [({}, timing.total)])
+    counts = [int(line.rsplit(' ', 1)[1]) for line in writer.lines if line.startswith('h_bucket')]
+    assert counts == sorted(counts)
+    assert counts[-1] == 4
+
+
+def test_db_time_from_many_threads_adds_up():
+    span = Span()
+
+    def record():
+        token = _current_span.set(span)
+        for _ in range(1000):
+            Metrics.record_db('find', 0.001)
+        _current_span.reset(token)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert abs(span.db - 8.0) < 1e-6
@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from utils.permissions import bulk_set_permissions
+
+ROLE = SimpleNamespace(id=1, name='Muted')
+
+
+class FakeChannel:
+    active = 0
+    peak = 0
+
+    def __init__(self, channel_id, overwrite=None, error=None):
+        self.id = channel_id
+        self.mention = f'<#{channel_id}>'
+        self.overwrite = overwrite or discord.PermissionOverwrite()
+        self.error = error
+        self.edits = 0
+
+    def overwrites_for(self, target):
+        return discord.PermissionOverwrite(**dict(self.overwrite))
+
+    async def set_permissions(self, target, overwrite, reason=None):
+        FakeChannel.active += 1
+        FakeChannel.peak = max(FakeChannel.peak, FakeChannel.active)
+        try:
+            await asyncio.sleep(0.01)
+            if self.error:
+                raise self.error
+            self.overwrite = overwrite
+            self.edits += 1
+        finally:
+            FakeChannel.active -= 1
+
+
+def test_skips_matching_channels_and_keeps_other_values():
+    done = FakeChannel(1, discord.PermissionOverwrite(send_messages=False))
+    other = FakeChannel(2, discord.PermissionOverwrite(add_reactions=False))
+
+    result = asyncio.run(bulk_set_permissions([done, other], ROLE, send_messages=False))
+
+    assert (result.updated, result.skipped, result.failed) == (1, 1, [])
+    assert done.edits == 0
+    assert other.overwrite.send_messages is False and other.overwrite.add_reactions is False
+
+
+def test_concurrency_limit_failures_and_progress():
+    FakeChannel.peak = 0
+    forbidden = discord.Forbidden(SimpleNamespace(status=403, reason='Forbidden'), 'Missing Access')
+    channels = [FakeChannel(i) for i in range(10)] + [FakeChannel(99, error=forbidden)]
+    reports = []
+
+    async def progress(done, total):
+        reports.append((done, total))
+
+    result = asyncio.run(bulk_set_permissions(channels, ROLE, concurrency=3, progress=progress, send_messages=False))
+
+    assert FakeChannel.peak == 3
+    assert result.updated == 10 and result.succeeded == 10
+    assert [channel.id for channel, _ in result.failed] == [99]
+    assert result.failure_summary() == '<#99>: missing permissions'
+    assert reports[-1] == (11, 11)
@@ -0,0 +1,36 @@
+from utils.security import RaidDetector
+
+
+def test_threshold_inside_the_window_triggers_once():
+    detector = RaidDetector(window=10, threshold=3)
+    assert detector.record_join(1, 100, now=0.0) is None
+    assert detector.record_join(1, 101, now=4.0) is None
+    assert detector.record_join(1, 102, now=8.0) == [100, 101, 102]
+    # The window starts over after a trigger
+    assert detector.record_join(1, 103, now=8.5) is None
+
+
+def test_joins_outside_the_window_do_not_count():
+    detector = RaidDetector(window=10, threshold=3)
+    detector.record_join(1, 100, now=0.0)
+    detector.record_join(1, 101, now=5.0)
+    assert detector.record_join(1, 102, now=12.0) is None
+    assert detector.record_join(1, 103, now=13.0) == [101, 102, 103]
+
+
+def test_guilds_are_counted_separately():
+    detector = RaidDetector(window=10, threshold=2)
+    assert detector.record_join(1, 100, now=0.0) is None
+    assert detector.record_join(2, 200, now=0.5) is None
+    assert detector.record_join(2, 201, now=1.0) == [200, 201]
+
+
+def test_per_guild_override_and_idle_eviction():
+    detector = RaidDetector(window=10, threshold=5, idle_timeout=60)
+    detector.configure(1, window=30, threshold=2)
+    detector.record_join(1, 100, now=0.0)
+    assert detector.record_join(1, 101, now=25.0) == [100, 101]
+
+    detector.record_join(2, 200, now=50.0)
+    assert detector.evict_idle(now=90.0) == 1
+    assert list(detector.windows) == [2]
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from utils.scheduler import DeadlineScheduler, parse_duration, retry_with_backoff
+
+
+def test_parse_duration():
+    assert parse_duration('10m') == timedelta(minutes=10)
+    assert parse_duration(' 2D ') == timedelta(days=2)
+    for text in ('', 'm', '10', '0s', '-1h', 'xh', '5y'):
+        assert parse_duration(text) is None
+
+
+def test_heap_skips_cancelled_and_moved_entries():
+    async def main():
+        scheduler = DeadlineScheduler(lambda key: asyncio.sleep(0))
+        base = datetime(2026, 1, 1)
+        scheduler.schedule('a', base + timedelta(seconds=1))
+        scheduler.schedule('b', base + timedelta(seconds=2))
+        scheduler.schedule('c', base + timedelta(seconds=3))
+        scheduler.cancel('a')
+        # Moving c ahead of b leaves its old entry behind
+        scheduler.schedule('c', base + timedelta(seconds=1.5))
+        assert len(scheduler) == 2 and 'a' not in scheduler
+        assert scheduler.next_deadline() == base + timedelta(seconds=1.5)
+
+        assert scheduler._pop_due(base + timedelta(seconds=1.6)) == ['c']
+        assert scheduler._pop_due(base + timedelta(seconds=10)) == ['b']
+        assert scheduler.next_deadline() is None
+        assert not scheduler._heap
+
+    asyncio.run(main())
+
+
+def test_runner_fires_in_deadline_order():
+    fired = []
+
+    async def callback(key):
+        fired.append(key)
+
+    async def main():
+        scheduler = DeadlineScheduler(callback, max_concurrency=1)
+        scheduler.start()
+        now = datetime.utcnow()
+        scheduler.schedule('late', now + timedelta(seconds=0.06))
+        scheduler.schedule('cancelled', now + timedelta(seconds=0.02))
+        scheduler.schedule('early', now + timedelta(seconds=0.03))
+        scheduler.cancel('cancelled')
+        await asyncio.sleep(0.15)
+        scheduler.stop()
+
+    asyncio.run(main())
+    assert fired == ['early', 'late']
+
+
+def test_retry_with_backoff_until_a_result(monkeypatch):
+    attempts = []
+    delays = []
+
+    async def load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("down")
+        return None if len(attempts) < 4 else ['action']
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+    assert asyncio.run(retry_with_backoff(load, "load actions", min_delay=5, max_delay=15)) == ['action']
+    assert delays == [5, 10, 15]
@@ -0,0 +1,57 @@
+import pytest
+
+from utils.sharding import EventRate, GatewayEvents, parse_shard_settings, shard_for
+
+
+def test_parse_shard_settings():
+    assert parse_shard_settings({}) == (None, None)
+    assert parse_shard_settings({'shard_count': 4}) == (4, None)
+    assert parse_shard_settings({'shard_count': 4, 'shard_ids': [3, 1, 1]}) == (4, [1, 3])
+    assert parse_shard_settings({'shard_count': 8, 'shard_range': [2, 4]}) == (8, [2, 3, 4])
+
+
+@pytest.mark.parametrize('settings', [
+    {'shard_count': 0},
+    {'shard_ids': [0]},
+    {'shard_count': 2, 'shard_ids': []},
+    {'shard_count': 2, 'shard_ids': [2]},
+    {'shard_count': 4, 'shard_ids': [0], 'shard_range': [0, 1]},
+])
+def test_invalid_shard_settings(settings):
+    with pytest.raises(ValueError):
+        parse_shard_settings(settings)
+
+
+def test_event_rate_window():
+    rate = EventRate(window=10)
+    for second in (100, 100, 105, 109):
+        rate.add(second)
+    assert rate.rate(109) == 0.4
+    # The two events at 100 fall out of the window
+    assert rate.rate(110) == 0.2
+    assert rate.rate(200) == 0.0
+    assert rate.total == 4
+
+
+def test_parsers_count_events_by_shard():
+    seen = []
+    parsers = {
+        'GUILD_CREATE': seen.append,
+        'MESSAGE_CREATE': seen.append,
+        'READY': seen.append,
+        'TYPING_START': seen.append,
+    }
+    events = GatewayEvents()
+    events.instrument(parsers, lambda: 4)
+
+    guild_id = 5 << 22
+    parsers['GUILD_CREATE']({'id': guild_id})
+    parsers['MESSAGE_CREATE']({'guild_id': str(guild_id)})
+    parsers['READY']({'shard': [2, 4]})
+    parsers['TYPING_START']({'guild_id': guild_id, '__shard_id__': 3})
+    parsers['MESSAGE_CREATE']({'channel_id': 1})
+
+    assert shard_for(guild_id, 4) == 1
+    assert len(seen) == 5
+    assert {shard: events.total(shard) for shard in range(4)} == {0: 1, 1: 2, 2: 1, 3: 1}
+    assert sorted(events.snapshot()) == [0, 1, 2, 3]
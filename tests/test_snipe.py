@@ -0,0 +1,58 @@
+import time
+
+from utils.snipe import SnipeRecord, SnipeStore
+
+
+def record(content, age=0.0):
+    return SnipeRecord(1, 'user', content, timestamp=time.time() - age)
+
+
+def test_ring_keeps_the_newest_per_channel():
+    store = SnipeStore(per_channel=2)
+    for content in ('one', 'two', 'three'):
+        store.add(10, record(content))
+    assert store.get(10).content == 'three'
+    assert store.get(10, 2).content == 'two'
+    assert store.get(10, 3) is None
+    assert store.count(10) == 2 and store.entries == 2
+
+
+def test_least_recently_written_channel_is_evicted():
+    store = SnipeStore(per_channel=5, max_entries=3)
+    store.add(10, record('a'))
+    store.add(20, record('b'))
+    store.add(10, record('c'))
+    store.add(30, record('d'))
+    assert list(store.channels) == [10, 30]
+    assert store.evictions == 1 and store.entries == 3
+
+
+def test_byte_budget_evicts_too():
+    first = record('x' * 1000)
+    store = SnipeStore(max_bytes=first.size + 100)
+    store.add(10, first)
+    store.add(20, record('y' * 1000))
+    assert list(store.channels) == [20]
+    assert store.bytes == store.get(20).size
+
+
+def test_expired_records_are_dropped():
+    store = SnipeStore(ttl=60)
+    store.add(10, record('old', age=120))
+    store.add(20, record('old', age=120))
+    store.add(30, record('old', age=120))
+    # Writing to a channel expires its old records
+    store.add(30, record('new'))
+    assert store.get(30).content == 'new' and store.get(30, 2) is None
+    # So does reading it
+    assert store.get(10) is None and 10 not in store.channels
+    assert store.purge_expired() == 1
+    assert list(store.channels) == [30]
+    assert store.expirations == 3 and store.entries == 1
+
+
+def test_forget_releases_the_budget():
+    store = SnipeStore()
+    store.add(10, record('a'))
+    store.forget(10)
+    assert store.entries == 0 and store.bytes == 0
@@ -0,0 +1,18 @@
+from cogs.utility import Utility
+from utils.metrics import Metrics, Timing
+
+
+def test_timing_lines_skip_listener_that_never_fired():
+    timings = {'on_message': Timing()}
+    assert Utility._timing_lines(timings) == "No data yet"
+
+
+def test_timing_lines_skip_command_still_running():
+    running = Timing()
+    Metrics.begin(running)
+    finished = Timing()
+    Metrics.end(finished, Metrics.begin(finished), failed=False)
+
+    lines = Utility._timing_lines({'stats': running, 'ping': finished})
+    assert lines.startswith("`ping` 1x")
+    assert "`stats`" not in lines
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from utils.database import Database, WriteBehindBuffer
+
+
+class FakeCollection:
+    def __init__(self, fail_index=None):
+        self.batches = []
+        self.fail_index = fail_index
+
+    async def insert_many(self, documents, ordered=True):
+        self.batches.append(list(documents))
+        if self.fail_index is not None:
+            raise BulkWriteError({'writeErrors': [{'index': self.fail_index, 'errmsg': 'duplicate key'}]})
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeCollection()
+
+    async def get_collection(name):
+        return fake
+
+    monkeypatch.setattr(Database, 'get_collection', get_collection)
+    return fake
+
+
+def test_flushes_after_the_interval(collection):
+    async def main():
+        buffer = WriteBehindBuffer('warnings', max_batch=10, flush_interval=0.02)
+        await buffer.insert({'n': 1})
+        await buffer.insert({'n': 2})
+        assert collection.batches == [] and len(buffer) == 2
+        await asyncio.sleep(0.05)
+        return buffer
+
+    buffer = asyncio.run(main())
+    assert collection.batches == [[{'n': 1}, {'n': 2}]]
+    assert len(buffer) == 0
+
+
+def test_full_batch_flushes_without_waiting(collection):
+    async def main():
+        buffer = WriteBehindBuffer('warnings', max_batch=2, flush_interval=60)
+        await buffer.insert({'n': 1})
+        await buffer.insert({'n': 2}, wait=True)
+        assert collection.batches == [[{'n': 1}, {'n': 2}]]
+        await buffer.close()
+
+    asyncio.run(main())
+
+
+def test_close_writes_what_is_left(collection):
+    async def main():
+        buffer = WriteBehindBuffer('warnings', max_batch=10, flush_interval=60)
+        await buffer.insert({'n': 1})
+        await buffer.close()
+        assert buffer._timer is None
+
+    asyncio.run(main())
+    assert collection.batches == [[{'n': 1}]]
+
+
+def test_waiters_see_their_own_write_errors(collection):
+    collection.fail_index = 1
+
+    async def main():
+        buffer = WriteBehindBuffer('warnings', max_batch=2, flush_interval=60)
+        first = asyncio.create_task(buffer.insert({'n': 1}, wait=True))
+        second = asyncio.create_task(buffer.insert({'n': 2}, wait=True))
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(main())
+    assert first is None
+    assert isinstance(second, RuntimeError) and 'duplicate key' in str(second)
@@ -0,0 +1,278 @@
+import asyncio
+import itertools
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.logger import Logger
+
+logger = Logger.get_logger()
+
+# Replies carry per-shard stats for a whole process; the default 64KiB line limit is too small
+MAX_MESSAGE = 2 ** 20
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+async def send_message(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    """Write one newline-delimited JSON message"""
+    writer.write(json.dumps(message, default=str).encode() + b"\n")
+    await writer.drain()
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one message; None once the other side has closed the connection"""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+def split_shards(shard_count: int, workers: int) -> List[List[int]]:
+    """Contiguous shard id ranges, as even as possible, one per worker"""
+    if not 1 <= workers <= shard_count:
+        raise ValueError(f"Need between 1 and {shard_count} workers for {shard_count} shards")
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker in range(workers):
+        end = start + size + (1 if worker < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+class ClusterServer:
+    """The launcher's end of the cluster IPC socket.
+
+    Workers connect, say hello with their index and shards, and then answer
+    requests. Any connection (a worker or `launcher.py --status`) can send a
+    broadcast, which is fanned out to every connected worker; the reply maps
+    worker index to that worker's answer, or to an error if it failed or did
+    not answer within timeout seconds.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self.workers: Dict[int, asyncio.StreamWriter] = {}
+        self.ready: Dict[int, asyncio.Event] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, self.path, limit=MAX_MESSAGE)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self.workers.values()):
+            writer.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def ready_event(self, worker: int) -> asyncio.Event:
+        return self.ready.setdefault(worker, asyncio.Event())
+
+    async def request(self, worker: int, command: str, **args) -> Any:
+        """Send a command to one worker and wait for its reply"""
+        writer = self.workers.get(worker)
+        if writer is None:
+            raise ConnectionError(f"Worker {worker} is not connected")
+        request_id = next(self._ids)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            await send_message(writer, {'op': 'request', 'id': request_id, 'command': command, 'args': args})
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def broadcast(self, command: str, **args) -> Dict[int, Any]:
+        """Send a command to every worker; failures become {'error': ...}"""
+        workers = sorted(self.workers)
+        results = await asyncio.gather(
+            *(self.request(worker, command, **args) for worker in workers),
+            return_exceptions=True
+        )
+        return {
+            worker: {'error': str(result) or type(result).__name__} if isinstance(result, Exception) else result
+            for worker, result in zip(workers, results)
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        worker = None
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                op = message.get('op')
+                if op == 'hello':
+                    worker = message['worker']
+                    self.workers[worker] = writer
+                    logger.info(f"Worker {worker} (pid {message.get('pid')}) connected with shards {message.get('shards')}")
+                elif op == 'ready':
+                    self.ready_event(message['worker']).set()
+                elif op == 'reply':
+                    future = self._pending.get(message['id'])
+                    if future and not future.done():
+                        if 'error' in message:
+                            future.set_exception(RuntimeError(message['error']))
+                        else:
+                            future.set_result(message.get('data'))
+                elif op == 'broadcast':
+                    # Answer from a task so this connection keeps reading replies meanwhile
+                    asyncio.create_task(self._answer_broadcast(writer, message))
+        except (ConnectionError, ValueError) as e:
+            logger.error(f"Cluster connection error: {e}")
+        finally:
+            if worker is not None and self.workers.get(worker) is writer:
+                del self.workers[worker]
+                logger.info(f"Worker {worker} disconnected")
+            writer.close()
+
+    async def _answer_broadcast(self, writer: asyncio.StreamWriter, message: Dict[str, Any]):
+        data = await self.broadcast(message['command'], **message.get('args', {}))
+        try:
+            await send_message(writer, {'op': 'reply', 'id': message['id'], 'data': data})
+        except ConnectionError:
+            pass
+
+class ClusterClient:
+    """A worker's (or the status CLI's) connection to the launcher.
+
+    Handlers registered by command name answer the launcher's requests;
+    broadcast() asks every worker in the cluster, including this one. A
+    worker that loses the connection (e.g. the launcher restarted) keeps
+    reconnecting with backoff and says hello, and ready if it was, again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        worker: Optional[int] = None,
+        shards: Optional[List[int]] = None,
+        timeout: float = 10.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 30.0
+    ):
+        self.path = path
+        self.worker = worker
+        self.shards = shards
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.handlers: Dict[str, Handler] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._ready = False
+
+    def register(self, command: str, handler: Handler):
+        self.handlers[command] = handler
+
+    async def start(self):
+        await self._connect()
+        self._task = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    async def notify_ready(self):
+        """Tell the launcher this worker's shards are connected"""
+        self._ready = True
+        try:
+            await self._send({'op': 'ready', 'worker': self.worker})
+        except ConnectionError:
+            # Sent again after reconnecting
+            pass
+
+    async def broadcast(self, command: str, **args) -> Dict[str, Any]:
+        """Run a command on every worker; keys are worker indexes as strings"""
+        request_id = next(self._ids)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            await self._send({'op': 'broadcast', 'id': request_id, 'command': command, 'args': args})
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _send(self, message: Dict[str, Any]):
+        # The writer is gone while closed or reconnecting
+        if self._writer is None or self._writer.is_closing():
+            raise ConnectionError("Not connected to the cluster launcher")
+        await send_message(self._writer, message)
+
+    async def _connect(self):
+        if self._writer:
+            self._writer.close()
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path, limit=MAX_MESSAGE)
+        if self.worker is not None:
+            await send_message(self._writer, {'op': 'hello', 'worker': self.worker, 'shards': self.shards, 'pid': os.getpid()})
+            if self._ready:
+                await send_message(self._writer, {'op': 'ready', 'worker': self.worker})
+
+    async def _listen(self):
+        while True:
+            await self._read_messages()
+            # The status CLI just stops; workers wait for the launcher to come back
+            if self.worker is None:
+                return
+            await self._reconnect()
+
+    async def _reconnect(self):
+        delay = self.min_backoff
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except OSError as e:
+                logger.debug(f"Cluster launcher still unreachable: {e}")
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            logger.info("Reconnected to the cluster launcher")
+            return
+
+    async def _read_messages(self):
+        try:
+            while True:
+                message = await read_message(self._reader)
+                if message is None:
+                    logger.warning("Lost connection to the cluster launcher")
+                    break
+                if message.get('op') == 'reply':
+                    future = self._pending.get(message['id'])
+                    if future and not future.done():
+                        future.set_result(message.get('data'))
+                elif message.get('op') == 'request':
+                    asyncio.create_task(self._answer(message))
+        # ValueError covers oversized lines (readline's LimitOverrunError) and bad JSON
+        except (ConnectionError, ValueError) as e:
+            logger.error(f"Cluster connection error: {e}")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Cluster connection closed"))
+
+    async def _answer(self, message: Dict[str, Any]):
+        reply = {'op': 'reply', 'id': message['id']}
+        handler = self.handlers.get(message['command'])
+        if handler is None:
+            reply['error'] = f"Unknown command {message['command']}"
+        else:
+            try:
+                reply['data'] = await handler(message.get('args', {}))
+            except Exception as e:
+                logger.error(f"Cluster command {message['command']} failed: {e}")
+                reply['error'] = str(e)
+        try:
+            await self._send(reply)
+        except ConnectionError:
+            pass
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import tempfile
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Set
+
+from utils.logger import Logger
+
+logger = Logger.get_logger()
+
+class Config(MutableMapping):
+    """config.json loaded once and shared by reference.
+
+    Cogs keep a reference to this object (bot.config) rather than their own
+    copy, so a change made by one cog is seen by all of them and by the next
+    save(). Saves are atomic (temp file + rename) and run off the event loop.
+    """
+
+    def __init__(self, path: str = 'config.json'):
+        self.path = path
+        self._data: Dict[str, Any] = {}
+        self._listeners: List[Callable[[Set[str]], Any]] = []
+        self._lock = asyncio.Lock()
+        self._data = self._read()
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._data[key] = value
+
+    def __delitem__(self, key: str):
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def add_listener(self, callback: Callable[[Set[str]], Any]):
+        """Call callback(changed_keys) after every reload that changes something"""
+        self._listeners.append(callback)
+
+    async def save(self):
+        """Write the current config atomically without blocking the loop"""
+        async with self._lock:
+            # Serialize on the loop so the snapshot can't change mid-write
+            payload = json.dumps(self._data, indent=4)
+            await asyncio.to_thread(self._write, payload)
+
+    async def reload(self) -> Set[str]:
+        """Re-read config.json in place and notify listeners of changed keys"""
+        async with self._lock:
+            data = await asyncio.to_thread(self._read)
+            changed = {
+                key for key in set(self._data) | set(data)
+                if self._data.get(key) != data.get(key)
+            }
+            self._data.clear()
+            self._data.update(data)
+
+        if changed:
+            logger.info(f"Config reloaded, changed keys: {', '.join(sorted(changed))}")
+            for callback in self._listeners:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    logger.error(f"Error in config listener: {e}")
+        return changed
+
+    def _read(self) -> Dict[str, Any]:
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def _write(self, payload: str):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.config-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.path):
+                os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
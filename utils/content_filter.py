@@ -0,0 +1,154 @@
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, Optional
+
+DEFAULT_INVITE_HOSTS = [
+    "discord.gg",
+    "discord.com/invite",
+    "discordapp.com/invite",
+    "discord.me",
+    "discord.io",
+    "dsc.gg",
+    "invite.gg"
+]
+
+# Combining marks (zalgo) and zero-width characters are dropped before matching
+_STRIP = re.compile(
+    "[\u0300-\u036f\u0483-\u0489\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f"
+    "\u200b-\u200f\u2060\ufeff]+"
+)
+
+# Common look-alikes (Cyrillic, Greek, Latin extensions) that NFKD doesn't fold into ASCII
+_CONFUSABLES = str.maketrans({
+    "\u0430": "a", "\u0432": "b", "\u0435": "e", "\u043a": "k", "\u043c": "m",
+    "\u043d": "h", "\u043e": "o", "\u0440": "p", "\u0441": "c", "\u0442": "t",
+    "\u0443": "y", "\u0445": "x", "\u0456": "i", "\u0458": "j", "\u0455": "s",
+    "\u0501": "d", "\u0261": "g", "\u04cf": "l", "\u03b1": "a", "\u03b5": "e",
+    "\u03b9": "i", "\u03ba": "k", "\u03bd": "v", "\u03bf": "o", "\u03c1": "p",
+    "\u03c4": "t", "\u03c5": "u", "\u03c7": "x", "\u210a": "g", "\u0131": "i"
+})
+
+# Separators people use to dodge link filters: "discord . gg", "discord[.]gg", "discord(dot)gg"
+_DOT = r"\s*(?:\.|\[\.\]|\(\.\)|\[dot\]|\(dot\))\s*"
+_SLASH = r"\s*/\s*"
+
+def normalize(text: str) -> str:
+    """Fold case, unicode compatibility forms, confusables and zalgo"""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = _STRIP.sub("", text)
+    return text.translate(_CONFUSABLES).casefold()
+
+def _host_pattern(host: str) -> str:
+    """Regex for a host[/path] tolerant of obfuscated separators"""
+    host, _, path = host.lower().partition("/")
+    pattern = _DOT.join(re.escape(label) for label in host.split("."))
+    if path:
+        pattern += _SLASH + _SLASH.join(re.escape(part) for part in path.split("/"))
+    return pattern + _SLASH + r"\w"
+
+class FilterMatch:
+    __slots__ = ('rule', 'text')
+
+    def __init__(self, rule: str, text: str):
+        self.rule = rule
+        self.text = text
+
+    def __repr__(self) -> str:
+        return f"FilterMatch(rule={self.rule!r}, text={self.text!r})"
+
+class CompiledFilter:
+    """Every rule for one guild compiled into a single alternation regex.
+
+    Each rule is a named group, so one finditer() pass over the normalized
+    message finds whichever rule matches first. Invites come first and take
+    their scheme with them, so an allowlisted host never lets an invite
+    through. Link matches are checked against the allowlist with a set
+    lookup and skipped if allowed.
+    """
+
+    def __init__(
+        self,
+        invite_hosts: Iterable[str] = DEFAULT_INVITE_HOSTS,
+        blocked_words: Iterable[str] = (),
+        link_allowlist: Optional[Iterable[str]] = None
+    ):
+        alternatives = []
+        invite_hosts = list(invite_hosts)
+        if invite_hosts:
+            # Absorb the scheme so invite URLs are reported as invites, not checked as allowlisted links
+            alternatives.append(
+                r"(?P<invite>(?:https?://)?(?:www\.)?(?:"
+                + "|".join(_host_pattern(host) for host in invite_hosts) + "))"
+            )
+
+        words = sorted({normalize(word) for word in blocked_words if word}, key=len, reverse=True)
+        if words:
+            alternatives.append(
+                # Lookarounds instead of \b so words that start or end with punctuation ("c++") match too
+                r"(?P<blocked_word>(?<!\w)(?:" + "|".join(re.escape(word) for word in words) + r")(?!\w))"
+            )
+
+        self.link_allowlist: Optional[FrozenSet[str]] = None
+        if link_allowlist is not None:
+            self.link_allowlist = frozenset(host.lower().removeprefix("www.") for host in link_allowlist)
+            alternatives.append(r"(?P<link>https?://(?:www\.)?(?P<host>[^\s/:?#]+))")
+
+        self.pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    def check(self, content: str, skip: FrozenSet[str] = frozenset()) -> Optional[FilterMatch]:
+        """Return the first rule violation in content, ignoring rules in skip"""
+        if self.pattern is None or not content:
+            return None
+
+        for match in self.pattern.finditer(normalize(content)):
+            rule = match.lastgroup
+            if rule in skip:
+                continue
+            if rule == 'link' and self._allowed(match.group('host')):
+                continue
+            return FilterMatch(rule, match.group(0))
+        return None
+
+    def _allowed(self, host: str) -> bool:
+        # Allow subdomains of allowlisted hosts too
+        parts = host.split(".")
+        return any(".".join(parts[i:]) in self.link_allowlist for i in range(len(parts) - 1))
+
+class ContentFilter:
+    """Per-guild compiled filters built from the security.content_filter config.
+
+    Settings under 'guilds' override the top-level defaults for that guild.
+    Filters are compiled lazily on first use and cached until invalidated.
+    """
+
+    def __init__(self, settings: Optional[Dict] = None):
+        self.settings: Dict = settings or {}
+        self._compiled: Dict[int, CompiledFilter] = {}
+
+    def configure(self, settings: Dict):
+        self.settings = settings
+        self._compiled.clear()
+
+    def invalidate(self, guild_id: int):
+        self._compiled.pop(guild_id, None)
+
+    def settings_for(self, guild_id: int) -> Dict:
+        merged = {key: value for key, value in self.settings.items() if key != 'guilds'}
+        merged.update(self.settings.get('guilds', {}).get(str(guild_id), {}))
+        return merged
+
+    def for_guild(self, guild_id: int) -> CompiledFilter:
+        compiled = self._compiled.get(guild_id)
+        if compiled is None:
+            settings = self.settings_for(guild_id)
+            compiled = self._compiled[guild_id] = CompiledFilter(
+                invite_hosts=settings.get('invite_hosts', DEFAULT_INVITE_HOSTS) if settings.get('invites', True) else [],
+                blocked_words=settings.get('blocked_words', []),
+                link_allowlist=settings.get('link_allowlist')
+            )
+        return compiled
+
+    def check(self, guild_id: int, content: str, skip: FrozenSet[str] = frozenset()) -> Optional[FilterMatch]:
+        return self.for_guild(guild_id).check(content, skip)
@@ -1,14 +1,288 @@
-import motor.motor_asyncio
-import json
+import asyncio
+import copy
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple, Hashable, Callable, Awaitable
+from utils.config import Config
+from utils.metrics import database_command_listener
 from utils.logger import Logger
 
 logger = Logger.get_logger()
 
+# Same values as pymongo.ASCENDING/DESCENDING. motor and pymongo are imported
+# on first use so that importing this module (every cog does) stays cheap.
+ASCENDING = 1
+DESCENDING = -1
+
+# Indexes applied to each collection on first connect. Every query issued by
+# the managers below should be covered by one of these; run
+# scripts/check_indexes.py after adding a query to make sure it is.
+INDEXES: Dict[str, List[Tuple[List[Tuple[str, int]], Dict]]] = {
+    'warnings': [
+        ([('guild_id', ASCENDING), ('user_id', ASCENDING), ('timestamp', DESCENDING)], {})
+    ],
+    'mod_logs': [
+        ([('guild_id', ASCENDING), ('target_id', ASCENDING), ('timestamp', DESCENDING)], {})
+    ],
+    'security_logs': [
+        ([('guild_id', ASCENDING), ('event_type', ASCENDING), ('timestamp', DESCENDING)], {}),
+        ([('guild_id', ASCENDING), ('timestamp', DESCENDING)], {})
+    ],
+    'giveaways': [
+        ([('active', ASCENDING), ('end_time', ASCENDING)], {}),
+        ([('message_id', ASCENDING)], {})
+    ],
+    'tickets': [
+        ([('guild_id', ASCENDING), ('channel_id', ASCENDING), ('status', ASCENDING)], {})
+    ],
+    'badges': [
+        ([('user_id', ASCENDING), ('badge_name', ASCENDING)], {})
+    ],
+    'premium_users': [
+        ([('user_id', ASCENDING)], {'unique': True})
+    ],
+    'scheduled_actions': [
+        ([('run_at', ASCENDING)], {})
+    ]
+}
+
+# Representative query shapes per manager, used to verify query plans
+QUERY_SHAPES: List[Tuple[str, str, Dict, Optional[List[Tuple[str, int]]]]] = [
+    ('WarningManager.get_warnings', 'warnings',
+     {'guild_id': 0, 'user_id': 0}, [('timestamp', DESCENDING)]),
+    ('WarningManager.remove_warning', 'warnings',
+     {'guild_id': 0, 'user_id': 0, '_id': 0}, None),
+    ('ModLogger.get_user_history', 'mod_logs',
+     {'guild_id': 0, 'target_id': 0}, [('timestamp', DESCENDING)]),
+    ('SecurityManager.get_recent_events', 'security_logs',
+     {'guild_id': 0}, [('timestamp', DESCENDING)]),
+    ('SecurityManager.get_recent_events(event_type)', 'security_logs',
+     {'guild_id': 0, 'event_type': ''}, [('timestamp', DESCENDING)]),
+    ('GiveawayManager.get_active_giveaways', 'giveaways',
+     {'active': True}, None),
+    ('GiveawayManager.get_giveaway_by_message', 'giveaways',
+     {'message_id': 0}, None),
+    ('TicketManager.close_ticket', 'tickets',
+     {'guild_id': 0, 'channel_id': 0, 'status': 'open'}, None),
+    ('BadgeManager.get_user_badges', 'badges',
+     {'user_id': 0}, None),
+    ('BadgeManager.remove_badge', 'badges',
+     {'user_id': 0, 'badge_name': ''}, None),
+    ('PremiumManager.get_premium', 'premium_users',
+     {'user_id': 0}, None),
+    ('ScheduledActionManager.get_pending_actions', 'scheduled_actions',
+     {}, [('run_at', ASCENDING)])
+]
+
+class WriteBehindBuffer:
+    """Coalesces inserts for one collection into insert_many batches.
+
+    A batch is flushed once it reaches max_batch documents, flush_interval
+    seconds after its first document, or on shutdown. Callers that need
+    read-after-write consistency pass wait=True to block until their
+    document has been written.
+    """
+
+    def __init__(self, collection_name: str, max_batch: int = 100, flush_interval: float = 1.0):
+        self.collection_name = collection_name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._documents: List[Dict] = []
+        self._waiters: List[Optional[asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes = set()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    async def insert(self, document: Dict, wait: bool = False):
+        """Queue a document, optionally waiting for its batch to be written"""
+        waiter = asyncio.get_running_loop().create_future() if wait else None
+        self._documents.append(document)
+        self._waiters.append(waiter)
+
+        if len(self._documents) >= self.max_batch:
+            self._spawn_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        if waiter is not None:
+            await waiter
+
+    async def flush(self):
+        """Write everything queued so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        documents, waiters = self._documents, self._waiters
+        self._documents, self._waiters = [], []
+        if not documents:
+            return
+
+        from pymongo.errors import BulkWriteError
+
+        failed = {}
+        for start in range(0, len(documents), self.max_batch):
+            batch = documents[start:start + self.max_batch]
+            try:
+                collection = await Database.get_collection(self.collection_name)
+                await collection.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get('writeErrors', [])
+                for error in errors:
+                    failed[start + error['index']] = error.get('errmsg', 'write error')
+                logger.error(f"Failed to write {len(errors)} buffered {self.collection_name} documents")
+            except Exception as e:
+                failed.update(dict.fromkeys(range(start, start + len(batch)), str(e)))
+                logger.error(f"Failed to flush {self.collection_name} write buffer: {e}")
+
+        for index, waiter in enumerate(waiters):
+            if waiter is None or waiter.done():
+                continue
+            if index in failed:
+                waiter.set_exception(RuntimeError(failed[index]))
+            else:
+                waiter.set_result(None)
+
+    async def close(self):
+        """Flush the remaining documents and wait for in-flight batches"""
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _spawn_flush(self):
+        # Tracked so close() can wait for it and its errors get logged
+        task = asyncio.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task):
+        self._flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to flush {self.collection_name} write buffer: {task.exception()}")
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        self._spawn_flush()
+
+class AsyncTTLCache:
+    """Read-through LRU cache with per-entry TTL.
+
+    Concurrent misses on the same key share a single load, which runs in its
+    own task so cancelling the caller that started it doesn't cancel it for
+    the others. Invalidating a key while its load is in flight stops that
+    load's result from being cached. Callers get a deep copy, so mutating a
+    result never changes the cached value.
+    """
+
+    def __init__(self, name: str, ttl: float, max_size: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a cached value, calling loader() on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            loading = self._loading[key] = asyncio.create_task(self._load(key, loader))
+            loading.add_done_callback(self._load_done)
+        return copy.deepcopy(await asyncio.shield(loading))
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+        finally:
+            current = self._loading.get(key) is task
+            if current:
+                del self._loading[key]
+        if current:
+            self._store(key, value)
+        return value
+
+    @staticmethod
+    def _load_done(task: asyncio.Task):
+        # Retrieve the error even if every caller was cancelled, so it isn't reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def invalidate(self, key: Hashable):
+        """Drop a key and any load in flight for it"""
+        self._entries.pop(key, None)
+        self._loading.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._loading.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'hit_ratio': (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+# Read-through caches for hot lookups; sizes/TTLs can be overridden from the
+# 'cache' section of the database config
+CACHES: Dict[str, AsyncTTLCache] = {
+    'warnings': AsyncTTLCache('warnings', ttl=60, max_size=10000),
+    'badges': AsyncTTLCache('badges', ttl=300, max_size=50000),
+    'premium_users': AsyncTTLCache('premium_users', ttl=300, max_size=50000)
+}
+
+# config.json 'database' keys -> AsyncIOMotorClient options
+CLIENT_OPTIONS = {
+    'max_pool_size': 'maxPoolSize',
+    'min_pool_size': 'minPoolSize',
+    'max_idle_time_ms': 'maxIdleTimeMS',
+    'server_selection_timeout_ms': 'serverSelectionTimeoutMS',
+    'compressors': 'compressors',
+    'read_preference': 'readPreference'
+}
+
 class Database:
     _instance = None
+    _client = None
     _db = None
+    _connecting: Optional[asyncio.Lock] = None
+    _config: Optional[Config] = None
+    _index_task: Optional[asyncio.Task] = None
+    _buffers: Dict[str, WriteBehindBuffer] = {}
 
     def __new__(cls):
         if cls._instance is None:
@@ -16,28 +290,204 @@ class Database:
         return cls._instance
 
     @classmethod
-    async def get_collection(cls, collection_name: str):
-        """Get a MongoDB collection"""
-        if cls._db is None:
+    def use_config(cls, config: Config):
+        """Read connection settings from the bot's shared Config"""
+        cls._config = config
+
+    @classmethod
+    async def connect(cls, config: Optional[Config] = None):
+        """Create the shared client, warm it up and return it"""
+        if cls._client is not None:
+            return cls._client
+
+        if cls._connecting is None:
+            cls._connecting = asyncio.Lock()
+        async with cls._connecting:
+            if cls._client is not None:
+                return cls._client
+
+            config = config or cls._config
+            if config is None:
+                raise RuntimeError("Database has no config; call Database.use_config(bot.config) first")
+            cls._config = config
+            settings = config.get('database', {})
+            options = {
+                option: settings[key]
+                for key, option in CLIENT_OPTIONS.items()
+                if settings.get(key) is not None
+            }
+            if isinstance(options.get('compressors'), list):
+                options['compressors'] = ','.join(options['compressors'])
+
+            import motor.motor_asyncio
+
+            client = motor.motor_asyncio.AsyncIOMotorClient(
+                config['mongo_uri'],
+                event_listeners=[database_command_listener()],
+                **options
+            )
+            # Keep the client even if warm-up fails; the driver reconnects
+            # on its own once the server is reachable again
+            cls._client = client
+            cls._db = client.discord_bot
             try:
-                with open('config.json', 'r') as f:
-                    config = json.load(f)
-                client = motor.motor_asyncio.AsyncIOMotorClient(config['mongo_uri'])
-                cls._db = client.discord_bot
-                logger.info("Connected to MongoDB")
+                # Pay the handshake/TLS cost now rather than on the first command
+                await client.admin.command('ping')
             except Exception as e:
                 logger.error(f"Failed to connect to MongoDB: {e}")
+                # Nothing else would apply the registry once the server comes back
+                cls._index_task = asyncio.create_task(cls._ensure_indexes_when_reachable())
                 raise
 
+            logger.info("Connected to MongoDB")
+            if not await cls.ensure_indexes():
+                cls._index_task = asyncio.create_task(cls._ensure_indexes_when_reachable())
+            return client
+
+    @classmethod
+    def get_client(cls):
+        """Get the shared client, or None before connect()"""
+        return cls._client
+
+    @classmethod
+    async def close(cls):
+        """Flush pending writes and close the shared client"""
+        await cls.flush_all()
+        if cls._index_task is not None:
+            cls._index_task.cancel()
+            cls._index_task = None
+        if cls._client is not None:
+            cls._client.close()
+            cls._client = None
+            cls._db = None
+
+    @classmethod
+    async def get_collection(cls, collection_name: str):
+        """Get a MongoDB collection"""
+        if cls._db is None:
+            await cls.connect()
+
         return cls._db[collection_name]
 
+    @classmethod
+    async def ensure_indexes(cls) -> bool:
+        """Create every index in INDEXES; a no-op for indexes that already exist.
+
+        Returns whether every collection's indexes were applied.
+        """
+        from pymongo import IndexModel
+
+        applied = True
+        for collection_name, indexes in INDEXES.items():
+            try:
+                await cls._db[collection_name].create_indexes(
+                    [IndexModel(keys, **options) for keys, options in indexes]
+                )
+            except Exception as e:
+                applied = False
+                logger.error(f"Failed to create indexes for {collection_name}: {e}")
+        return applied
+
+    @classmethod
+    async def _ensure_indexes_when_reachable(cls, min_delay: float = 5.0, max_delay: float = 300.0):
+        """Retry the index registry in the background until it applies"""
+        delay = min_delay
+        while True:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+            try:
+                await cls._client.admin.command('ping')
+            except Exception as e:
+                logger.debug(f"MongoDB still unreachable, indexes not applied yet: {e}")
+                continue
+            if await cls.ensure_indexes():
+                logger.info("Applied MongoDB indexes after reconnecting")
+                return
+
+    @classmethod
+    async def explain_queries(cls) -> List[Dict]:
+        """Explain every query in QUERY_SHAPES and report its plan stages"""
+        report = []
+        for name, collection_name, query, sort in QUERY_SHAPES:
+            collection = await cls.get_collection(collection_name)
+            cursor = collection.find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = await cursor.explain()
+            stages = _plan_stages(plan['queryPlanner']['winningPlan'])
+            report.append({
+                'query': name,
+                'collection': collection_name,
+                'stages': stages,
+                'collscan': 'COLLSCAN' in stages
+            })
+        return report
+
+    @classmethod
+    def configure_write_behind(cls, settings: Dict):
+        """Enable write-behind buffering for the configured collections"""
+        if not settings.get('enabled', False):
+            return
+        for collection_name in settings.get('collections', []):
+            cls._buffers[collection_name] = WriteBehindBuffer(
+                collection_name,
+                max_batch=settings.get('max_batch', 100),
+                flush_interval=settings.get('flush_interval', 1.0)
+            )
+        logger.info(f"Write-behind enabled for: {', '.join(cls._buffers) or 'none'}")
+
+    @staticmethod
+    def configure_caches(settings: Dict):
+        """Apply per-collection ttl/max_size overrides to CACHES"""
+        for name, options in settings.items():
+            cache = CACHES.get(name)
+            if cache is None:
+                continue
+            cache.ttl = options.get('ttl', cache.ttl)
+            cache.max_size = options.get('max_size', cache.max_size)
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Dict[str, Any]]:
+        """Get hit/miss counters for every cache"""
+        return {name: cache.stats() for name, cache in CACHES.items()}
+
+    @classmethod
+    async def insert(cls, collection_name: str, document: Dict, wait: bool = False):
+        """Insert a document, through the write-behind buffer if one is enabled"""
+        buffer = cls._buffers.get(collection_name)
+        if buffer is not None:
+            await buffer.insert(document, wait=wait)
+            return
+
+        collection = await cls.get_collection(collection_name)
+        await collection.insert_one(document)
+
+    @classmethod
+    async def flush_all(cls):
+        """Flush every write-behind buffer, e.g. on shutdown"""
+        await asyncio.gather(
+            *(buffer.close() for buffer in cls._buffers.values()),
+            return_exceptions=True
+        )
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """Flatten the stage names of an explain() plan tree"""
+    stages = [plan.get('stage', '')]
+    if 'inputStage' in plan:
+        stages.extend(_plan_stages(plan['inputStage']))
+    for child in plan.get('inputStages', []):
+        stages.extend(_plan_stages(child))
+    # Slot-based engine plans nest the classic tree under queryPlan
+    if 'queryPlan' in plan:
+        stages.extend(_plan_stages(plan['queryPlan']))
+    return [stage for stage in stages if stage]
+
 class ModLogger:
     @staticmethod
     async def log_mod_action(guild_id: int, action: str, moderator_id: int, target_id: int, reason: Optional[str] = None) -> bool:
         """Log a moderation action to the database"""
         try:
-            collection = await Database.get_collection('mod_logs')
-            await collection.insert_one({
+            await Database.insert('mod_logs', {
                 'guild_id': guild_id,
                 'action': action,
                 'moderator_id': moderator_id,
@@ -68,14 +518,15 @@ class WarningManager:
     async def add_warning(guild_id: int, user_id: int, reason: str, mod_id: int) -> bool:
         """Add a warning to a user"""
         try:
-            collection = await Database.get_collection('warnings')
-            await collection.insert_one({
+            # Warnings are listed right after being added, so wait for the write
+            await Database.insert('warnings', {
                 'guild_id': guild_id,
                 'user_id': user_id,
                 'reason': reason,
                 'mod_id': mod_id,
                 'timestamp': datetime.utcnow()
-            })
+            }, wait=True)
+            CACHES['warnings'].invalidate((guild_id, user_id))
             return True
         except Exception as e:
             logger.error(f"Failed to add warning: {e}")
@@ -84,12 +535,15 @@ class WarningManager:
     @staticmethod
     async def get_warnings(guild_id: int, user_id: int) -> List[Dict]:
         """Get all warnings for a user"""
-        try:
+        async def load():
             collection = await Database.get_collection('warnings')
             return await collection.find({
                 'guild_id': guild_id,
                 'user_id': user_id
             }).sort('timestamp', -1).to_list(None)
+
+        try:
+            return await CACHES['warnings'].get((guild_id, user_id), load)
         except Exception as e:
             logger.error(f"Failed to get warnings: {e}")
             return []
@@ -104,6 +558,7 @@ class WarningManager:
                 'user_id': user_id,
                 '_id': warning_id
             })
+            CACHES['warnings'].invalidate((guild_id, user_id))
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Failed to remove warning: {e}")
@@ -114,8 +569,7 @@ class TicketManager:
     async def create_ticket(guild_id: int, channel_id: int, user_id: int, ticket_type: str) -> bool:
         """Create a new ticket"""
         try:
-            collection = await Database.get_collection('tickets')
-            await collection.insert_one({
+            await Database.insert('tickets', {
                 'guild_id': guild_id,
                 'channel_id': channel_id,
                 'user_id': user_id,
@@ -123,7 +577,7 @@ class TicketManager:
                 'status': 'open',
                 'created_at': datetime.utcnow(),
                 'closed_at': None
-            })
+            }, wait=True)
             return True
         except Exception as e:
             logger.error(f"Failed to create ticket: {e}")
@@ -154,11 +608,11 @@ class TicketManager:
 
 class GiveawayManager:
     @staticmethod
-    async def create_giveaway(guild_id: int, channel_id: int, message_id: int, prize: str, end_time: datetime, winners: int) -> bool:
-        """Create a new giveaway"""
+    async def create_giveaway(guild_id: int, channel_id: int, message_id: int, prize: str, end_time: datetime, winners: int) -> Optional[Any]:
+        """Create a new giveaway and return its id"""
         try:
             collection = await Database.get_collection('giveaways')
-            await collection.insert_one({
+            result = await collection.insert_one({
                 'guild_id': guild_id,
                 'channel_id': channel_id,
                 'message_id': message_id,
@@ -169,42 +623,138 @@ class GiveawayManager:
                 'winners': [],
                 'active': True
             })
-            return True
+            return result.inserted_id
         except Exception as e:
             logger.error(f"Failed to create giveaway: {e}")
-            return False
+            return None
 
     @staticmethod
-    async def get_active_giveaways() -> List[Dict]:
-        """Get all active giveaways"""
+    async def get_giveaway(giveaway_id: Any) -> Optional[Dict]:
+        """Get a giveaway by id"""
         try:
             collection = await Database.get_collection('giveaways')
-            return await collection.find({'active': True}).to_list(None)
+            return await collection.find_one({'_id': giveaway_id})
+        except Exception as e:
+            logger.error(f"Failed to get giveaway: {e}")
+            return None
+
+    @staticmethod
+    async def get_giveaway_by_message(message_id: int) -> Optional[Dict]:
+        """Get a giveaway by its message id"""
+        try:
+            collection = await Database.get_collection('giveaways')
+            return await collection.find_one({'message_id': message_id})
+        except Exception as e:
+            logger.error(f"Failed to get giveaway: {e}")
+            return None
+
+    @staticmethod
+    async def get_active_giveaways(projection: Optional[Dict] = None) -> Optional[List[Dict]]:
+        """Get all active giveaways; None if the query failed"""
+        try:
+            collection = await Database.get_collection('giveaways')
+            return await collection.find({'active': True}, projection).to_list(None)
         except Exception as e:
             logger.error(f"Failed to get active giveaways: {e}")
-            return []
+            return None
 
     @staticmethod
-    async def end_giveaway(giveaway_id: str) -> bool:
+    async def update_participants(changes: Dict[Any, Tuple[List[int], List[int]]]) -> bool:
+        """Apply batched (added, removed) participant ids per giveaway"""
+        from pymongo import UpdateOne
+
+        requests = []
+        for giveaway_id, (added, removed) in changes.items():
+            if added:
+                requests.append(UpdateOne(
+                    {'_id': giveaway_id},
+                    {'$addToSet': {'participants': {'$each': added}}}
+                ))
+            if removed:
+                requests.append(UpdateOne(
+                    {'_id': giveaway_id},
+                    {'$pull': {'participants': {'$in': removed}}}
+                ))
+        if not requests:
+            return True
+
+        try:
+            collection = await Database.get_collection('giveaways')
+            await collection.bulk_write(requests, ordered=False)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update giveaway participants: {e}")
+            return False
+
+    @staticmethod
+    async def end_giveaway(giveaway_id: Any, winners: Optional[List[int]] = None) -> bool:
         """End a giveaway"""
         try:
             collection = await Database.get_collection('giveaways')
+            update = {'active': False}
+            if winners is not None:
+                update['winners'] = winners
             result = await collection.update_one(
                 {'_id': giveaway_id},
-                {'$set': {'active': False}}
+                {'$set': update}
             )
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Failed to end giveaway: {e}")
             return False
 
+class ScheduledActionManager:
+    @staticmethod
+    async def add_action(action: Dict) -> bool:
+        """Persist a scheduled action (the document carries its own _id)"""
+        try:
+            await Database.insert('scheduled_actions', action, wait=True)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save scheduled action: {e}")
+            return False
+
+    @staticmethod
+    async def remove_action(action_id: Any) -> bool:
+        """Remove a scheduled action once it has run or been cancelled"""
+        try:
+            collection = await Database.get_collection('scheduled_actions')
+            result = await collection.delete_one({'_id': action_id})
+            return result.deleted_count > 0
+        except Exception as e:
+            logger.error(f"Failed to remove scheduled action: {e}")
+            return False
+
+    @staticmethod
+    async def reschedule_action(action_id: Any, run_at: datetime, attempts: int) -> bool:
+        """Move a failed action to its retry time"""
+        try:
+            collection = await Database.get_collection('scheduled_actions')
+            result = await collection.update_one(
+                {'_id': action_id},
+                {'$set': {'run_at': run_at, 'attempts': attempts}}
+            )
+            return result.matched_count > 0
+        except Exception as e:
+            logger.error(f"Failed to reschedule scheduled action: {e}")
+            return False
+
+    @staticmethod
+    async def get_pending_actions() -> Optional[List[Dict]]:
+        """Get every pending action, soonest first; None if the query failed"""
+        try:
+            collection = await Database.get_collection('scheduled_actions')
+            return await collection.find({}).sort('run_at', ASCENDING).to_list(None)
+        except Exception as e:
+            logger.error(f"Failed to get scheduled actions: {e}")
+            return None
+
 class SecurityManager:
     @staticmethod
     async def log_security_event(guild_id: int, event_type: str, user_id: int, details: str) -> bool:
         """Log a security event"""
         try:
-            collection = await Database.get_collection('security_logs')
-            await collection.insert_one({
+            await Database.insert('security_logs', {
                 'guild_id': guild_id,
                 'event_type': event_type,
                 'user_id': user_id,
@@ -234,13 +784,13 @@ class BadgeManager:
     async def add_badge(user_id: int, badge_name: str, awarded_by: int) -> bool:
         """Add a badge to a user"""
         try:
-            collection = await Database.get_collection('badges')
-            await collection.insert_one({
+            await Database.insert('badges', {
                 'user_id': user_id,
                 'badge_name': badge_name,
                 'awarded_by': awarded_by,
                 'awarded_at': datetime.utcnow()
-            })
+            }, wait=True)
+            CACHES['badges'].invalidate(user_id)
             return True
         except Exception as e:
             logger.error(f"Failed to add badge: {e}")
@@ -255,6 +805,7 @@ class BadgeManager:
                 'user_id': user_id,
                 'badge_name': badge_name
             })
+            CACHES['badges'].invalidate(user_id)
             return result.deleted_count > 0
         except Exception as e:
             logger.error(f"Failed to remove badge: {e}")
@@ -263,9 +814,61 @@ class BadgeManager:
     @staticmethod
     async def get_user_badges(user_id: int) -> List[Dict]:
         """Get all badges for a user"""
-        try:
+        async def load():
             collection = await Database.get_collection('badges')
             return await collection.find({'user_id': user_id}).to_list(None)
+
+        try:
+            return await CACHES['badges'].get(user_id, load)
         except Exception as e:
             logger.error(f"Failed to get user badges: {e}")
-            return []
\ No newline at end of file
+            return []
+
+class PremiumManager:
+    @staticmethod
+    async def grant_premium(user_id: int, granted_by: int, end_date: datetime) -> bool:
+        """Grant or extend premium status for a user"""
+        try:
+            collection = await Database.get_collection('premium_users')
+            await collection.update_one(
+                {'user_id': user_id},
+                {
+                    '$set': {
+                        'user_id': user_id,
+                        'granted_by': granted_by,
+                        'granted_at': datetime.utcnow(),
+                        'end_date': end_date
+                    }
+                },
+                upsert=True
+            )
+            CACHES['premium_users'].invalidate(user_id)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to grant premium: {e}")
+            return False
+
+    @staticmethod
+    async def revoke_premium(user_id: int) -> bool:
+        """Revoke premium status from a user"""
+        try:
+            collection = await Database.get_collection('premium_users')
+            result = await collection.delete_one({'user_id': user_id})
+            CACHES['premium_users'].invalidate(user_id)
+            return result.deleted_count > 0
+        except Exception as e:
+            logger.error(f"Failed to revoke premium: {e}")
+            return False
+
+    @staticmethod
+    async def get_premium(user_id: int) -> Optional[Dict]:
+        """Get premium data for a user, or None if they never had premium"""
+        async def load():
+            collection = await Database.get_collection('premium_users')
+            return await collection.find_one({'user_id': user_id})
+
+        try:
+            return await CACHES['premium_users'].get(user_id, load)
+        except Exception as e:
+            logger.error(f"Failed to get premium status: {e}")
+            return None
\ No newline at end of file
@@ -1,12 +1,83 @@
+import asyncio
+import atexit
+import gzip
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
+import time
+from collections import Counter
 from datetime import datetime
-import discord
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# discord is imported where it's used, so the launcher and the cluster status
+# CLI, which only need the log pipeline, don't pay for importing it
+if TYPE_CHECKING:
+    import discord
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for a bounded queue that drops (or briefly blocks) when full"""
+
+    def __init__(self, log_queue: queue.Queue, policy: str = 'drop', block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped: Counter = Counter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments here; formatting happens on the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.policy == 'block':
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record.levelname] += 1
+
+def _gzip_rotator(source: str, dest: str):
+    """Compress a rolled-over log file"""
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
 
 class Logger:
+    """Process-wide logging pipeline.
+
+    Records are put on a bounded queue by a DroppingQueueHandler and written by
+    a QueueListener thread, so formatting and disk I/O stay off the event loop.
+    The file rotates at midnight and rolled-over files are gzipped.
+    """
+
     _instance = None
     _logger = None
+    _handler: Optional[DroppingQueueHandler] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _settings: Dict[str, Any] = {}
+
+    DEFAULTS = {
+        'level': 'INFO',
+        'directory': 'logs',
+        'filename': 'discord.log',
+        'backup_count': 14,
+        'compress': True,
+        'queue_size': 10000,
+        'policy': 'drop',
+        'block_timeout': 1.0,
+        'library_level': 'INFO'
+    }
 
     def __new__(cls):
         if cls._instance is None:
@@ -15,15 +86,14 @@ class Logger:
         return cls._instance
 
     @classmethod
-    def _setup_logger(cls):
-        """Setup the logger with both file and console handlers"""
-        # Create logs directory if it doesn't exist
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
+    def _setup_logger(cls, settings: Optional[Dict[str, Any]] = None):
+        """Setup the queue handler and the listener thread writing to file and console"""
+        cls._settings = {**cls.DEFAULTS, **(settings or {})}
+        settings = cls._settings
+        level = logging.getLevelName(str(settings['level']).upper())
 
-        # Create logger
-        cls._logger = logging.getLogger('discord_bot')
-        cls._logger.setLevel(logging.INFO)
+        # Create logs directory if it doesn't exist
+        os.makedirs(settings['directory'], exist_ok=True)
 
         # Create formatters
         console_formatter = logging.Formatter(
@@ -37,21 +107,73 @@ class Logger:
 
         # Create console handler
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(console_formatter)
 
-        # Create file handler
-        file_handler = logging.FileHandler(
-            filename=f'logs/discord_{datetime.now().strftime("%Y%m%d")}.log',
-            encoding='utf-8',
-            mode='a'
+        # Create file handler, rolling over at midnight
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            filename=os.path.join(settings['directory'], settings['filename']),
+            when='midnight',
+            backupCount=settings['backup_count'],
+            encoding='utf-8'
         )
-        file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(file_formatter)
+        if settings['compress']:
+            file_handler.namer = lambda name: name + '.gz'
+            file_handler.rotator = _gzip_rotator
+
+        # Route the bot's and discord.py's records through one bounded queue
+        cls._handler = DroppingQueueHandler(
+            queue.Queue(maxsize=settings['queue_size']),
+            policy=settings['policy'],
+            block_timeout=settings['block_timeout']
+        )
+        cls._listener = logging.handlers.QueueListener(
+            cls._handler.queue, console_handler, file_handler, respect_handler_level=True
+        )
+        cls._listener.start()
+
+        cls._logger = logging.getLogger('discord_bot')
+        cls._logger.setLevel(level)
+        cls._logger.propagate = False
+        cls._logger.addHandler(cls._handler)
 
-        # Add handlers
-        cls._logger.addHandler(console_handler)
-        cls._logger.addHandler(file_handler)
+        library_logger = logging.getLogger('discord')
+        library_logger.setLevel(logging.getLevelName(str(settings['library_level']).upper()))
+        library_logger.propagate = False
+        library_logger.addHandler(cls._handler)
+
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]):
+        """Rebuild the pipeline with settings from the 'logging' config section"""
+        dropped = cls._handler.dropped if cls._handler else Counter()
+        cls.shutdown()
+        cls._setup_logger(settings)
+        cls._handler.dropped.update(dropped)
+
+    @classmethod
+    def shutdown(cls):
+        """Drain the queue, then close the file and console handlers"""
+        if cls._handler is not None:
+            for name in ('discord_bot', 'discord'):
+                logging.getLogger(name).removeHandler(cls._handler)
+            cls._handler = None
+        if cls._listener is not None:
+            cls._listener.stop()
+            for handler in cls._listener.handlers:
+                handler.close()
+            cls._listener = None
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Queue depth and dropped record counts by level"""
+        if cls._handler is None:
+            return {}
+        return {
+            'queued': cls._handler.queue.qsize(),
+            'capacity': cls._handler.queue.maxsize,
+            'policy': cls._handler.policy,
+            'dropped': dict(cls._handler.dropped)
+        }
 
     @classmethod
     def get_logger(cls):
@@ -60,10 +182,316 @@ class Logger:
             cls._setup_logger()
         return cls._logger
 
+atexit.register(Logger.shutdown)
+
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+PRIORITY_NAMES = {PRIORITY_LOW: 'low', PRIORITY_NORMAL: 'normal', PRIORITY_HIGH: 'high'}
+
+class LogChannelBuffer:
+    """Pending log embeds for one channel"""
+
+    __slots__ = ('channel', 'pending', 'full', 'space', 'task')
+
+    def __init__(self, channel: 'discord.abc.Messageable'):
+        self.channel = channel
+        # (priority, seq, embed), oldest first
+        self.pending: List[tuple] = []
+        self.full = asyncio.Event()
+        self.space = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+class LogDelivery:
+    """Batched delivery of log embeds to log channels.
+
+    Embeds queue per channel and go out up to 10 per message, once
+    flush_interval passes or the batch is full. A channel holding max_pending
+    embeds makes callers wait up to backpressure_timeout; if it is still full,
+    the oldest lowest-priority embed is dropped (the new one, if it ranks
+    lowest). One worker task runs per channel while it has pending embeds.
+    """
+
+    MAX_EMBEDS = 10
+    MAX_CHARACTERS = 6000
+
+    flush_interval = 1.0
+    max_pending = 100
+    backpressure_timeout = 2.0
+
+    _buffers: Dict[int, LogChannelBuffer] = {}
+    _seq = 0
+    counters: Counter = Counter()
+
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]):
+        """Apply the 'log_delivery' config section"""
+        cls.flush_interval = settings.get('flush_interval', cls.flush_interval)
+        cls.max_pending = settings.get('max_pending', cls.max_pending)
+        cls.backpressure_timeout = settings.get('backpressure_timeout', cls.backpressure_timeout)
+
+    @classmethod
+    async def submit(cls, channel: 'discord.abc.Messageable', embed: 'discord.Embed', priority: int = PRIORITY_NORMAL):
+        """Queue an embed for channel, waiting briefly if it is backed up"""
+        buffer = cls._buffer_for(channel)
+        if len(buffer.pending) >= cls.max_pending:
+            cls.counters['throttled'] += 1
+            buffer.space.clear()
+            try:
+                await asyncio.wait_for(buffer.space.wait(), cls.backpressure_timeout)
+            except asyncio.TimeoutError:
+                pass
+            # The worker may have drained and retired the old buffer meanwhile
+            buffer = cls._buffer_for(channel)
+
+        if len(buffer.pending) >= cls.max_pending:
+            lowest = min(range(len(buffer.pending)), key=lambda i: buffer.pending[i][:2])
+            if buffer.pending[lowest][0] >= priority:
+                cls.counters[f"dropped_{PRIORITY_NAMES.get(priority, priority)}"] += 1
+                return
+            dropped = buffer.pending.pop(lowest)
+            cls.counters[f"dropped_{PRIORITY_NAMES.get(dropped[0], dropped[0])}"] += 1
+
+        cls._seq += 1
+        buffer.pending.append((priority, cls._seq, embed))
+        if len(buffer.pending) >= cls.MAX_EMBEDS:
+            buffer.full.set()
+
+    @classmethod
+    async def flush(cls):
+        """Send everything pending and wait for the channel workers to finish"""
+        for buffer in list(cls._buffers.values()):
+            buffer.full.set()
+        tasks = [buffer.task for buffer in cls._buffers.values() if buffer.task]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {
+            'channels': len(cls._buffers),
+            'pending': sum(len(buffer.pending) for buffer in cls._buffers.values()),
+            **cls.counters
+        }
+
+    @classmethod
+    def _buffer_for(cls, channel: 'discord.abc.Messageable') -> LogChannelBuffer:
+        buffer = cls._buffers.get(channel.id)
+        if buffer is None:
+            buffer = cls._buffers[channel.id] = LogChannelBuffer(channel)
+            buffer.task = asyncio.create_task(cls._run(buffer))
+        return buffer
+
+    @classmethod
+    async def _run(cls, buffer: LogChannelBuffer):
+        try:
+            while buffer.pending:
+                if len(buffer.pending) < cls.MAX_EMBEDS:
+                    try:
+                        await asyncio.wait_for(buffer.full.wait(), cls.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                buffer.full.clear()
+                batch = cls._take(buffer)
+                buffer.space.set()
+                await cls._send(buffer.channel, batch)
+        finally:
+            if cls._buffers.get(buffer.channel.id) is buffer:
+                del cls._buffers[buffer.channel.id]
+            buffer.space.set()
+
+    @classmethod
+    def _take(cls, buffer: LogChannelBuffer) -> List['discord.Embed']:
+        """Oldest embeds that fit in one message"""
+        batch = []
+        characters = 0
+        while buffer.pending and len(batch) < cls.MAX_EMBEDS:
+            embed = buffer.pending[0][2]
+            if batch and characters + len(embed) > cls.MAX_CHARACTERS:
+                break
+            characters += len(embed)
+            batch.append(embed)
+            buffer.pending.pop(0)
+        if len(buffer.pending) >= cls.MAX_EMBEDS:
+            buffer.full.set()
+        return batch
+
+    @classmethod
+    async def _send(cls, channel: 'discord.abc.Messageable', batch: List['discord.Embed']):
+        try:
+            await channel.send(embeds=batch)
+            cls.counters['messages'] += 1
+            cls.counters['embeds'] += len(batch)
+            cls.counters['coalesced'] += len(batch) - 1
+        except Exception as e:
+            cls.counters['failed'] += len(batch)
+            Logger.get_logger().error(f"Failed to deliver {len(batch)} log embeds to {channel.id}: {e}")
+
+class LogChannelResolver:
+    """Maps (guild, log type) to a log channel without scanning the channel list.
+
+    Channel ids come from config['log_channels'], stored per guild id by
+    `setup init`; a flat {name: id} mapping from older setups is still honoured
+    for whichever guild owns those channels. Guilds without configured ids fall
+    back to one lookup by name. Results are cached per guild until a channel
+    in that guild is created, deleted or updated.
+    """
+
+    _guild_ids: Dict[int, Dict[str, int]] = {}
+    _legacy_ids: Dict[str, int] = {}
+    _cache: Dict[int, Dict[str, Optional[int]]] = {}
+
+    @classmethod
+    def configure(cls, log_channels: Dict[str, Any]):
+        """Load channel ids from the 'log_channels' config section"""
+        cls._guild_ids = {
+            int(guild_id): {name: int(channel_id) for name, channel_id in channels.items()}
+            for guild_id, channels in log_channels.items() if isinstance(channels, dict)
+        }
+        cls._legacy_ids = {
+            name: int(channel_id) for name, channel_id in log_channels.items()
+            if not isinstance(channel_id, dict)
+        }
+        cls._cache.clear()
+
+    @classmethod
+    def invalidate(cls, guild_id: int):
+        cls._cache.pop(guild_id, None)
+
+    @classmethod
+    def resolve(cls, target: Union['discord.Guild', Any], name: str) -> Optional['discord.TextChannel']:
+        """Log channel called name for a guild (or anything with a .guild)"""
+        import discord
+
+        guild = target if isinstance(target, discord.Guild) else target.guild
+        if guild is None:
+            return None
+
+        cached = cls._cache.setdefault(guild.id, {})
+        if name in cached:
+            channel_id = cached[name]
+            return guild.get_channel(channel_id) if channel_id else None
+
+        channel = None
+        for channel_id in (cls._guild_ids.get(guild.id, {}).get(name), cls._legacy_ids.get(name)):
+            channel = guild.get_channel(channel_id) if channel_id else None
+            if channel is not None:
+                break
+        if channel is None:
+            channel = discord.utils.get(guild.text_channels, name=name)
+
+        cached[name] = channel.id if channel else None
+        return channel
+
+def _dumps(event: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(event, default=str)
+    return json.dumps(event, default=str, separators=(',', ':')).encode()
+
+def _id(value: Any) -> Optional[int]:
+    return getattr(value, 'id', value)
+
+class EventSink:
+    """Optional newline-delimited JSON log of moderation/security events.
+
+    Every event has the same typed fields (ts, guild, actor, target, action,
+    cog, latency_ms, details) so rotated files convert straight to a columnar
+    table with scripts/export_events.py. Lines are serialized with orjson when
+    it is installed and buffered in memory; a background task appends them to
+    logs/events/events-YYYYMMDD.ndjson every flush_interval seconds, or sooner
+    once max_buffer bytes are waiting. Disabled unless configured.
+    """
+
+    enabled = False
+    directory = os.path.join('logs', 'events')
+    flush_interval = 5.0
+    max_buffer = 1024 * 1024
+
+    _buffer: List[bytes] = []
+    _buffered = 0
+    _task: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    written = 0
+
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]):
+        """Apply the 'event_log' config section"""
+        cls.enabled = settings.get('enabled', False)
+        cls.directory = settings.get('directory', cls.directory)
+        cls.flush_interval = settings.get('flush_interval', cls.flush_interval)
+        cls.max_buffer = settings.get('max_buffer', cls.max_buffer)
+
+    @classmethod
+    def emit(
+        cls,
+        action: str,
+        *,
+        guild: Any = None,
+        actor: Any = None,
+        target: Any = None,
+        cog: Optional[str] = None,
+        latency: Optional[float] = None,
+        details: Optional[str] = None
+    ):
+        """Buffer one event; ids may be given as objects with an .id"""
+        if not cls.enabled:
+            return
+        line = _dumps({
+            'ts': time.time(),
+            'guild': _id(guild),
+            'actor': _id(actor),
+            'target': _id(target),
+            'action': action,
+            'cog': cog,
+            'latency_ms': round(latency * 1000, 3) if latency is not None else None,
+            'details': details
+        }) + b'\n'
+        cls._buffer.append(line)
+        cls._buffered += len(line)
+
+        if cls._task is None or cls._task.done():
+            cls._wakeup = asyncio.Event()
+            cls._task = asyncio.create_task(cls._run())
+        if cls._buffered >= cls.max_buffer:
+            cls._wakeup.set()
+
+    @classmethod
+    async def flush(cls):
+        """Write out everything buffered so far"""
+        if not cls._buffer:
+            return
+        data = b''.join(cls._buffer)
+        cls._buffer = []
+        cls._buffered = 0
+        path = os.path.join(cls.directory, f"events-{datetime.utcnow().strftime('%Y%m%d')}.ndjson")
+        try:
+            await asyncio.to_thread(cls._write, path, data)
+            cls.written += len(data)
+        except Exception as e:
+            Logger.get_logger().error(f"Failed to write event log: {e}")
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(data)
+
+    @classmethod
+    async def _run(cls):
+        while cls._buffer:
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), cls.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            cls._wakeup.clear()
+            await cls.flush()
+
 class ModLogger:
     @staticmethod
-    async def log_mod_action(ctx, action: str, target: Union[discord.Member, discord.User, discord.TextChannel], reason: Optional[str] = None):
+    async def log_mod_action(ctx, action: str, target: Union['discord.Member', 'discord.User', 'discord.TextChannel'], reason: Optional[str] = None):
         """Log moderation actions to both console and mod-logs channel"""
+        import discord
+
         logger = Logger.get_logger()
         
         # Create log message
@@ -77,11 +505,20 @@ class ModLogger:
 
         # Log to console/file
         logger.info(log_message)
+        EventSink.emit(
+            f"mod.{action.lower()}",
+            guild=ctx.guild,
+            actor=ctx.author,
+            target=target,
+            cog=ctx.cog.qualified_name if ctx.cog else None,
+            latency=(discord.utils.utcnow() - ctx.message.created_at).total_seconds(),
+            details=reason
+        )
 
         # Log to mod-logs channel
         try:
-            # Get mod-logs channel from config
-            mod_logs = discord.utils.get(ctx.guild.text_channels, name="mod-logs")
+            # Get mod-logs channel from config, falling back to its name
+            mod_logs = LogChannelResolver.resolve(ctx, "mod-logs")
             if mod_logs:
                 embed = discord.Embed(
                     title=f"Moderation Action: {action.title()}",
@@ -120,7 +557,7 @@ class ModLogger:
                     )
 
                 embed.set_footer(text="Developed By Lickzy")
-                await mod_logs.send(embed=embed)
+                await LogDelivery.submit(mod_logs, embed)
 
         except Exception as e:
             logger.error(f"Failed to log to mod-logs channel: {e}")
@@ -128,6 +565,8 @@ class ModLogger:
     @staticmethod
     def _get_action_color(action: str) -> int:
         """Get color for different moderation actions"""
+        import discord
+
         colors = {
             'ban': discord.Color.red(),
             'unban': discord.Color.green(),
@@ -145,6 +584,8 @@ class SecurityLogger:
     @staticmethod
     async def log_security_event(ctx, event_type: str, details: str):
         """Log security events to both console and security-logs channel"""
+        import discord
+
         logger = Logger.get_logger()
         
         # Create log message
@@ -152,10 +593,11 @@ class SecurityLogger:
         
         # Log to console/file
         logger.info(log_message)
+        EventSink.emit(f"security.{event_type.lower()}", guild=getattr(ctx, 'guild', ctx), cog="Security", details=details)
 
         # Log to security-logs channel
         try:
-            security_logs = discord.utils.get(ctx.guild.text_channels, name="security-logs")
+            security_logs = LogChannelResolver.resolve(ctx, "security-logs")
             if security_logs:
                 embed = discord.Embed(
                     title=f"Security Event: {event_type}",
@@ -164,7 +606,7 @@ class SecurityLogger:
                     timestamp=datetime.utcnow()
                 )
                 embed.set_footer(text="Developed By Lickzy")
-                await security_logs.send(embed=embed)
+                await LogDelivery.submit(security_logs, embed, PRIORITY_HIGH)
 
         except Exception as e:
             logger.error(f"Failed to log to security-logs channel: {e}")
@@ -173,6 +615,8 @@ class GiveawayLogger:
     @staticmethod
     async def log_giveaway_action(ctx, action: str, details: str):
         """Log giveaway actions to both console and giveaway-logs channel"""
+        import discord
+
         logger = Logger.get_logger()
         
         # Create log message
@@ -180,10 +624,11 @@ class GiveawayLogger:
         
         # Log to console/file
         logger.info(log_message)
+        EventSink.emit(f"giveaway.{action.lower()}", guild=getattr(ctx, 'guild', ctx), cog="Giveaways", details=details)
 
         # Log to giveaway-logs channel
         try:
-            giveaway_logs = discord.utils.get(ctx.guild.text_channels, name="giveaway-logs")
+            giveaway_logs = LogChannelResolver.resolve(ctx, "giveaway-logs")
             if giveaway_logs:
                 embed = discord.Embed(
                     title=f"Giveaway {action}",
@@ -192,7 +637,7 @@ class GiveawayLogger:
                     timestamp=datetime.utcnow()
                 )
                 embed.set_footer(text="Developed By Lickzy")
-                await giveaway_logs.send(embed=embed)
+                await LogDelivery.submit(giveaway_logs, embed, PRIORITY_LOW)
 
         except Exception as e:
             logger.error(f"Failed to log to giveaway-logs channel: {e}")
@@ -201,6 +646,8 @@ class TicketLogger:
     @staticmethod
     async def log_ticket_action(ctx, action: str, ticket_id: int, details: str):
         """Log ticket actions to both console and ticket-logs channel"""
+        import discord
+
         logger = Logger.get_logger()
         
         # Create log message
@@ -208,10 +655,11 @@ class TicketLogger:
         
         # Log to console/file
         logger.info(log_message)
+        EventSink.emit(f"ticket.{action.lower()}", guild=getattr(ctx, 'guild', ctx), target=ticket_id, cog="Tickets", details=details)
 
         # Log to ticket-logs channel
         try:
-            ticket_logs = discord.utils.get(ctx.guild.text_channels, name="ticket-logs")
+            ticket_logs = LogChannelResolver.resolve(ctx, "ticket-logs")
             if ticket_logs:
                 embed = discord.Embed(
                     title=f"Ticket {action}",
@@ -220,7 +668,7 @@ class TicketLogger:
                     timestamp=datetime.utcnow()
                 )
                 embed.set_footer(text="Developed By Lickzy")
-                await ticket_logs.send(embed=embed)
+                await LogDelivery.submit(ticket_logs, embed, PRIORITY_LOW)
 
         except Exception as e:
             logger.error(f"Failed to log to ticket-logs channel: {e}")
\ No newline at end of file
@@ -0,0 +1,110 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from utils.logger import EventSink, Logger
+from utils.metrics import Histogram
+
+logger = Logger.get_logger()
+
+class Stall:
+    """One period where the event loop was blocked past the threshold"""
+
+    __slots__ = ('timestamp', 'duration', 'stack')
+
+    def __init__(self, timestamp: float, duration: float, stack: Optional[List[str]]):
+        self.timestamp = timestamp
+        self.duration = duration
+        self.stack = stack
+
+class LoopMonitor:
+    """Samples event-loop scheduling delay and records stalls.
+
+    A task sleeps for interval seconds at a time; how late it wakes up is the
+    loop lag, kept in a histogram. Any wake-up later than stall_threshold is
+    logged as a stall. With debug enabled, a watchdog thread notices the loop
+    is stuck while it still is and captures the loop thread's stack, so the
+    stall record shows the callback that was blocking it.
+    """
+
+    def __init__(self, interval: float = 0.5, stall_threshold: float = 0.25, debug: bool = False, max_stalls: int = 20):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.debug = debug
+        self.lag = Histogram()
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._captured_stack: Optional[List[str]] = None
+
+    def start(self):
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample())
+        if self.debug:
+            self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.lag.snapshot(),
+            'stalls': self.stall_count,
+            'recent_stalls': [
+                {'timestamp': stall.timestamp, 'duration_ms': round(stall.duration * 1000, 1), 'stack': stall.stack}
+                for stall in self.stalls
+            ]
+        }
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - expected)
+            self.lag.observe(lag)
+            if lag >= self.stall_threshold:
+                self._record_stall(lag)
+
+    def _record_stall(self, lag: float):
+        stack, self._captured_stack = self._captured_stack, None
+        self.stall_count += 1
+        self.stalls.append(Stall(time.time(), lag, stack))
+
+        where = stack[-1].strip().splitlines()[0] if stack else "unknown (enable debug for stacks)"
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms at {where}")
+        EventSink.emit(
+            'loop.stall',
+            cog='LoopMonitor',
+            latency=lag,
+            details=''.join(stack) if stack else None
+        )
+
+    def _watch(self):
+        """Watchdog thread: grab the loop thread's stack while it is stuck"""
+        poll = max(0.01, self.stall_threshold / 2)
+        reported_beat = None
+        while not self._stopped.wait(poll):
+            beat = self._last_beat
+            if beat == reported_beat:
+                continue
+            if time.monotonic() - beat > self.interval + self.stall_threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._captured_stack = traceback.format_stack(frame)[-15:]
+                reported_beat = beat
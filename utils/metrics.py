@@ -0,0 +1,408 @@
+import bisect
+import gc
+import json
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import EventSink, Logger, LogDelivery
+
+logger = Logger.get_logger()
+
+# Bucket upper bounds in milliseconds; anything slower lands in the overflow bucket
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds in, milliseconds reported)"""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.sum / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'max_ms': round(self.max, 3)
+        }
+
+class Timing:
+    """Latency breakdown, error and in-flight counts for one command or listener.
+
+    rest and db are time spent awaiting Discord's API and MongoDB; cpu is the
+    remainder, i.e. our own code plus any time spent waiting for the loop.
+    """
+
+    __slots__ = ('total', 'rest', 'db', 'cpu', 'errors', 'in_flight')
+
+    def __init__(self):
+        self.total = Histogram()
+        self.rest = Histogram()
+        self.db = Histogram()
+        self.cpu = Histogram()
+        self.errors = 0
+        self.in_flight = 0
+
+    def record(self, span: 'Span', failed: bool):
+        elapsed = time.perf_counter() - span.start
+        self.total.observe(elapsed)
+        self.rest.observe(span.rest)
+        self.db.observe(span.db)
+        self.cpu.observe(max(0.0, elapsed - span.rest - span.db))
+        if failed:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'calls': self.total.count,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'total': self.total.snapshot(),
+            'rest': self.rest.snapshot(),
+            'db': self.db.snapshot(),
+            'cpu': self.cpu.snapshot()
+        }
+
+class Span:
+    """Wait time accumulated by the command or listener currently running"""
+
+    __slots__ = ('start', 'rest', 'db')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.rest = 0.0
+        self.db = 0.0
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('metrics_span', default=None)
+
+class Metrics:
+    """Process-wide command, listener, REST and database timings"""
+
+    commands: Dict[str, Timing] = {}
+    listeners: Dict[str, Timing] = {}
+    rest = Histogram()
+    db: Dict[str, Histogram] = {}
+    db_errors = 0
+    started = time.time()
+    _db_lock = threading.Lock()
+
+    @classmethod
+    def command(cls, name: str) -> Timing:
+        timing = cls.commands.get(name)
+        if timing is None:
+            timing = cls.commands[name] = Timing()
+        return timing
+
+    @classmethod
+    def listener(cls, name: str) -> Timing:
+        timing = cls.listeners.get(name)
+        if timing is None:
+            timing = cls.listeners[name] = Timing()
+        return timing
+
+    @classmethod
+    def begin(cls, timing: Timing) -> Span:
+        """Start timing in the current context"""
+        span = Span()
+        _current_span.set(span)
+        timing.in_flight += 1
+        return span
+
+    @classmethod
+    def end(cls, timing: Timing, span: Optional[Span], failed: bool):
+        timing.in_flight -= 1
+        if span is not None:
+            timing.record(span, failed)
+        _current_span.set(None)
+
+    @classmethod
+    def record_rest(cls, seconds: float):
+        cls.rest.observe(seconds)
+        span = _current_span.get()
+        if span is not None:
+            span.rest += seconds
+
+    @classmethod
+    def record_db(cls, command: str, seconds: float, failed: bool = False):
+        # Called from the driver's executor threads; motor copies our context there
+        with cls._db_lock:
+            histogram = cls.db.get(command)
+            if histogram is None:
+                histogram = cls.db[command] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                cls.db_errors += 1
+            # Concurrent queries of one command finish on different threads
+            span = _current_span.get()
+            if span is not None:
+                span.db += seconds
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Any]:
+        return {
+            'uptime': round(time.time() - cls.started, 1),
+            'commands': {name: timing.snapshot() for name, timing in cls.commands.items()},
+            'listeners': {name: timing.snapshot() for name, timing in cls.listeners.items()},
+            'rest': cls.rest.snapshot(),
+            'db': {name: histogram.snapshot() for name, histogram in cls.db.items()},
+            'db_errors': cls.db_errors
+        }
+
+def instrument_http(http) -> None:
+    """Time every Discord API request made through the bot's HTTPClient"""
+    request = http.request
+
+    async def timed_request(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await request(*args, **kwargs)
+        finally:
+            Metrics.record_rest(time.perf_counter() - start)
+
+    http.request = timed_request
+
+def timed_listener(func: Callable, name: str) -> Callable:
+    """Wrap an event listener so each call is timed under name"""
+    timing = Metrics.listener(name)
+
+    async def wrapper(*args, **kwargs):
+        span = Metrics.begin(timing)
+        failed = False
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            Metrics.end(timing, span, failed)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+_command_listener_class = None
+
+def database_command_listener():
+    """A pymongo CommandListener that feeds MongoDB command durations into Metrics"""
+    global _command_listener_class
+    if _command_listener_class is None:
+        from pymongo import monitoring
+
+        class DatabaseCommandListener(monitoring.CommandListener):
+            def started(self, event):
+                pass
+
+            def succeeded(self, event):
+                Metrics.record_db(event.command_name, event.duration_micros / 1e6)
+
+            def failed(self, event):
+                Metrics.record_db(event.command_name, event.duration_micros / 1e6, failed=True)
+
+        _command_listener_class = DatabaseCommandListener
+    return _command_listener_class()
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+class PrometheusWriter:
+    """Builds the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, Any], float]]):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(labels)} {float(value)!r}")
+
+    def gauge(self, name: str, help_text: str, value: float, **labels):
+        self.metric(name, 'gauge', help_text, [(labels, value)])
+
+    def histogram(self, name: str, help_text: str, series: Iterable[Tuple[Dict[str, Any], Histogram]]):
+        """Histograms are exported in seconds"""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, count in zip(BUCKETS_MS, histogram.counts):
+                cumulative += count
+                self.lines.append(f"{name}_bucket{_labels({**labels, 'le': bound / 1000})} {cumulative}")
+            self.lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+            self.lines.append(f"{name}_sum{_labels(labels)} {histogram.sum / 1000!r}")
+            self.lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+def collect_timings(writer: PrometheusWriter):
+    """Command, listener, Discord API and MongoDB timings"""
+    for kind, timings in (('command', Metrics.commands), ('listener', Metrics.listeners)):
+        label = lambda name: {kind: name, **({'cog': name.split('.')[0]} if kind == 'listener' else {})}
+        writer.histogram(
+            f"bot_{kind}_duration_seconds", f"Wall time per {kind} call",
+            [(label(name), timing.total) for name, timing in timings.items()]
+        )
+        for part in ('rest', 'db', 'cpu'):
+            writer.metric(
+                f"bot_{kind}_{part}_seconds_total", 'counter', f"Time {kind}s spent on {part}",
+                [(label(name), getattr(timing, part).sum / 1000) for name, timing in timings.items()]
+            )
+        writer.metric(
+            f"bot_{kind}_errors_total", 'counter', f"{kind.title()} calls that raised",
+            [(label(name), timing.errors) for name, timing in timings.items()]
+        )
+        writer.metric(
+            f"bot_{kind}_in_flight", 'gauge', f"{kind.title()} calls currently running",
+            [(label(name), timing.in_flight) for name, timing in timings.items()]
+        )
+    writer.histogram("bot_discord_request_duration_seconds", "Discord API request time", [({}, Metrics.rest)])
+    with Metrics._db_lock:
+        series = [({'command': name}, histogram) for name, histogram in Metrics.db.items()]
+        writer.histogram("bot_db_command_duration_seconds", "MongoDB command time", series)
+    writer.metric("bot_db_errors_total", 'counter', "Failed MongoDB commands", [({}, Metrics.db_errors)])
+
+def collect_process(writer: PrometheusWriter):
+    """Memory, GC and logging pipeline health"""
+    try:
+        import psutil
+        writer.gauge("process_resident_memory_bytes", "Resident set size", psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+    writer.metric(
+        "python_gc_objects_tracked", 'gauge', "Objects tracked per GC generation",
+        [({'generation': generation}, count) for generation, count in enumerate(gc.get_count())]
+    )
+    writer.metric(
+        "python_gc_collections_total", 'counter', "Collections per GC generation",
+        [({'generation': generation}, stats['collections']) for generation, stats in enumerate(gc.get_stats())]
+    )
+    writer.metric(
+        "python_gc_collected_objects_total", 'counter', "Objects collected per GC generation",
+        [({'generation': generation}, stats['collected']) for generation, stats in enumerate(gc.get_stats())]
+    )
+
+    log_stats = Logger.stats()
+    if log_stats:
+        writer.gauge("bot_log_queue_depth", "Records waiting for the log writer thread", log_stats['queued'])
+        writer.gauge("bot_log_queue_capacity", "Log queue size limit", log_stats['capacity'])
+        writer.metric(
+            "bot_log_records_dropped_total", 'counter', "Log records dropped on a full queue",
+            [({'level': level}, count) for level, count in log_stats['dropped'].items()]
+        )
+    delivery = LogDelivery.stats()
+    writer.gauge("bot_log_channel_pending", "Log embeds waiting for delivery", delivery.pop('pending'))
+    delivery.pop('channels')
+    writer.metric(
+        "bot_log_channel_events_total", 'counter', "Log channel delivery counters",
+        [({'event': name}, count) for name, count in delivery.items()]
+    )
+    writer.metric("bot_event_log_bytes_total", 'counter', "Bytes written to the NDJSON event log", [({}, EventSink.written)])
+
+class MetricsServer:
+    """Local HTTP endpoint for scraping metrics.
+
+    Serves a JSON snapshot on /stats and the Prometheus text format on
+    /metrics; other modules add sections with add_provider (JSON) and
+    add_collector (Prometheus) before start().
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 9464):
+        # aiohttp.web is only needed when the endpoint is enabled
+        from aiohttp import web
+
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.runner = None
+        self.providers: List[Callable[[], Dict[str, Any]]] = []
+        self.collectors: List[Callable[[PrometheusWriter], None]] = [collect_timings, collect_process]
+        self.add_route('/stats', self._stats)
+        self.add_route('/metrics', self._metrics)
+
+    def add_route(self, path: str, handler: Callable):
+        self.app.router.add_get(path, handler)
+
+    def add_provider(self, provider: Callable[[], Dict[str, Any]]):
+        """Merge extra top-level keys into the /stats snapshot"""
+        self.providers.append(provider)
+
+    def add_collector(self, collector: Callable[[PrometheusWriter], None]):
+        self.collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = Metrics.snapshot()
+        for provider in self.providers:
+            try:
+                snapshot.update(provider())
+            except Exception as e:
+                logger.error(f"Metrics provider failed: {e}")
+        return snapshot
+
+    async def start(self):
+        from aiohttp import web
+
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        # Port 0 binds an ephemeral port; report the one we got
+        self.port = self.runner.addresses[0][1]
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def _stats(self, request):
+        from aiohttp import web
+
+        return web.json_response(self.snapshot(), dumps=lambda data: json.dumps(data, default=str))
+
+    async def _metrics(self, request):
+        from aiohttp import web
+
+        writer = PrometheusWriter()
+        for collector in self.collectors:
+            try:
+                collector(writer)
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        return web.Response(
+            body=writer.render().encode(),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple, Union
+
+import discord
+
+from utils.logger import Logger
+
+logger = Logger.get_logger()
+
+ProgressCallback = Callable[[int, int], Awaitable[Any]]
+
+class BulkOverwriteResult:
+    """Outcome of a bulk overwrite run"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.updated = 0
+        self.skipped = 0
+        self.failed: List[Tuple[discord.abc.GuildChannel, Exception]] = []
+
+    @property
+    def succeeded(self) -> int:
+        """Channels that now have the requested overwrite"""
+        return self.updated + self.skipped
+
+    @property
+    def done(self) -> int:
+        return self.updated + self.skipped + len(self.failed)
+
+    def failure_summary(self, limit: int = 10) -> str:
+        """One line per failed channel, truncated to limit entries"""
+        lines = [f"{channel.mention}: {_describe(error)}" for channel, error in self.failed[:limit]]
+        if len(self.failed) > limit:
+            lines.append(f"...and {len(self.failed) - limit} more")
+        return "\n".join(lines)
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, discord.Forbidden):
+        return "missing permissions"
+    if isinstance(error, discord.HTTPException):
+        return f"HTTP {error.status}"
+    return type(error).__name__
+
+def overwrite_matches(channel: discord.abc.GuildChannel, target: Union[discord.Role, discord.Member], permissions: dict) -> bool:
+    """Check whether the channel's overwrite for target already has these values"""
+    current = channel.overwrites_for(target)
+    return all(getattr(current, name) == value for name, value in permissions.items())
+
+async def bulk_set_permissions(
+    channels: Iterable[discord.abc.GuildChannel],
+    target: Union[discord.Role, discord.Member],
+    *,
+    concurrency: int = 5,
+    progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 2.0,
+    reason: Optional[str] = None,
+    **permissions
+) -> BulkOverwriteResult:
+    """Apply the same overwrite for target to many channels concurrently.
+
+    Each edit hits a separate per-channel route bucket, which discord.py's
+    HTTP client already tracks and waits on; the semaphore keeps us well under
+    the global request rate. Channels whose overwrite already matches are
+    skipped without a request, and other overwrite values for the target are
+    preserved.
+    """
+    channels = list(channels)
+    result = BulkOverwriteResult(len(channels))
+    semaphore = asyncio.Semaphore(concurrency)
+    last_report = time.monotonic()
+
+    async def report(force: bool = False):
+        nonlocal last_report
+        if progress is None:
+            return
+        now = time.monotonic()
+        if force or now - last_report >= progress_interval:
+            last_report = now
+            try:
+                await progress(result.done, result.total)
+            except Exception as e:
+                logger.warning(f"Failed to report overwrite progress: {e}")
+
+    async def apply(channel: discord.abc.GuildChannel):
+        if overwrite_matches(channel, target, permissions):
+            result.skipped += 1
+            return
+
+        async with semaphore:
+            try:
+                overwrite = channel.overwrites_for(target)
+                overwrite.update(**permissions)
+                await channel.set_permissions(target, overwrite=overwrite, reason=reason)
+                result.updated += 1
+            except Exception as e:
+                result.failed.append((channel, e))
+        await report()
+
+    await asyncio.gather(*(apply(channel) for channel in channels))
+    await report(force=True)
+
+    if result.failed:
+        logger.warning(f"Failed to update overwrites on {len(result.failed)}/{result.total} channels")
+    return result
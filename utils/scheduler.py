@@ -0,0 +1,287 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from utils.database import ScheduledActionManager
+from utils.logger import Logger
+
+if TYPE_CHECKING:
+    from bson import ObjectId
+
+logger = Logger.get_logger()
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+T = TypeVar('T')
+
+def parse_duration(text: str) -> Optional[timedelta]:
+    """Parse durations like 30s, 10m, 1h, 1d or 1w"""
+    text = text.strip().lower()
+    if len(text) < 2 or text[-1] not in DURATION_UNITS:
+        return None
+    try:
+        value = int(text[:-1])
+    except ValueError:
+        return None
+    if value <= 0:
+        return None
+    return timedelta(seconds=value * DURATION_UNITS[text[-1]])
+
+async def retry_with_backoff(
+    load: Callable[[], Awaitable[Optional[T]]],
+    what: str,
+    min_delay: float = 5.0,
+    max_delay: float = 300.0
+) -> T:
+    """Call load() until it returns something other than None (or stops raising).
+
+    Used for startup restores, where giving up would leave persisted work
+    unscheduled until the next restart.
+    """
+    delay = min_delay
+    while True:
+        try:
+            result = await load()
+        except Exception as e:
+            logger.error(f"Failed to {what}: {e}")
+            result = None
+        if result is not None:
+            return result
+        logger.warning(f"Could not {what}, retrying in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+class DeadlineScheduler:
+    """Min-heap of deadlines that sleeps until exactly the next one is due.
+
+    Deadlines are naive UTC datetimes, the same as the ones stored in MongoDB.
+    Rescheduling or cancelling a key leaves its old heap entry in place; stale
+    entries are skipped when popped instead of being searched for and removed.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Hashable], Awaitable[Any]],
+        name: str = "scheduler",
+        max_sleep: float = 60.0,
+        max_concurrency: int = 10
+    ):
+        self.callback = callback
+        self.name = name
+        # Upper bound on a single sleep so wall-clock jumps are noticed
+        self.max_sleep = max_sleep
+        self._heap: List[Tuple[datetime, int, Hashable]] = []
+        self._deadlines: Dict[Hashable, datetime] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._runner: Optional[asyncio.Task] = None
+        self._pending = set()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, deadline: datetime):
+        """Add or move the deadline for a key"""
+        seq = next(self._counter)
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, seq, key))
+        # Only wake the runner if this entry is now the earliest one
+        if self._heap[0][1] == seq:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Forget a key; its heap entry is discarded lazily"""
+        return self._deadlines.pop(key, None) is not None
+
+    def next_deadline(self) -> Optional[datetime]:
+        """Get the earliest live deadline"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def start(self):
+        """Start the background runner"""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run(), name=self.name)
+
+    def stop(self):
+        """Stop the runner and any in-flight callbacks"""
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+        for task in list(self._pending):
+            task.cancel()
+
+    def _discard_stale(self):
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) == deadline:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: datetime) -> List[Hashable]:
+        """Pop every key whose deadline has passed"""
+        due = []
+        while self._heap:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append(key)
+        return due
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            # Re-read the clock every iteration so skew or jumps only delay a
+            # deadline by at most max_sleep
+            now = datetime.utcnow()
+            for key in self._pop_due(now):
+                task = asyncio.create_task(self._dispatch(key))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+            deadline = self.next_deadline()
+            timeout = self.max_sleep
+            if deadline is not None:
+                timeout = min(max((deadline - now).total_seconds(), 0), self.max_sleep)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch(self, key: Hashable):
+        async with self._semaphore:
+            try:
+                await self.callback(key)
+            except Exception as e:
+                logger.error(f"Error running {self.name} callback for {key}: {e}")
+
+ActionHandler = Callable[[Dict], Awaitable[Any]]
+
+class ActionScheduler:
+    """Persistent delayed actions (unmute, unban, unlock, ticket auto-close...).
+
+    Actions are stored in the scheduled_actions collection and restored on
+    startup, so a restart no longer loses them. All pending actions share a
+    single DeadlineScheduler runner instead of one sleeping coroutine each.
+    Cogs register a handler per action name; the handler receives the stored
+    document. A handler that raises is retried with exponential backoff (the
+    new run_at is persisted too) and only dropped after max_attempts.
+    """
+
+    def __init__(self, bot, max_attempts: int = 5, retry_delay: float = 30.0, max_retry_delay: float = 3600.0):
+        self.bot = bot
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.handlers: Dict[str, ActionHandler] = {}
+        self.actions: Dict['ObjectId', Dict] = {}
+        self.scheduler = DeadlineScheduler(self._run_action, name="action-scheduler")
+        self._restore_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def register(self, action: str, handler: ActionHandler):
+        """Register the coroutine that performs an action"""
+        self.handlers[action] = handler
+
+    async def schedule(self, action: str, run_at: datetime, guild_id: int, **payload) -> 'ObjectId':
+        """Persist an action and schedule it; returns its id"""
+        from bson import ObjectId
+
+        document = {
+            '_id': ObjectId(),
+            'action': action,
+            'run_at': run_at,
+            'guild_id': guild_id,
+            'created_at': datetime.utcnow(),
+            **payload
+        }
+        # Still run it if persisting fails; it just won't survive a restart
+        await ScheduledActionManager.add_action(document)
+        self.actions[document['_id']] = document
+        self.scheduler.schedule(document['_id'], run_at)
+        return document['_id']
+
+    async def cancel(self, action_id: 'ObjectId') -> bool:
+        """Cancel a pending action"""
+        self.scheduler.cancel(action_id)
+        existed = self.actions.pop(action_id, None) is not None
+        await ScheduledActionManager.remove_action(action_id)
+        return existed
+
+    def find(self, action: str, **match) -> List[Dict]:
+        """Pending actions of a type whose fields equal match"""
+        return [
+            document for document in self.actions.values()
+            if document['action'] == action
+            and all(document.get(key) == value for key, value in match.items())
+        ]
+
+    def start(self):
+        """Restore persisted actions once the bot is ready"""
+        if self._restore_task is None:
+            self._restore_task = asyncio.create_task(self._restore())
+
+    def stop(self):
+        if self._restore_task:
+            self._restore_task.cancel()
+        self.scheduler.stop()
+
+    async def _restore(self):
+        await self.bot.wait_until_ready()
+        # Actions scheduled after startup must run even while the restore is retrying
+        self.scheduler.start()
+        pending = await retry_with_backoff(ScheduledActionManager.get_pending_actions, "load scheduled actions")
+        restored = 0
+        for document in pending:
+            # With several shard processes, each runs the actions of its own guilds
+            if not self.bot.owns_guild(document['guild_id']):
+                continue
+            if document['_id'] not in self.actions:
+                self.actions[document['_id']] = document
+                self.scheduler.schedule(document['_id'], document['run_at'])
+                restored += 1
+        logger.info(f"Restored {restored} scheduled actions")
+
+    async def _run_action(self, action_id: 'ObjectId'):
+        document = self.actions.pop(action_id, None)
+        if document is None:
+            return
+
+        handler = self.handlers.get(document['action'])
+        if handler is None:
+            # Leave it persisted so it runs once the owning cog is loaded again
+            logger.warning(f"No handler registered for scheduled action {document['action']}")
+            return
+
+        try:
+            await handler(document)
+        except Exception as e:
+            attempts = document.get('attempts', 0) + 1
+            if attempts < self.max_attempts:
+                delay = min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+                logger.warning(
+                    f"Scheduled action {document['action']} failed (attempt {attempts}/{self.max_attempts}), "
+                    f"retrying in {delay:.0f}s: {e}"
+                )
+                await self._retry(document, attempts, datetime.utcnow() + timedelta(seconds=delay))
+                return
+            logger.error(f"Scheduled action {document['action']} failed {attempts} times, giving up: {e}")
+        await ScheduledActionManager.remove_action(action_id)
+
+    async def _retry(self, document: Dict, attempts: int, run_at: datetime):
+        document['attempts'] = attempts
+        document['run_at'] = run_at
+        self.actions[document['_id']] = document
+        self.scheduler.schedule(document['_id'], run_at)
+        await ScheduledActionManager.reschedule_action(document['_id'], run_at, attempts)
@@ -0,0 +1,243 @@
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class JoinWindow:
+    """Sliding join counter for one guild, split into fixed-size time buckets.
+
+    Counting is O(1) amortized: advancing the window only clears the buckets
+    that fell out of it since the last join. Memory is one int per bucket plus
+    at most max_tracked recent member ids.
+    """
+
+    __slots__ = ('window', 'threshold', 'bucket_size', 'counts', 'head', 'total', 'recent', 'last_seen')
+
+    def __init__(self, window: float, threshold: int, max_tracked: int, bucket_size: float = 1.0):
+        self.window = window
+        self.threshold = threshold
+        self.bucket_size = bucket_size
+        self.counts = [0] * max(1, math.ceil(window / bucket_size))
+        self.head: Optional[int] = None
+        self.total = 0
+        self.recent: deque = deque(maxlen=max_tracked)
+        self.last_seen = 0.0
+
+    def record(self, member_id: int, now: float) -> int:
+        """Count a join and return the number of joins in the window"""
+        self._advance(now)
+        self.counts[self.head % len(self.counts)] += 1
+        self.total += 1
+        self.recent.append((now, member_id))
+        self.last_seen = now
+        return self.total
+
+    def members(self, now: float) -> List[int]:
+        """Ids of the tracked members who joined inside the window"""
+        while self.recent and now - self.recent[0][0] > self.window:
+            self.recent.popleft()
+        return [member_id for _, member_id in self.recent]
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.recent.clear()
+
+    def _advance(self, now: float):
+        bucket = int(now // self.bucket_size)
+        if self.head is None or bucket - self.head >= len(self.counts):
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+        elif bucket > self.head:
+            for expired in range(self.head + 1, bucket + 1):
+                slot = expired % len(self.counts)
+                self.total -= self.counts[slot]
+                self.counts[slot] = 0
+        self.head = bucket if self.head is None else max(self.head, bucket)
+
+class RaidDetector:
+    """Per-guild join-rate tracking with per-guild window/threshold overrides"""
+
+    def __init__(self, window: float = 10, threshold: int = 10, max_tracked: int = 200, idle_timeout: float = 300):
+        self.default_window = window
+        self.default_threshold = threshold
+        self.max_tracked = max_tracked
+        self.idle_timeout = idle_timeout
+        self.overrides: Dict[int, Tuple[float, int]] = {}
+        self.windows: Dict[int, JoinWindow] = {}
+
+    def configure(self, guild_id: int, window: float, threshold: int):
+        """Set a guild's window (seconds) and join threshold"""
+        self.overrides[guild_id] = (window, threshold)
+        # Rebuild on the next join so the bucket ring matches the new window
+        self.windows.pop(guild_id, None)
+
+    def settings_for(self, guild_id: int) -> Tuple[float, int]:
+        return self.overrides.get(guild_id, (self.default_window, self.default_threshold))
+
+    def record_join(self, guild_id: int, member_id: int, now: Optional[float] = None) -> Optional[List[int]]:
+        """Record a join; returns the recent member ids once the threshold is hit"""
+        now = time.monotonic() if now is None else now
+        tracker = self.windows.get(guild_id)
+        if tracker is None:
+            window, threshold = self.settings_for(guild_id)
+            tracker = self.windows[guild_id] = JoinWindow(window, threshold, self.max_tracked)
+
+        if tracker.record(member_id, now) < tracker.threshold:
+            return None
+
+        members = tracker.members(now)
+        # Start counting afresh so one raid triggers one response
+        tracker.reset()
+        return members
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop trackers for guilds with no joins in idle_timeout seconds"""
+        now = time.monotonic() if now is None else now
+        idle = [
+            guild_id for guild_id, tracker in self.windows.items()
+            if now - tracker.last_seen > max(self.idle_timeout, tracker.window)
+        ]
+        for guild_id in idle:
+            del self.windows[guild_id]
+        return len(idle)
+
+# Each byte value spread out to one byte-wide lane per bit, so summing spread
+# hashes counts set bits per position without a Python loop over all 64 bits
+_SPREAD = [sum(1 << (8 * bit) for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+def simhash(text: str, shingle: int = 4, max_shingles: int = 255) -> int:
+    """64-bit simhash over character shingles; similar texts differ in few bits"""
+    hashes = {hash(text[i:i + shingle]) & 0xFFFFFFFFFFFFFFFF for i in range(max(1, len(text) - shingle + 1))}
+    hashes = list(hashes)[:max_shingles]
+    totals = [0] * 8
+    for h in hashes:
+        for byte in range(8):
+            totals[byte] += _SPREAD[h & 0xFF]
+            h >>= 8
+    counts = b"".join(total.to_bytes(8, "little") for total in totals)
+    half = len(hashes) / 2
+    return sum(1 << bit for bit, count in enumerate(counts) if count > half)
+
+def _skeleton(content: str) -> str:
+    """Lowercased alphanumerics only, so punctuation/spacing tweaks still collide"""
+    text = "".join(char for char in content.lower() if char.isalnum())
+    return text or content.strip()
+
+class MemberFingerprints:
+    """Recent message fingerprints for one member"""
+
+    __slots__ = ('entries', 'counts', 'offences', 'last_seen')
+
+    def __init__(self, max_entries: int):
+        # (timestamp, fingerprint, simhash or None)
+        self.entries: deque = deque(maxlen=max_entries)
+        self.counts: Dict[int, int] = {}
+        self.offences: deque = deque(maxlen=max_entries)
+        self.last_seen = 0.0
+
+    def expire(self, cutoff: float):
+        while self.entries and self.entries[0][0] < cutoff:
+            self._drop_oldest()
+        while self.offences and self.offences[0] < cutoff:
+            self.offences.popleft()
+
+    def add(self, now: float, fingerprint: int, signature: Optional[int]):
+        if len(self.entries) == self.entries.maxlen:
+            self._drop_oldest()
+        self.entries.append((now, fingerprint, signature))
+        self.counts[fingerprint] = self.counts.get(fingerprint, 0) + 1
+        self.last_seen = now
+
+    def _drop_oldest(self):
+        _, fingerprint, _ = self.entries.popleft()
+        remaining = self.counts[fingerprint] - 1
+        if remaining:
+            self.counts[fingerprint] = remaining
+        else:
+            del self.counts[fingerprint]
+
+class FingerprintStore:
+    """Per-member rolling fingerprints for copy-paste flood detection.
+
+    Each message is reduced to a hash of its alphanumeric skeleton plus its
+    attachments' names and sizes, so the same text posted across channels, or
+    re-posted with changed case, spacing or punctuation, collides. Exact duplicates are counted in O(1); near-duplicates (optional)
+    compare a simhash against the member's last few messages, which is
+    bounded by max_entries. Members are kept in an LRU capped at max_members
+    and their entries expire after window seconds.
+    """
+
+    def __init__(
+        self,
+        window: float = 60,
+        max_entries: int = 10,
+        max_members: int = 50000,
+        near_duplicates: bool = False,
+        max_distance: int = 8,
+        min_length: int = 24
+    ):
+        self.window = window
+        self.max_entries = max_entries
+        self.max_members = max_members
+        self.near_duplicates = near_duplicates
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.members: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def record(self, guild_id: int, user_id: int, content: str, attachments: Iterable[Tuple[str, int]] = (), now: Optional[float] = None) -> int:
+        """Record a message; returns how many recent messages it duplicates, itself included"""
+        now = time.monotonic() if now is None else now
+        text = _skeleton(content)
+        attachments = tuple(attachments)
+        if not text and not attachments:
+            return 0
+
+        fingerprint = hash((text, attachments))
+        signature = None
+        if self.near_duplicates and len(text) >= self.min_length:
+            signature = simhash(text)
+
+        member = self._member((guild_id, user_id), now)
+        duplicates = member.counts.get(fingerprint, 0) + 1
+        if signature is not None:
+            duplicates += sum(
+                1 for _, other_fingerprint, other in member.entries
+                if other is not None and other_fingerprint != fingerprint
+                and bin(signature ^ other).count("1") <= self.max_distance
+            )
+        member.add(now, fingerprint, signature)
+        return duplicates
+
+    def flag(self, guild_id: int, user_id: int, now: Optional[float] = None) -> int:
+        """Record a spam offence; returns offences within the window"""
+        now = time.monotonic() if now is None else now
+        member = self._member((guild_id, user_id), now)
+        member.offences.append(now)
+        return len(member.offences)
+
+    def forget(self, guild_id: int, user_id: int):
+        self.members.pop((guild_id, user_id), None)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop members with nothing left inside the window"""
+        now = time.monotonic() if now is None else now
+        expired = [key for key, member in self.members.items() if now - member.last_seen > self.window]
+        for key in expired:
+            del self.members[key]
+        return len(expired)
+
+    def _member(self, key: Tuple[int, int], now: float) -> MemberFingerprints:
+        member = self.members.get(key)
+        if member is None:
+            member = self.members[key] = MemberFingerprints(self.max_entries)
+            if len(self.members) > self.max_members:
+                self.members.popitem(last=False)
+        else:
+            self.members.move_to_end(key)
+        member.expire(now - self.window)
+        member.last_seen = now
+        return member
@@ -0,0 +1,119 @@
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """Shard that Discord routes a guild's events to"""
+    return (guild_id >> 22) % shard_count
+
+def parse_shard_settings(settings: Dict[str, Any]) -> Tuple[Optional[int], Optional[List[int]]]:
+    """Validate the sharding config section; returns (shard_count, shard_ids).
+
+    shard_ids can be given as a list or as an inclusive shard_range of
+    [first, last]. Leaving both out runs every shard; leaving shard_count
+    out as well lets Discord recommend one.
+    """
+    shard_count = settings.get('shard_count')
+    shard_ids = settings.get('shard_ids')
+    shard_range = settings.get('shard_range')
+
+    if shard_range is not None:
+        if shard_ids is not None:
+            raise ValueError("Set either shard_ids or shard_range, not both")
+        first, last = shard_range
+        shard_ids = list(range(first, last + 1))
+
+    if shard_count is not None and shard_count < 1:
+        raise ValueError("shard_count must be at least 1")
+    if shard_ids is not None:
+        if shard_count is None:
+            raise ValueError("shard_count is required when shard_ids or shard_range is set")
+        if not shard_ids or any(not 0 <= shard_id < shard_count for shard_id in shard_ids):
+            raise ValueError(f"Shard ids must be between 0 and {shard_count - 1}")
+        shard_ids = sorted(set(shard_ids))
+    return shard_count, shard_ids
+
+class EventRate:
+    """Events per second over a sliding window of one-second buckets"""
+
+    __slots__ = ('window', 'total', '_buckets')
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.total = 0
+        self._buckets: deque = deque()
+
+    def add(self, now: int):
+        self.total += 1
+        if self._buckets and self._buckets[-1][0] == now:
+            self._buckets[-1][1] += 1
+            return
+        self._buckets.append([now, 1])
+        self._expire(now)
+
+    def rate(self, now: int) -> float:
+        self._expire(now)
+        return sum(count for _, count in self._buckets) / self.window
+
+    def _expire(self, now: int):
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+class GatewayEvents:
+    """Per-shard count and rate of gateway dispatch events.
+
+    Every parser in the connection state is wrapped, so each event is counted
+    once no matter how many listeners it has. The shard is derived from the
+    event's guild id, which is how Discord routes it; events without a guild
+    (DMs, user updates) arrive on shard 0, and READY/RESUMED are counted
+    once per shard.
+    """
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.shards: Dict[int, EventRate] = {}
+
+    def record(self, shard_id: int):
+        rate = self.shards.get(shard_id)
+        if rate is None:
+            rate = self.shards[shard_id] = EventRate(self.window)
+        rate.add(int(time.monotonic()))
+
+    def rate(self, shard_id: int) -> float:
+        rate = self.shards.get(shard_id)
+        return rate.rate(int(time.monotonic())) if rate else 0.0
+
+    def total(self, shard_id: int) -> int:
+        rate = self.shards.get(shard_id)
+        return rate.total if rate else 0
+
+    def snapshot(self) -> Dict[int, Dict[str, float]]:
+        now = int(time.monotonic())
+        return {
+            shard_id: {'events': rate.total, 'per_second': round(rate.rate(now), 2)}
+            for shard_id, rate in sorted(self.shards.items())
+        }
+
+    def instrument(self, parsers: Dict[str, Callable[[Any], None]], shard_count: Callable[[], Optional[int]]):
+        """Wrap the connection state's parsers in place (before connecting)"""
+        for event, parser in list(parsers.items()):
+            parsers[event] = self._counted(event, parser, shard_count)
+
+    def _counted(self, event: str, parser: Callable[[Any], None], shard_count: Callable[[], Optional[int]]):
+        guild_key = 'id' if event in ('GUILD_CREATE', 'GUILD_UPDATE', 'GUILD_DELETE') else 'guild_id'
+
+        def counted(data):
+            shard_id = 0
+            if isinstance(data, dict):
+                guild_id = data.get(guild_key)
+                count = shard_count()
+                if '__shard_id__' in data:
+                    shard_id = data['__shard_id__']
+                elif event == 'READY' and data.get('shard'):
+                    shard_id = data['shard'][0]
+                elif guild_id is not None and count:
+                    shard_id = shard_for(int(guild_id), count)
+            self.record(shard_id)
+            return parser(data)
+
+        return counted
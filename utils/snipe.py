@@ -0,0 +1,113 @@
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+class SnipeRecord:
+    """A deleted or edited message, reduced to ids and text"""
+
+    __slots__ = ('author_id', 'author_name', 'content', 'edited', 'timestamp', 'size')
+
+    def __init__(self, author_id: int, author_name: str, content: str, edited: Optional[str] = None, timestamp: Optional[float] = None):
+        self.author_id = author_id
+        self.author_name = author_name
+        self.content = content
+        self.edited = edited
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.size = (
+            sys.getsizeof(self) + sys.getsizeof(author_name)
+            + sys.getsizeof(content) + (sys.getsizeof(edited) if edited is not None else 0)
+        )
+
+class SnipeStore:
+    """Last few deleted/edited messages per channel under a global budget.
+
+    Each channel keeps a ring of up to per_channel records, newest last.
+    Channels are kept in LRU order; when the store holds more than
+    max_entries records or max_bytes of estimated footprint, whole channels
+    are evicted starting with the least recently written. Records older than
+    ttl seconds are dropped when their channel is read or written.
+    """
+
+    def __init__(self, per_channel: int = 5, max_entries: int = 10000, max_bytes: int = 8 * 1024 * 1024, ttl: float = 3600):
+        self.per_channel = per_channel
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.channels: OrderedDict = OrderedDict()
+        self.entries = 0
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def add(self, channel_id: int, record: SnipeRecord):
+        ring = self.channels.get(channel_id)
+        if ring is None:
+            ring = self.channels[channel_id] = deque()
+        else:
+            self.channels.move_to_end(channel_id)
+            self._expire(ring, time.time())
+
+        if len(ring) >= self.per_channel:
+            self._drop(ring.popleft())
+        ring.append(record)
+        self.entries += 1
+        self.bytes += record.size
+
+        while (self.entries > self.max_entries or self.bytes > self.max_bytes) and len(self.channels) > 1:
+            _, evicted = self.channels.popitem(last=False)
+            for old in evicted:
+                self._drop(old)
+            self.evictions += len(evicted)
+
+    def get(self, channel_id: int, index: int = 1) -> Optional[SnipeRecord]:
+        """The index-th most recent record for a channel (1 = newest)"""
+        ring = self.channels.get(channel_id)
+        if ring is None:
+            return None
+        self._expire(ring, time.time())
+        if not ring:
+            del self.channels[channel_id]
+            return None
+        if not 1 <= index <= len(ring):
+            return None
+        return ring[-index]
+
+    def count(self, channel_id: int) -> int:
+        return len(self.channels.get(channel_id, ()))
+
+    def forget(self, channel_id: int):
+        ring = self.channels.pop(channel_id, None)
+        for record in ring or ():
+            self._drop(record)
+
+    def purge_expired(self) -> int:
+        """Drop expired records across all channels"""
+        now = time.time()
+        before = self.expirations
+        for channel_id in list(self.channels):
+            ring = self.channels[channel_id]
+            self._expire(ring, now)
+            if not ring:
+                del self.channels[channel_id]
+        return self.expirations - before
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'channels': len(self.channels),
+            'entries': self.entries,
+            'bytes': self.bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+    def _expire(self, ring: deque, now: float):
+        while ring and now - ring[0].timestamp > self.ttl:
+            self._drop(ring.popleft())
+            self.expirations += 1
+
+    def _drop(self, record: SnipeRecord):
+        self.entries -= 1
+        self.bytes -= record.size
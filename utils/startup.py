@@ -0,0 +1,74 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+EXTENSION_STEPS = ('import', 'init', 'cog_load')
+
+class StartupProfiler:
+    """Wall-clock breakdown of one cold start, from process start to READY.
+
+    Phases are timed in the order they run; extensions additionally record
+    their module import, cog construction and cog_load separately. Extensions
+    load concurrently, so their per-step times add up to more than the
+    'extensions' phase.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases: Dict[str, float] = {}
+        self.extensions: Dict[str, Dict[str, float]] = {}
+        self.ready_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.ready_at is not None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def record_extension(self, extension: str, step: str, seconds: float):
+        steps = self.extensions.setdefault(extension, {})
+        steps[step] = steps.get(step, 0.0) + seconds
+
+    def mark_ready(self, gateway_started: float) -> bool:
+        """Record READY; returns False if it was already recorded (reconnects)"""
+        if self.finished:
+            return False
+        self.ready_at = time.perf_counter()
+        self.record('gateway', self.ready_at - gateway_started)
+        return True
+
+    @property
+    def total(self) -> float:
+        end = self.ready_at if self.ready_at is not None else time.perf_counter()
+        return end - self.started
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'total': round(self.total, 4),
+            'ready': self.finished,
+            'phases': {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            'extensions': {
+                extension: {step: round(seconds, 4) for step, seconds in steps.items()}
+                for extension, steps in self.extensions.items()
+            }
+        }
+
+    def report(self) -> str:
+        lines = [f"Startup took {self.total:.2f}s to READY"]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name:<24}{seconds * 1000:9.1f}ms")
+            if name == 'extensions':
+                slowest = sorted(self.extensions.items(), key=lambda item: sum(item[1].values()), reverse=True)
+                for extension, steps in slowest:
+                    breakdown = "  ".join(f"{step} {steps.get(step, 0.0) * 1000:.1f}ms" for step in EXTENSION_STEPS)
+                    lines.append(f"    {extension:<22}{breakdown}")
+        return "\n".join(lines)